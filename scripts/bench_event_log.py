@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Point-in-time net worth benchmark for the ledger event log
+Seeds a scratch database with N balance events spread over several years,
+then compares full-log replay with snapshot + bounded delta replay for
+random as-of dates, before and after compaction.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import timeit
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+import mcp_financial_server as server
+import ledger_events
+
+def seed_events(conn, count: int, days: int) -> date:
+    """Append `count` balance deltas across the accounts, dates rising with id; returns the first date"""
+    accounts = [row[0] for row in conn.execute("SELECT id FROM accounts")]
+    # Seeded history must precede everything else in the log, so start from an empty one
+    conn.execute("DELETE FROM ledger_events")
+    conn.execute("DELETE FROM balance_snapshots")
+    start = date.today() - timedelta(days=days)
+    rng = random.Random(42)
+    conn.executemany(
+        "INSERT INTO ledger_events (account_id, event_type, delta, effective_date) VALUES (?, 'balance', ?, ?)",
+        (
+            (rng.choice(accounts), round(rng.uniform(-2000, 2500), 2), (start + timedelta(days=i * days // count)).isoformat())
+            for i in range(count)
+        )
+    )
+    ledger_events.rebuild_net_worth_daily(conn)
+    conn.commit()
+    return start
+
+def time_queries(func, as_of_dates, repeat: int) -> float:
+    """Best-of-3 mean time per query in microseconds"""
+    def run():
+        for as_of in as_of_dates:
+            func(as_of)
+    return min(timeit.repeat(run, number=repeat, repeat=3)) / (repeat * len(as_of_dates)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark historical net worth queries over the event log')
+    parser.add_argument('--events', type=int, default=150000, help='Balance events to seed')
+    parser.add_argument('--days', type=int, default=3 * 365, help='History length in days')
+    parser.add_argument('--queries', type=int, default=50, help='Random as-of dates per timing sample')
+    parser.add_argument('--repeat', type=int, default=5, help='Passes over the as-of dates per sample')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server.DB_PATH = os.path.join(tmp, "bench.db")
+        conn = server.get_db_connection()
+        start = seed_events(conn, args.events, args.days)
+
+        rng = random.Random(7)
+        as_of_dates = [(start + timedelta(days=rng.randrange(args.days))).isoformat() for _ in range(args.queries)]
+        mismatches = sum(
+            abs(ledger_events.net_worth_at(conn, as_of) - ledger_events.replay_net_worth(conn, as_of)) > 0.01
+            for as_of in as_of_dates
+        )
+        snapshots = conn.execute("SELECT COUNT(DISTINCT snapshot_id) FROM balance_snapshots").fetchone()[0]
+
+        print(f"📜 {args.events:,} events over {args.days} days, {snapshots} snapshots "
+              f"(every {ledger_events.SNAPSHOT_INTERVAL:,} events)")
+        print("=" * 60)
+        replay = time_queries(lambda as_of: ledger_events.replay_net_worth(conn, as_of), as_of_dates, args.repeat)
+        snapshot = time_queries(lambda as_of: ledger_events.net_worth_at(conn, as_of), as_of_dates, args.repeat)
+        print(f"{'full replay':<28}{replay:>12,.1f} µs/query")
+        print(f"{'snapshot + delta replay':<28}{snapshot:>12,.1f} µs/query  ({replay / snapshot:,.0f}x)")
+        print(f"{'results matching replay':<28}{len(as_of_dates) - mismatches:>12}/{len(as_of_dates)}")
+
+        history = lambda: ledger_events.net_worth_history(conn, start.isoformat(), date.today().isoformat())
+        history_us = min(timeit.repeat(history, number=args.repeat, repeat=3)) / args.repeat * 1e6
+        print(f"{'daily history (full range)':<28}{history_us:>12,.1f} µs/series  ({len(history())} points)")
+
+        cutoff = (date.today() - timedelta(days=90)).isoformat()
+        result = ledger_events.compact(conn, cutoff)
+        remaining = conn.execute("SELECT COUNT(*) FROM ledger_events").fetchone()[0]
+        print(f"\n🗜️  Compacted before {cutoff}: -{result['events_deleted']:,} events, "
+              f"-{result['snapshots_deleted']:,} snapshot rows ({remaining:,} events left)")
+        compacted = time_queries(lambda as_of: ledger_events.net_worth_at(conn, as_of), as_of_dates, args.repeat)
+        print(f"{'snapshot + delta replay':<28}{compacted:>12,.1f} µs/query")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
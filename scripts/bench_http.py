@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+HTTP transport load test: requests/sec at increasing concurrent session counts
+Starts mcp_financial_server.py --transport http against a scratch database
+and opens N streamable HTTP sessions at once. Each session sends requests
+back to back for a fixed time: mostly dashboard reads and net worth
+calculations, plus a share of add_transaction writes. All sessions are
+served by the one server process and share its connections and caches.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+SERVER = Path(__file__).parent / "mcp_financial_server.py"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def wait_for_port(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server did not start listening on port {port}")
+            await asyncio.sleep(0.1)
+
+async def request(session: ClientSession, client: int, write_ratio: float):
+    roll = random.random()
+    if roll < write_ratio:
+        result = await session.call_tool("add_transaction", {
+            "amount": -12.5, "description": f"Load test client {client}",
+            "category": "expense", "life_category": "personal", "response_format": "text"
+        })
+        if result.isError:
+            raise RuntimeError(result.content[0].text)
+    elif roll < (1 + write_ratio) / 2:
+        await session.read_resource("lif3://dashboard")
+    else:
+        result = await session.call_tool("calculate_net_worth", {"response_format": "text"})
+        if result.isError:
+            raise RuntimeError(result.content[0].text)
+
+async def client(url: str, client_id: int, seconds: float, write_ratio: float, ready: asyncio.Barrier,
+                 latencies: list, errors: list):
+    async with streamablehttp_client(url) as (read_stream, write_stream, _):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            await ready.wait()
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    await request(session, client_id, write_ratio)
+                except Exception as e:
+                    errors.append(str(e))
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+
+async def run(url: str, clients: int, seconds: float, write_ratio: float) -> dict:
+    latencies: list = []
+    errors: list = []
+    ready = asyncio.Barrier(clients + 1)
+    tasks = [asyncio.create_task(client(url, i, seconds, write_ratio, ready, latencies, errors)) for i in range(clients)]
+    await ready.wait()
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] if latencies else 0.0,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] if latencies else 0.0,
+        "errors": len(errors),
+    }
+
+async def bench(args: argparse.Namespace, port: int):
+    url = f"http://127.0.0.1:{port}/mcp"
+    await wait_for_port(port)
+    print(f"{'clients':>8}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    print("=" * 44)
+    for clients in (int(count) for count in args.clients.split(",")):
+        result = await run(url, clients, args.seconds, args.write_ratio)
+        print(f"{clients:>8}{result['requests_per_second']:>10,.0f}{result['p50_ms']:>9.2f}"
+              f"{result['p99_ms']:>9.2f}{result['errors']:>8,}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the financial MCP server over streamable HTTP')
+    parser.add_argument('--clients', default='1,5,10,25,50', help='Comma-separated concurrent session counts')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run')
+    parser.add_argument('--write-ratio', type=float, default=0.1, help='Share of requests that are add_transaction writes')
+    parser.add_argument('--session-rate', type=float, default=0.0,
+                        help='Per-session requests/s limit on the server (0 measures unthrottled throughput)')
+    args = parser.parse_args()
+
+    port = free_port()
+    max_clients = max(int(count) for count in args.clients.split(","))
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "LIF3_DB_PATH": os.path.join(tmp, "bench.db"),
+               "LIF3_TENANT_DIR": os.path.join(tmp, "tenants"), "LIF3_SESSION_RATE": str(args.session_rate)}
+        process = subprocess.Popen(
+            [sys.executable, str(SERVER), "--transport", "http", "--port", str(port),
+             "--max-sessions", str(max_clients)],
+            env=env
+        )
+        try:
+            asyncio.run(bench(args, port))
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Transaction search benchmark: FTS5 index vs LIKE scan
+Grows a scratch ledger in steps and times the same ranked, filtered queries
+at each size. FTS latency stays flat (matches are capped at RANK_WINDOW);
+a LIKE scan grows with the table unless enough rows match to fill its page
+early.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import timeit
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+import mcp_financial_server as server
+import ledger_search
+
+MERCHANTS = ["Woolworths Food", "Checkers Sixty60", "Uber Eats", "Netflix", "Vodacom Airtime", "Engen Garage",
+             "Takealot", "Discovery Health", "Cursor Pro", "Claude Subscription", "Luno BTC Purchase", "Salary IT"]
+CATEGORIES = ["personal", "work", "tech_business", "brand_business"]
+
+# Roughly one transaction in 500 is from this merchant
+RARE_MERCHANT = "Kauai Smoothies"
+
+QUERIES = [
+    ("no match", {"query": "zzyzx"}),
+    ("rare merchant", {"query": "kauai"}),
+    ("common merchant", {"query": "sixty60"}),
+    ("prefix", {"query": "netf"}),
+    ("words + category", {"query": "uber eats", "life_category": "personal"}),
+    ("words + date range", {"query": "engen", "start": "OFFSET:-30"}),
+]
+
+def seed(conn, count: int, days: int, rng: random.Random):
+    """Append `count` transactions with random merchants over the last `days` days, in date order like a real ledger"""
+    today = date.today()
+    dates = sorted(today - timedelta(days=rng.randrange(days)) for _ in range(count))
+    conn.executemany(
+        "INSERT INTO transactions (account_id, amount, description, category, life_category, date, notes) "
+        "VALUES (1, ?, ?, 'expense', ?, ?, ?)",
+        (
+            (-round(rng.uniform(20, 2500), 2),
+             f"{RARE_MERCHANT if rng.random() < 0.002 else rng.choice(MERCHANTS)} #{rng.randrange(10 ** 6)}",
+             rng.choice(CATEGORIES),
+             day.isoformat(),
+             rng.choice(["", "", "split with team", "reimbursable", "card ending 4421"]))
+            for day in dates
+        )
+    )
+    conn.commit()
+
+def resolve(arguments):
+    """Replace OFFSET:-N date placeholders with real dates"""
+    return {
+        key: (date.today() + timedelta(days=int(value[7:]))).isoformat() if str(value).startswith("OFFSET:") else value
+        for key, value in arguments.items()
+    }
+
+def like_scan(conn, query: str, **filters):
+    """What query_database callers did before: LIKE over description/notes"""
+    pattern = f"%{query}%"
+    sql = "SELECT id, date, amount, description FROM transactions WHERE (description LIKE ? OR notes LIKE ?)"
+    params = [pattern, pattern]
+    if filters.get("life_category"):
+        sql += " AND life_category = ?"
+        params.append(filters["life_category"])
+    if filters.get("start"):
+        sql += " AND date >= ?"
+        params.append(filters["start"])
+    return conn.execute(sql + " ORDER BY date DESC LIMIT 20", params).fetchall()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark transaction search as the ledger grows')
+    parser.add_argument('--steps', default='10000,100000,300000', help='Comma-separated ledger sizes')
+    parser.add_argument('--days', type=int, default=3 * 365, help='History length in days')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per timing sample')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        server.DB_PATH = os.path.join(tmp, "bench.db")
+        conn = server.get_db_connection()
+        seeded = 0
+        print(f"{'rows':>9}  {'query':<20}{'FTS5 ms':>10}{'LIKE ms':>10}{'hits':>9}")
+        print("=" * 60)
+        for target in (int(step) for step in args.steps.split(",")):
+            seed(conn, target - seeded, args.days, rng)
+            seeded = target
+            for label, arguments in QUERIES:
+                arguments = resolve(arguments)
+                fts = lambda: ledger_search.search_transactions(conn, **arguments)
+                like = lambda: like_scan(conn, **arguments)
+                fts_ms = min(timeit.repeat(fts, number=args.repeat, repeat=3)) / args.repeat * 1e3
+                like_ms = min(timeit.repeat(like, number=args.repeat, repeat=3)) / args.repeat * 1e3
+                print(f"{seeded:>9,}  {label:<20}{fts_ms:>10.2f}{like_ms:>10.2f}{fts()['total']:>8,}{'+' if fts()['more'] else ' '}")
+        conn.close()
+
+if __name__ == "__main__":
+    main()
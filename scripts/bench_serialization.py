@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Serialization microbenchmark for the lif3://dashboard payload
+Compares the legacy json.dumps(indent=2, default=str) path with every
+serializer installed here, on a scratch database seeded with N transactions.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+import mcp_financial_server as server
+from payload_serializer import SERIALIZERS, rows_to_dicts
+
+def seed_transactions(conn, count: int):
+    """Add `count` synthetic transactions spread over the last two years"""
+    conn.executemany("""
+        INSERT INTO transactions (account_id, amount, description, category, subcategory, life_category, date)
+        VALUES (1, ?, ?, 'expense', ?, 'personal', date('now', ?))
+    """, [
+        (-(50 + i % 500), f"Card purchase #{i}", ("food", "transport", "utilities")[i % 3], f"-{i % 730} days")
+        for i in range(count)
+    ])
+    conn.commit()
+
+def time_call(func, repeat: int) -> float:
+    """Best-of-5 mean time per call in microseconds"""
+    return min(timeit.repeat(func, number=repeat, repeat=5)) / repeat * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dashboard payload encoders')
+    parser.add_argument('--transactions', type=int, default=5000, help='Synthetic transactions to seed')
+    parser.add_argument('--recent', type=int, default=500, help='recent_transactions rows in the payload')
+    parser.add_argument('--repeat', type=int, default=200, help='Encodes per timing sample')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server.DB_PATH = os.path.join(tmp, "bench.db")
+        conn = server.get_db_connection()
+        seed_transactions(conn, args.transactions)
+        dashboard = server.build_dashboard(conn, recent_limit=args.recent)
+
+        print(f"📦 lif3://dashboard with {args.recent} recent transactions ({args.transactions} seeded)")
+        print("=" * 60)
+        print(f"{'encoder':<14}{'bytes':>10}{'vs legacy':>12}{'µs/encode':>14}")
+
+        legacy = lambda: json.dumps(dashboard, indent=2, default=str)
+        legacy_size = len(legacy().encode())
+        print(f"{'legacy':<14}{legacy_size:>10,}{'100.0%':>12}{time_call(legacy, args.repeat):>14,.1f}")
+
+        for name, serializer in SERIALIZERS.items():
+            encode = lambda: serializer.dumps(dashboard)
+            payload = encode()
+            size = len(payload if serializer.binary else payload.encode())
+            print(f"{name:<14}{size:>10,}{size / legacy_size:>12.1%}{time_call(encode, args.repeat):>14,.1f}")
+
+        print("\n🧮 Row materialisation for the recent_transactions query")
+        print("=" * 60)
+        sql = "SELECT t.*, a.name as account_name FROM transactions t LEFT JOIN accounts a ON t.account_id = a.id ORDER BY t.date DESC LIMIT ?"
+        row_conn = sqlite3.connect(server.DB_PATH)
+        row_conn.row_factory = sqlite3.Row
+        legacy_rows = lambda: [dict(row) for row in row_conn.execute(sql, (args.recent,)).fetchall()]
+        cached_rows = lambda: rows_to_dicts(row_conn.execute(sql, (args.recent,)))
+        print(f"{'dict(row)':<24}{time_call(legacy_rows, args.repeat // 10 or 1):>14,.1f} µs")
+        print(f"{'rows_to_dicts':<24}{time_call(cached_rows, args.repeat // 10 or 1):>14,.1f} µs")
+        row_conn.close()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the LIF3 MCP servers
+Spawns a server over stdio the way an MCP client does and times the
+initialize handshake, the first tools/list response and (for servers that
+own the database) the first resource read. Also breaks down module import
+cost with `python -X importtime`. Exits non-zero when the median
+time-to-first-list_tools exceeds --budget-ms.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_PATH = Path(__file__).parent
+
+SERVERS = {
+    "financial": ("mcp_financial_server.py", "lif3://dashboard"),
+    "lif3": ("lif3_mcp_server.py", "lif3://metrics"),
+    "knowledge": ("mcp_knowledge_server.py", "lif3://knowledge/documents"),
+}
+
+DEFAULT_BUDGET_MS = 1500
+
+class StdioClient:
+    """Minimal newline-delimited JSON-RPC client for an MCP server subprocess"""
+
+    def __init__(self, script: Path, env: dict):
+        self.process = subprocess.Popen(
+            [sys.executable, str(script)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            env=env, text=True, bufsize=1
+        )
+        self.next_id = 0
+
+    def send(self, method: str, params: dict = None, notify: bool = False):
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        if not notify:
+            self.next_id += 1
+            message["id"] = self.next_id
+        self.process.stdin.write(json.dumps(message) + "\n")
+        self.process.stdin.flush()
+
+    def request(self, method: str, params: dict = None) -> dict:
+        self.send(method, params)
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError(f"Server exited before answering {method}")
+            message = json.loads(line)
+            if message.get("id") == self.next_id:
+                if "error" in message:
+                    raise RuntimeError(f"{method} failed: {message['error']}")
+                return message["result"]
+
+    def close(self):
+        self.process.stdin.close()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+def time_startup(script: Path, resource_uri: str, env: dict) -> dict:
+    """Milliseconds from spawn to initialize, first tools/list and first resource read"""
+    started = time.perf_counter()
+    client = StdioClient(script, env)
+    try:
+        client.request("initialize", {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {},
+            "clientInfo": {"name": "lif3-bench-startup", "version": "1.0"}
+        })
+        initialized = time.perf_counter()
+        client.send("notifications/initialized", notify=True)
+        tools = client.request("tools/list")
+        listed = time.perf_counter()
+        client.request("resources/read", {"uri": resource_uri})
+        read = time.perf_counter()
+    finally:
+        client.close()
+    return {
+        "initialize_ms": (initialized - started) * 1000,
+        "list_tools_ms": (listed - started) * 1000,
+        "first_read_ms": (read - started) * 1000,
+        "tools": len(tools["tools"])
+    }
+
+def import_breakdown(module: str, top: int) -> list:
+    """(cumulative µs, module) for the heaviest direct imports of `module`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SCRIPTS_PATH, capture_output=True, text=True
+    )
+    total = 0
+    children = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip() == "cumulative":
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0 and name.strip() == module:
+            total = int(cumulative)
+        elif depth == 1:
+            children.append((int(cumulative), name.strip()))
+    return [(total, module)] + sorted(children, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark MCP server time-to-first-list_tools')
+    parser.add_argument('--server', choices=sorted(SERVERS), default='financial', help='Server to launch')
+    parser.add_argument('--runs', type=int, default=5, help='Launches per scenario')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help='Median time-to-first-list_tools budget (warm database)')
+    parser.add_argument('--db', help='Database to copy for the runs (default: a fresh one per scenario)')
+    parser.add_argument('--top', type=int, default=8, help='Direct imports to list in the importtime breakdown')
+    args = parser.parse_args()
+
+    script_name, resource_uri = SERVERS[args.server]
+    module = script_name[:-3]
+
+    print(f"📦 Import cost for {module} (python -X importtime)")
+    print("=" * 60)
+    for cumulative, name in import_breakdown(module, args.top):
+        print(f"{name:<40}{cumulative / 1000:>12,.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "lif3_financial.db")
+        env = {**os.environ, "LIF3_DB_PATH": db_path, "LIF3_TENANT_DIR": os.path.join(tmp, "tenants")}
+
+        scenarios = []
+        for label in ("cold", "warm"):
+            samples = []
+            for _ in range(args.runs):
+                if label == "cold":
+                    # Every cold launch starts from an unstamped copy (or no file at all)
+                    for suffix in ("", "-wal", "-shm"):
+                        if os.path.exists(db_path + suffix):
+                            os.remove(db_path + suffix)
+                    if args.db:
+                        shutil.copy(args.db, db_path)
+                samples.append(time_startup(SCRIPTS_PATH / script_name, resource_uri, env))
+            scenarios.append((label, samples))
+
+    print(f"\n⏱️  {args.server} server startup over stdio ({args.runs} runs, median ms)")
+    print("=" * 60)
+    print(f"{'database':<10}{'initialize':>14}{'list_tools':>14}{'first read':>14}")
+    for label, samples in scenarios:
+        medians = [statistics.median(s[key] for s in samples) for key in ("initialize_ms", "list_tools_ms", "first_read_ms")]
+        print(f"{label:<10}" + "".join(f"{value:>14,.1f}" for value in medians))
+
+    warm_list_tools = statistics.median(s["list_tools_ms"] for s in scenarios[1][1])
+    if warm_list_tools > args.budget_ms:
+        print(f"\n❌ time-to-first-list_tools {warm_list_tools:,.1f} ms exceeds the {args.budget_ms:,.0f} ms budget")
+        sys.exit(1)
+    print(f"\n✅ time-to-first-list_tools {warm_list_tools:,.1f} ms within the {args.budget_ms:,.0f} ms budget")
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,66 @@ Integrates Claude CLI with existing NestJS RAG backend
 """
 
 import os
+import re
 import json
 import asyncio
-import aiohttp
+import hashlib
 import argparse
 from datetime import datetime
 from pathlib import Path
 
+# Local rewrites used to expand one question into several sub-queries
+QUERY_SYNONYMS = {
+    "invest": "portfolio allocation ETF",
+    "investment": "portfolio allocation ETF",
+    "stocks": "JSE Top 40 equities",
+    "shares": "JSE equities",
+    "stock market": "JSE",
+    "save": "savings rate emergency fund",
+    "savings": "savings rate money market",
+    "emergency": "emergency fund liquidity money market",
+    "tax": "SARS TFSA capital gains tax",
+    "retirement": "retirement annuity RA",
+    "debt": "debt elimination loan repayment",
+    "loan": "debt repayment interest",
+    "business": "43V3R revenue strategy",
+    "revenue": "MRR recurring revenue 43V3R",
+    "crypto": "cryptocurrency Bitcoin Luno VALR",
+    "bitcoin": "cryptocurrency Luno VALR",
+    "offshore": "offshore investment allowance EasyEquities",
+    "property": "REITs property exposure",
+    "risk": "risk management diversification",
+    "net worth": "wealth building R1.8M goal",
+}
+
+# Rewrites that pin generic terms to the South African context
+SA_REWRITES = (
+    (re.compile(r"\$\s?|\b(?:usd|dollars?)\b", re.I), "ZAR "),
+    (re.compile(r"\b(?:s&p 500|nasdaq|dow jones)\b", re.I), "JSE Top 40"),
+    (re.compile(r"\b(?:401k|ira|roth)\b", re.I), "retirement annuity TFSA"),
+    (re.compile(r"\birs\b", re.I), "SARS"),
+)
+SA_TERMS = re.compile(r"\b(?:zar|rand|jse|sars|tfsa|south africa|cape town|sarb)\b", re.I)
+
+STOPWORDS = {
+    "a", "an", "the", "i", "my", "me", "should", "what", "how", "is", "are", "can", "do",
+    "to", "for", "of", "in", "on", "and", "or", "with", "best", "which", "would", "could"
+}
+
+RRF_K = 60  # reciprocal-rank fusion constant from Cormack et al.
+
 class LIF3ClaudeIntegration:
     def __init__(self):
         self.backend_url = "http://localhost:3001"
         self.config_path = Path(__file__).parent.parent / "config"
         self.prompts_path = Path(__file__).parent.parent / "prompts"
+        self.multi_query = True
+        self.max_queries = 4
+        self.search_limit = 10
+        self.search_threshold = 0.7
+        self.retrieval = "backend"  # or "local" for the in-process knowledge index
+        self.local_index = None
+        self.local_threshold = 0.3
         
     async def process_financial_query(self, query: str, context: dict = None):
         """
@@ -27,8 +75,8 @@ class LIF3ClaudeIntegration:
         system_prompt = self.load_system_prompt()
         rag_instructions = self.load_rag_instructions()
         
-        # Search knowledge base via existing RAG API
-        search_results = await self.search_rag_backend(query)
+        # Search knowledge base via existing RAG API or the embedded index
+        search_results = await self.search_knowledge(query)
         
         # Build comprehensive context
         context_markup = self.build_context_markup(search_results, user_profile, context)
@@ -62,32 +110,121 @@ Please provide a comprehensive financial analysis and recommendation.
         # Execute Claude CLI command
         return await self.execute_claude_query(claude_query)
     
+    def expand_query(self, query: str):
+        """Expand a question into up to max_queries sub-queries (synonyms, ZAR/JSE rewrites)"""
+        queries = [query.strip()]
+        lowered = query.lower()
+        
+        # Synonym expansion: append related financial terms for every concept mentioned
+        related = [terms for concept, terms in QUERY_SYNONYMS.items() if re.search(rf"\b{re.escape(concept)}", lowered)]
+        if related:
+            queries.append(f"{query.strip()} {' '.join(dict.fromkeys(related))}")
+        
+        # South African rewrite: swap foreign instruments for local ones, or add local context
+        localized = query
+        for pattern, replacement in SA_REWRITES:
+            localized = pattern.sub(replacement, localized)
+        if not SA_TERMS.search(localized):
+            localized = f"{localized.strip()} South Africa ZAR JSE"
+        queries.append(localized.strip())
+        
+        # Keyword-only form for lexical matching
+        keywords = [word for word in re.findall(r"[\w&.%-]+", lowered) if word not in STOPWORDS]
+        if keywords:
+            queries.append(" ".join(keywords))
+        
+        unique = list(dict.fromkeys(q for q in queries if q))
+        return unique[:self.max_queries]
+    
+    async def search_knowledge(self, query: str):
+        """Retrieve context from the configured source"""
+        if self.retrieval == "local":
+            return self.search_local_index(query)
+        return await self.search_rag_backend(query)
+    
+    def search_local_index(self, query: str):
+        """Search the in-process knowledge index (loaded once per process)"""
+        if self.local_index is None:
+            from knowledge_index import LIF3KnowledgeIndex
+            self.local_index = LIF3KnowledgeIndex.load_default()
+        
+        queries = self.expand_query(query) if self.multi_query else [query]
+        ranked = [
+            self.local_index.search(sub_query, self.search_limit, self.local_threshold)
+            for sub_query in queries
+        ]
+        results = ranked[0] if len(ranked) == 1 else self.fuse_results(ranked)
+        return {"results": results[:self.search_limit], "queries": queries}
+    
     async def search_rag_backend(self, query: str):
-        """Search the existing RAG backend for relevant financial documents"""
+        """Search the RAG backend with expanded sub-queries in parallel and fuse the rankings"""
+        # Imported here so the embedded knowledge server (expand/fuse only) starts without aiohttp
+        import aiohttp
+        queries = self.expand_query(query) if self.multi_query else [query]
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                search_payload = {
-                    "query": query,
-                    "limit": 10,
-                    "threshold": 0.7,
-                    "filters": {
-                        "category": ["financial_statement", "investment_report", "business_strategy"]
-                    }
-                }
-                
-                async with session.post(
-                    f"{self.backend_url}/api/rag/search",
-                    json=search_payload,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        print(f"⚠️  RAG search failed: {response.status}")
-                        return {"results": []}
+            timeout = aiohttp.ClientTimeout(total=15)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                result_lists = await asyncio.gather(*[
+                    self.search_rag_single(session, sub_query) for sub_query in queries
+                ])
         except Exception as e:
             print(f"⚠️  RAG backend unavailable: {e}")
-            return {"results": []}
+            return {"results": [], "queries": queries}
+        
+        if len(result_lists) == 1:
+            return {"results": result_lists[0], "queries": queries}
+        
+        return {
+            "results": self.fuse_results(result_lists)[:self.search_limit],
+            "queries": queries
+        }
+    
+    async def search_rag_single(self, session, query: str):
+        """Run one search against the RAG backend, returning its ranked results"""
+        search_payload = {
+            "query": query,
+            "limit": self.search_limit,
+            "threshold": self.search_threshold,
+            "filters": {
+                "category": ["financial_statement", "investment_report", "business_strategy"]
+            }
+        }
+        
+        try:
+            async with session.post(
+                f"{self.backend_url}/api/rag/search",
+                json=search_payload,
+                headers={"Content-Type": "application/json"}
+            ) as response:
+                if response.status == 200:
+                    return (await response.json()).get("results", [])
+                else:
+                    print(f"⚠️  RAG search failed ({query[:40]}): {response.status}")
+                    return []
+        except Exception as e:
+            print(f"⚠️  RAG search error ({query[:40]}): {e}")
+            return []
+    
+    @staticmethod
+    def fuse_results(result_lists, k: int = RRF_K):
+        """Reciprocal-rank fusion across sub-query rankings, deduplicating chunks"""
+        fused = {}
+        for results in result_lists:
+            for rank, result in enumerate(results, start=1):
+                chunk = result.get("chunk", {})
+                key = chunk.get("id") or hashlib.sha1(chunk.get("content", "").encode()).hexdigest()
+                
+                entry = fused.get(key)
+                if entry is None:
+                    entry = fused[key] = {**result, "rrf_score": 0.0, "matched_queries": 0}
+                elif result.get("similarity", 0) > entry.get("similarity", 0):
+                    entry.update({**result, "rrf_score": entry["rrf_score"], "matched_queries": entry["matched_queries"]})
+                
+                entry["rrf_score"] += 1.0 / (k + rank)
+                entry["matched_queries"] += 1
+        
+        return sorted(fused.values(), key=lambda item: item["rrf_score"], reverse=True)
     
     async def execute_claude_query(self, query: str):
         """Execute Claude CLI with the prepared query"""
@@ -153,7 +290,7 @@ Economic Context: Post-pandemic recovery, AI revolution
 
 <dashboard_integration>
 Backend API: {self.backend_url}
-RAG System: Active
+RAG System: Active ({self.retrieval})
 Real-time Updates: Available via WebSocket
 </dashboard_integration>
 """
@@ -218,6 +355,8 @@ async def main():
     parser.add_argument('--context', help='Additional context JSON file')
     parser.add_argument('--save', help='Save response to file')
     parser.add_argument('--backend', default='http://localhost:3001', help='Backend URL')
+    parser.add_argument('--single-query', action='store_true', help='Disable multi-query expansion')
+    parser.add_argument('--local-kb', action='store_true', help='Retrieve from the in-process knowledge index instead of the backend')
     
     args = parser.parse_args()
     
@@ -230,11 +369,14 @@ async def main():
     # Initialize integration
     integration = LIF3ClaudeIntegration()
     integration.backend_url = args.backend
+    integration.multi_query = not args.single_query
+    if args.local_kb:
+        integration.retrieval = "local"
     
     print("🤖 LIF3 AI Financial Assistant (Claude CLI + RAG)")
     print("=" * 60)
     print(f"📊 Query: {args.query}")
-    print(f"🔗 Backend: {args.backend}")
+    print(f"🔗 Backend: {args.backend}" if not args.local_kb else "📚 Knowledge: in-process index")
     print("=" * 60)
     
     # Process query
@@ -16,14 +16,22 @@ import os
 # Add the scripts directory to path for importing claude_integration
 sys.path.append(str(Path(__file__).parent))
 from claude_integration import LIF3ClaudeIntegration
+from ledger_changes import LIF3ChangeFeed, CHANGE_TYPES
+from payload_serializer import get_serializer
+from lif3_config import resolve_db_path
+
+DB_PATH = resolve_db_path()
 
 class LIF3DashboardSync:
-    def __init__(self, dashboard_port=3001):
+    def __init__(self, dashboard_port=3001, db_path=DB_PATH, serializer=None):
         self.dashboard_url = f"ws://localhost:{dashboard_port}"
+        self.serializer = get_serializer(serializer)
         self.integration = LIF3ClaudeIntegration()
         self.active_connections = set()
+        self.change_feed = LIF3ChangeFeed(db_path)
+        self.change_subscribers = {}  # websocket -> set of subscribed change types
         
-    async def websocket_handler(self, websocket, path):
+    async def websocket_handler(self, websocket, path=None):
         """Handle WebSocket connections from dashboard"""
         self.active_connections.add(websocket)
         print(f"🔗 New dashboard connection: {websocket.remote_address}")
@@ -37,6 +45,7 @@ class LIF3DashboardSync:
             print(f"❌ WebSocket error: {e}")
         finally:
             self.active_connections.discard(websocket)
+            self.change_subscribers.pop(websocket, None)
     
     async def process_dashboard_message(self, websocket, message):
         """Process incoming message from dashboard"""
@@ -50,6 +59,10 @@ class LIF3DashboardSync:
                 await self.handle_dashboard_update(websocket, data)
             elif message_type == 'health_check':
                 await self.send_health_response(websocket)
+            elif message_type == 'subscribe_changes':
+                await self.handle_subscribe_changes(websocket, data)
+            elif message_type == 'unsubscribe_changes':
+                self.change_subscribers.pop(websocket, None)
             else:
                 await self.send_error(websocket, f"Unknown message type: {message_type}")
                 
@@ -67,7 +80,7 @@ class LIF3DashboardSync:
         print(f"💬 Processing query: {query[:50]}...")
         
         # Send processing acknowledgment
-        await websocket.send(json.dumps({
+        await websocket.send(self.serializer.dumps({
             "type": "query_processing",
             "session_id": session_id,
             "message": "Analyzing with Claude CLI + RAG...",
@@ -79,7 +92,7 @@ class LIF3DashboardSync:
             response = await self.integration.process_financial_query(query, context)
             
             # Send response back to dashboard
-            await websocket.send(json.dumps({
+            await websocket.send(self.serializer.dumps({
                 "type": "financial_response",
                 "session_id": session_id,
                 "query": query,
@@ -120,7 +133,7 @@ class LIF3DashboardSync:
         try:
             response = await self.integration.process_financial_query(analysis_query, metrics)
             
-            await websocket.send(json.dumps({
+            await websocket.send(self.serializer.dumps({
                 "type": "metrics_analysis",
                 "metrics": metrics,
                 "analysis": response,
@@ -131,15 +144,57 @@ class LIF3DashboardSync:
         except Exception as e:
             await self.send_error(websocket, f"Metrics analysis failed: {e}")
     
+    async def handle_subscribe_changes(self, websocket, data):
+        """Subscribe a dashboard to ledger deltas, replaying anything after `since`"""
+        change_types = set(data.get('change_types') or CHANGE_TYPES)
+        unknown = change_types - set(CHANGE_TYPES)
+        if unknown:
+            await self.send_error(websocket, f"Unknown change types: {', '.join(sorted(unknown))}")
+            return
+        
+        self.change_subscribers[websocket] = change_types
+        
+        since = data.get('since')
+        backlog = self.change_feed.backlog(int(since)) if since is not None else []
+        await websocket.send(self.serializer.dumps({
+            "type": "changes_subscribed",
+            "change_types": sorted(change_types),
+            "last_change_id": self.change_feed.last_id,
+            "changes": [change for change in backlog if change["change_type"] in change_types],
+            "timestamp": datetime.now().isoformat()
+        }))
+    
+    async def publish_changes(self, changes):
+        """Push new ledger deltas to each subscriber, filtered by change type"""
+        disconnected = set()
+        for websocket, change_types in list(self.change_subscribers.items()):
+            relevant = [change for change in changes if change["change_type"] in change_types]
+            if not relevant:
+                continue
+            try:
+                await websocket.send(self.serializer.dumps({
+                    "type": "ledger_changes",
+                    "changes": relevant,
+                    "last_change_id": relevant[-1]["id"],
+                    "timestamp": datetime.now().isoformat()
+                }))
+            except websockets.exceptions.ConnectionClosed:
+                disconnected.add(websocket)
+        
+        for websocket in disconnected:
+            self.change_subscribers.pop(websocket, None)
+            self.active_connections.discard(websocket)
+    
     async def send_health_response(self, websocket):
         """Send health check response"""
-        await websocket.send(json.dumps({
+        await websocket.send(self.serializer.dumps({
             "type": "health_response",
             "status": "healthy",
             "services": {
                 "claude_cli": "available",
                 "rag_backend": await self.check_rag_backend(),
-                "knowledge_base": "ready"
+                "knowledge_base": "ready",
+                "change_feed": "streaming" if self.change_feed.conn is not None else "stopped"
             },
             "timestamp": datetime.now().isoformat()
         }))
@@ -155,7 +210,7 @@ class LIF3DashboardSync:
     
     async def send_error(self, websocket, error_message, session_id=None):
         """Send error message to dashboard"""
-        await websocket.send(json.dumps({
+        await websocket.send(self.serializer.dumps({
             "type": "error",
             "message": error_message,
             "session_id": session_id,
@@ -168,7 +223,7 @@ class LIF3DashboardSync:
             disconnected = set()
             for websocket in self.active_connections:
                 try:
-                    await websocket.send(json.dumps(message))
+                    await websocket.send(self.serializer.dumps(message))
                 except websockets.exceptions.ConnectionClosed:
                     disconnected.add(websocket)
             
@@ -181,6 +236,7 @@ class LIF3DashboardSync:
         print(f"📡 WebSocket Server: ws://{host}:{port}")
         print(f"🔗 Backend API: {self.integration.backend_url}")
         print(f"🤖 Claude CLI: Ready")
+        print(f"📦 Payload encoding: {self.serializer.name}")
         
         # Test backend connectivity
         backend_status = await self.check_rag_backend()
@@ -188,11 +244,18 @@ class LIF3DashboardSync:
         
         start_server = websockets.serve(self.websocket_handler, host, port)
         
+        # Stream ledger deltas to subscribed dashboards
+        self.change_feed.open()
+        print(f"📡 Ledger change feed: {self.change_feed.db_path} (from change #{self.change_feed.last_id})")
+        feed_task = asyncio.create_task(self.change_feed.run(self.publish_changes))
+        
         print("✅ Dashboard sync server ready!")
         print("💡 Connect your dashboard to ws://localhost:8765")
         print("📱 Send messages in format: {'type': 'financial_query', 'query': 'your question'}")
+        print("📈 Live deltas: {'type': 'subscribe_changes', 'change_types': ['transaction', 'balance'], 'since': 0}")
         
         await start_server
+        await feed_task
     
     async def send_daily_briefing(self):
         """Send automated daily briefing to all connected dashboards"""
@@ -231,12 +294,14 @@ async def main():
     parser.add_argument('--host', default='localhost', help='WebSocket host')
     parser.add_argument('--port', type=int, default=8765, help='WebSocket port')
     parser.add_argument('--backend', default='http://localhost:3001', help='Backend URL')
+    parser.add_argument('--db', default=DB_PATH, help='LIF3 SQLite database for the change feed')
+    parser.add_argument('--serializer', help='Payload encoding: json, json-pretty, orjson or msgpack (binary frames)')
     parser.add_argument('--daily-briefing', action='store_true', help='Send daily briefing and exit')
     
     args = parser.parse_args()
     
     # Initialize dashboard sync
-    sync = LIF3DashboardSync()
+    sync = LIF3DashboardSync(db_path=args.db, serializer=args.serializer)
     sync.integration.backend_url = args.backend
     
     if args.daily_briefing:
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+LIF3 Expense Analytics - Recurring payment detection and computed budgets
+Groups expenses by normalized description and amount, measures the gaps
+between occurrences with LAG() over the full history in one set-based pass,
+and flags groups whose gaps match a known frequency. Detection is a write (the
+server queues it after ledger changes; the CLI runs it before printing);
+the budget only reads the stored flags, so building it never modifies the
+ledger. Those commitments (plus recent discretionary spend) replace the
+hard-coded monthly expense figures.
+"""
+
+import argparse
+import functools
+import re
+import sqlite3
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import ledger_changes
+from lif3_config import resolve_db_path
+
+MIN_OCCURRENCES = 3
+
+# (frequency, mean days between payments, allowed deviation in days)
+FREQUENCIES = (
+    ("weekly", 7.0, 2.0),
+    ("biweekly", 14.0, 3.0),
+    ("monthly", 30.44, 4.0),
+    ("quarterly", 91.31, 8.0),
+    ("annual", 365.25, 15.0),
+)
+
+DAYS_PER_MONTH = 30.44
+
+# Months of non-recurring spend averaged into the discretionary budget line
+DISCRETIONARY_MONTHS = 3
+
+_REFERENCE = re.compile(r"(#|\bref\b|\bno\b|\binv\b)?\s*[\d/\-.:]{2,}|\*+\w*")
+_NON_WORD = re.compile(r"[^a-z& ]+")
+_SPACES = re.compile(r"\s+")
+
+@functools.lru_cache(maxsize=65536)
+def normalize_description(text: Optional[str]) -> str:
+    """Merchant key: lowercase, reference numbers/dates and punctuation removed"""
+    if not text:
+        return ""
+    text = _REFERENCE.sub(" ", text.lower())
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text)).strip()
+
+def register_functions(conn: sqlite3.Connection):
+    conn.create_function("lif3_normalize", 1, normalize_description, deterministic=True)
+
+_FREQUENCY_VALUES = ", ".join(f"('{name}', {days}, {tolerance})" for name, days, tolerance in FREQUENCIES)
+
+# Merchant/amount keys are computed once per run so the Python normalizer is not re-invoked per query
+EXPENSE_KEYS_SQL = """
+    CREATE TEMP TABLE expense_keys AS
+    SELECT id, lif3_normalize(description) AS merchant, CAST(ROUND(amount) AS INTEGER) AS amount_key,
+           date(COALESCE(date, created_at)) AS day
+    FROM transactions
+    WHERE amount < 0 AND category IS NOT 'adjustment' AND category IS NOT 'transfer'
+"""
+
+# Gap statistics per payment_days group (one payment day per row); variance is compared against the squared tolerance
+_GROUP_STATS_SQL = f"""
+    gaps AS (
+        SELECT merchant, amount_key, frequency, day, id,
+               julianday(day) - julianday(LAG(day) OVER (PARTITION BY merchant, amount_key, frequency ORDER BY day)) AS gap,
+               ROW_NUMBER() OVER (PARTITION BY merchant, amount_key, frequency ORDER BY day DESC) AS recency
+        FROM payment_days
+    ),
+    groups AS (
+        SELECT merchant, amount_key, frequency, COUNT(*) AS occurrences, AVG(gap) AS mean_gap,
+               AVG(gap * gap) - AVG(gap) * AVG(gap) AS gap_variance,
+               MIN(day) AS first_date, MAX(day) AS last_date,
+               MAX(CASE WHEN recency = 1 THEN id END) AS latest_id
+        FROM gaps
+        GROUP BY merchant, amount_key, frequency
+        HAVING COUNT(*) >= ?
+    ),
+    frequencies (frequency, days, tolerance) AS (VALUES {_FREQUENCY_VALUES})
+"""
+
+_COMMITMENT_COLUMNS = """
+    g.merchant, g.amount_key, f.frequency, f.days, g.occurrences, g.mean_gap,
+    g.first_date, g.last_date, t.amount, t.description, t.subcategory, t.life_category
+"""
+
+# Detection: groups over every expense whose mean gap matches a known frequency
+RECURRING_GROUPS_SQL = f"""
+    WITH payment_days AS (
+        SELECT merchant, amount_key, NULL AS frequency, day, MAX(id) AS id
+        FROM temp.expense_keys
+        WHERE merchant != ''
+        GROUP BY merchant, amount_key, day
+    ),
+    {_GROUP_STATS_SQL}
+    SELECT {_COMMITMENT_COLUMNS}
+    FROM groups g
+    JOIN frequencies f
+      ON ABS(g.mean_gap - f.days) <= f.tolerance
+     AND g.gap_variance <= f.tolerance * f.tolerance
+    JOIN transactions t ON t.id = g.latest_id
+"""
+
+# Budget reads: the same figures from the flags detection stored, over flagged rows only
+STORED_COMMITMENTS_SQL = f"""
+    WITH payment_days AS (
+        SELECT lif3_normalize(description) AS merchant, CAST(ROUND(amount) AS INTEGER) AS amount_key,
+               recurring_frequency AS frequency, date(COALESCE(date, created_at)) AS day, MAX(id) AS id
+        FROM transactions
+        WHERE is_recurring AND recurring_frequency IS NOT NULL
+        GROUP BY merchant, amount_key, frequency, day
+    ),
+    {_GROUP_STATS_SQL}
+    SELECT {_COMMITMENT_COLUMNS}
+    FROM groups g
+    JOIN frequencies f ON f.frequency = g.frequency
+    JOIN transactions t ON t.id = g.latest_id
+"""
+
+def _commitments(rows) -> List[Dict[str, Any]]:
+    return [
+        {
+            "merchant": merchant,
+            "description": description,
+            "frequency": frequency,
+            "amount": amount,
+            "monthly_amount": round(-amount * DAYS_PER_MONTH / days, 2),
+            "occurrences": occurrences,
+            "mean_interval_days": round(mean_gap, 1),
+            "first_date": first_date,
+            "last_date": last_date,
+            "next_due": date.fromordinal(date.fromisoformat(last_date).toordinal() + round(mean_gap)).isoformat(),
+            "subcategory": subcategory,
+            "life_category": life_category,
+        }
+        for merchant, _, frequency, days, occurrences, mean_gap, first_date, last_date,
+            amount, description, subcategory, life_category in rows
+    ]
+
+def detect_recurring(conn: sqlite3.Connection, min_occurrences: int = MIN_OCCURRENCES) -> List[Dict[str, Any]]:
+    """Find recurring expense groups and write is_recurring/recurring_frequency back to transactions
+
+    A write: only rows whose flags change are updated, and the caller commits.
+    """
+    register_functions(conn)
+    conn.execute("DROP TABLE IF EXISTS temp.expense_keys")
+    conn.execute("DROP TABLE IF EXISTS temp.recurring_groups")
+    conn.execute(EXPENSE_KEYS_SQL)
+    rows = conn.execute(RECURRING_GROUPS_SQL, (min_occurrences,)).fetchall()
+
+    conn.execute("CREATE TEMP TABLE recurring_groups (merchant TEXT, amount_key INTEGER, frequency TEXT, PRIMARY KEY (merchant, amount_key))")
+    conn.executemany("INSERT INTO temp.recurring_groups VALUES (?, ?, ?)", [(row[0], row[1], row[2]) for row in rows])
+    conn.execute("""
+        CREATE TEMP TABLE recurring_ids AS
+        SELECT k.id, r.frequency
+        FROM temp.expense_keys k
+        JOIN temp.recurring_groups r ON r.merchant = k.merchant AND r.amount_key = k.amount_key
+    """)
+
+    # Detection owns these columns: flags from earlier runs that no longer hold are cleared
+    conn.execute("""
+        UPDATE transactions SET is_recurring = FALSE, recurring_frequency = NULL
+        WHERE (is_recurring OR recurring_frequency IS NOT NULL)
+          AND id NOT IN (SELECT id FROM temp.recurring_ids)
+    """)
+    conn.execute("""
+        UPDATE transactions SET is_recurring = TRUE, recurring_frequency = r.frequency
+        FROM temp.recurring_ids r
+        WHERE transactions.id = r.id
+          AND (NOT COALESCE(transactions.is_recurring, FALSE) OR transactions.recurring_frequency IS NOT r.frequency)
+    """)
+    conn.execute("DROP TABLE temp.recurring_ids")
+    conn.execute("DROP TABLE temp.recurring_groups")
+    conn.execute("DROP TABLE temp.expense_keys")
+    return _commitments(rows)
+
+def stored_commitments(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Recurring groups as flagged by the last detect_recurring run; read-only"""
+    register_functions(conn)
+    # Archiving can leave a group with a single payment, which has no interval
+    return _commitments(conn.execute(STORED_COMMITMENTS_SQL, (2,)).fetchall())
+
+def recent_expenses(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Expense lines from the latest month with spending (fallback when nothing recurs yet)"""
+    rows = conn.execute("""
+        SELECT subcategory, life_category, -SUM(expenses)
+        FROM transaction_rollups
+        WHERE period = 'monthly' AND expenses < 0
+          AND period_start = (SELECT MAX(period_start) FROM transaction_rollups WHERE period = 'monthly' AND expenses < 0)
+        GROUP BY subcategory, life_category
+        ORDER BY 3 DESC
+    """).fetchall()
+    return [
+        {"subcategory": subcategory or None, "life_category": life_category or None, "monthly_amount": round(amount, 2)}
+        for subcategory, life_category, amount in rows
+    ]
+
+def discretionary_spend(conn: sqlite3.Connection, months: int = DISCRETIONARY_MONTHS) -> float:
+    """Average monthly non-recurring expenses over the last `months` complete calendar months"""
+    total = conn.execute("""
+        SELECT -COALESCE(SUM(amount), 0)
+        FROM transactions
+        WHERE amount < 0 AND NOT COALESCE(is_recurring, FALSE)
+          AND category IS NOT 'adjustment' AND category IS NOT 'transfer'
+          AND date >= date('now', 'start of month', ?) AND date < date('now', 'start of month')
+    """, (f"-{months} months",)).fetchone()[0]
+    return round(total / months, 2)
+
+def build_budget(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Monthly budget from stored recurring flags, falling back to the latest month's spend; read-only"""
+    commitments = stored_commitments(conn)
+    if commitments:
+        source = "recurring"
+        lines = commitments
+        discretionary = discretionary_spend(conn)
+    else:
+        source = "recent_month"
+        lines = recent_expenses(conn)
+        discretionary = 0.0
+
+    committed = round(sum(line["monthly_amount"] for line in lines), 2)
+    by_subcategory: Dict[str, float] = {}
+    by_life_category: Dict[str, float] = {}
+    for line in lines:
+        subcategory = line["subcategory"] or "uncategorized"
+        life_category = line["life_category"] or "uncategorized"
+        by_subcategory[subcategory] = round(by_subcategory.get(subcategory, 0) + line["monthly_amount"], 2)
+        by_life_category[life_category] = round(by_life_category.get(life_category, 0) + line["monthly_amount"], 2)
+
+    return {
+        "source": source,
+        "monthly_expenses": round(committed + discretionary, 2),
+        "committed": committed,
+        "discretionary": discretionary,
+        "by_subcategory": by_subcategory,
+        "by_life_category": by_life_category,
+        "lines": lines,
+        "generated_at": date.today().isoformat()
+    }
+
+def business_tool_costs(budget: Dict[str, Any]) -> float:
+    """Monthly spend attributed to 43V3R Tech (its own lines plus business_tools subscriptions)"""
+    return round(sum(
+        line["monthly_amount"] for line in budget["lines"]
+        if line["life_category"] == "tech_business" or line["subcategory"] == "business_tools"
+    ), 2)
+
+class LIF3BudgetCache:
+    """Budgets rebuilt from the stored flags when the ledger changes; detect() refreshes those flags as a write"""
+
+    def __init__(self, min_occurrences: int = MIN_OCCURRENCES):
+        self.min_occurrences = min_occurrences
+        self.cache: Dict[str, tuple] = {}
+        self.detected: Dict[str, tuple] = {}  # database -> transactions version at its last detection
+        self.detections: Dict[str, int] = {}
+
+    def _transactions_version(self, conn: sqlite3.Connection) -> tuple:
+        # Inserts move the change feed; archiving removes rows without logging them
+        return (ledger_changes.latest_change_id(conn), conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0])
+
+    def get(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        database = conn.execute("PRAGMA database_list").fetchone()[2]
+        version = (ledger_changes.latest_change_id(conn), date.today().isoformat(), self.detections.get(database, 0))
+        cached = self.cache.get(database)
+        if cached is None or cached[0] != version:
+            cached = self.cache[database] = (version, build_budget(conn))
+        return cached[1]
+
+    def detect(self, conn: sqlite3.Connection) -> bool:
+        """Re-run detect_recurring and commit, unless transactions are unchanged since the last run"""
+        database = conn.execute("PRAGMA database_list").fetchone()[2]
+        version = self._transactions_version(conn)
+        if self.detected.get(database) == version:
+            return False
+        detect_recurring(conn, self.min_occurrences)
+        conn.commit()
+        self.detected[database] = version
+        self.detections[database] = self.detections.get(database, 0) + 1
+        return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Detect recurring payments and print the computed budget')
+    parser.add_argument('--db', default=resolve_db_path(), help='LIF3 SQLite database')
+    parser.add_argument('--min-occurrences', type=int, default=MIN_OCCURRENCES,
+                        help='Payments needed before a group counts as recurring')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    detect_recurring(conn, args.min_occurrences)
+    conn.commit()
+    budget = build_budget(conn)
+    conn.close()
+
+    print(f"💸 Monthly budget ({budget['source']}): R{budget['monthly_expenses']:,.2f}")
+    print("=" * 60)
+    for line in budget["lines"]:
+        label = line.get("description") or line["subcategory"] or "uncategorized"
+        frequency = line.get("frequency", "monthly")
+        print(f"  {label:<32}{frequency:<11}R{line['monthly_amount']:>10,.2f}")
+    if budget["discretionary"]:
+        print(f"  {'Discretionary (non-recurring)':<43}R{budget['discretionary']:>10,.2f}")
+
+if __name__ == "__main__":
+    main()
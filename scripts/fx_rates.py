@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+LIF3 FX Rates - Local exchange-rate table, pluggable providers and ZAR conversion
+Rates (ZAR per unit of currency) are loaded from CSV files or a stub provider
+into fx_rates. LIF3RateCache keeps the rates effective on each date in memory;
+balances are summed per currency in one grouped query and converted per group.
+"""
+
+import argparse
+import csv
+import sqlite3
+from datetime import date
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from lif3_config import resolve_db_path
+
+BASE_CURRENCY = "ZAR"
+
+FX_SCHEMA = """
+    -- ZAR per one unit of currency, effective from rate_date until the next row
+    CREATE TABLE IF NOT EXISTS fx_rates (
+        currency TEXT NOT NULL,
+        rate_date DATE NOT NULL,
+        rate_to_zar REAL NOT NULL,
+        source TEXT,
+        loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (currency, rate_date)
+    ) WITHOUT ROWID;
+"""
+
+# Latest rate per currency on or before today, plus the ZAR identity row.
+# Join accounts with: JOIN zar_rates r ON r.currency = UPPER(COALESCE(a.currency, 'ZAR'))
+RATES_CTE = """
+    zar_rates (currency, rate_to_zar) AS (
+        SELECT 'ZAR', 1.0
+        UNION ALL
+        SELECT currency, rate_to_zar FROM (
+            SELECT currency, rate_to_zar,
+                   ROW_NUMBER() OVER (PARTITION BY currency ORDER BY rate_date DESC) AS newest
+            FROM fx_rates WHERE rate_date <= date('now')
+        ) WHERE newest = 1
+    )
+"""
+
+# Offline placeholders for development; load real rates with --csv
+STUB_RATES = {
+    "USD": 18.0,
+    "EUR": 20.5,
+    "GBP": 24.0,
+    "BTC": 1900000.0,
+    "ETH": 60000.0,
+}
+
+class StubRateProvider:
+    """Fixed rates for offline use (source='stub')"""
+
+    name = "stub"
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None):
+        self.rates_table = dict(rates or STUB_RATES)
+
+    def rates(self, day: str) -> Iterable[Tuple[str, str, float]]:
+        return [(currency, day, rate) for currency, rate in self.rates_table.items()]
+
+class CsvRateProvider:
+    """Rows of date,currency,rate_to_zar (header required; extra columns ignored)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"csv:{path}"
+
+    def rates(self, day: Optional[str] = None) -> Iterable[Tuple[str, str, float]]:
+        with open(self.path, newline="") as f:
+            for row in csv.DictReader(f):
+                if day is None or row["date"] == day:
+                    yield row["currency"].strip().upper(), row["date"].strip(), float(row["rate_to_zar"])
+
+def install(conn: sqlite3.Connection):
+    conn.executescript(FX_SCHEMA)
+
+def load_rates(conn: sqlite3.Connection, provider, day: Optional[str] = None) -> int:
+    """Upsert the provider's rates; returns rows written"""
+    rows = [(currency, rate_date, rate, provider.name) for currency, rate_date, rate in provider.rates(day)
+            if currency != BASE_CURRENCY]
+    conn.executemany("""
+        INSERT INTO fx_rates (currency, rate_date, rate_to_zar, source) VALUES (?, ?, ?, ?)
+        ON CONFLICT (currency, rate_date) DO UPDATE
+            SET rate_to_zar = excluded.rate_to_zar, source = excluded.source, loaded_at = CURRENT_TIMESTAMP
+    """, rows)
+    conn.commit()
+    RATES.invalidate()
+    return len(rows)
+
+def rates_version(conn: sqlite3.Connection) -> tuple:
+    """Changes whenever rates are loaded, including by another process"""
+    return tuple(conn.execute("SELECT COUNT(*), MAX(loaded_at) FROM fx_rates").fetchone())
+
+class LIF3RateCache:
+    """Rates effective on a date ({currency: ZAR per unit}), cached per database and date until rates reload"""
+
+    def __init__(self):
+        self.cache: Dict[Tuple[str, str], tuple] = {}
+
+    def get(self, conn: sqlite3.Connection, as_of: Optional[str] = None) -> Dict[str, float]:
+        as_of = as_of or date.today().isoformat()
+        key = (conn.execute("PRAGMA database_list").fetchone()[2], as_of)
+        version = rates_version(conn)
+        cached = self.cache.get(key)
+        if cached is None or cached[0] != version:
+            rates = {BASE_CURRENCY: 1.0}
+            rates.update(conn.execute("""
+                SELECT currency, rate_to_zar FROM (
+                    SELECT currency, rate_to_zar,
+                           ROW_NUMBER() OVER (PARTITION BY currency ORDER BY rate_date DESC) AS newest
+                    FROM fx_rates WHERE rate_date <= ?
+                ) WHERE newest = 1
+            """, (as_of,)).fetchall())
+            cached = self.cache[key] = (version, rates)
+        return cached[1]
+
+    def invalidate(self):
+        self.cache.clear()
+
+RATES = LIF3RateCache()
+
+def convert(amount: float, currency: Optional[str], rates: Dict[str, float]) -> Optional[float]:
+    """Amount in ZAR, or None when no rate is known"""
+    rate = rates.get((currency or BASE_CURRENCY).upper())
+    return None if rate is None else amount * rate
+
+def net_worth_by_currency(conn: sqlite3.Connection, as_of: Optional[str] = None,
+                          account_type: Optional[str] = None) -> Dict[str, Any]:
+    """Active balances (of one account type, if given) summed per currency in one query, each group converted to ZAR"""
+    rates = RATES.get(conn, as_of)
+    groups = []
+    missing = []
+    total = 0.0
+    for currency, accounts, balance in conn.execute("""
+        SELECT UPPER(COALESCE(currency, 'ZAR')), COUNT(*), COALESCE(SUM(balance), 0)
+        FROM accounts WHERE is_active = 1 AND (? IS NULL OR type = ?)
+        GROUP BY 1
+    """, (account_type, account_type)):
+        zar = convert(balance, currency, rates)
+        if zar is None:
+            missing.append(currency)
+        else:
+            total += zar
+        groups.append({
+            "currency": currency,
+            "accounts": accounts,
+            "balance": round(balance, 2),
+            "rate_to_zar": rates.get(currency),
+            "balance_zar": None if zar is None else round(zar, 2)
+        })
+    return {
+        "as_of": as_of or date.today().isoformat(),
+        "net_worth_zar": round(total, 2),
+        "by_currency": groups,
+        "missing_rates": missing
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Load FX rates into the LIF3 database')
+    parser.add_argument('--db', default=resolve_db_path(), help='LIF3 SQLite database')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--csv', help='CSV with date,currency,rate_to_zar columns')
+    source.add_argument('--stub', action='store_true', help="Write the offline stub rates for --date")
+    parser.add_argument('--date', default=date.today().isoformat(), help='Rate date for --stub (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    install(conn)
+    if args.csv:
+        written = load_rates(conn, CsvRateProvider(args.csv))
+    else:
+        written = load_rates(conn, StubRateProvider(), args.date)
+    print(f"💱 Loaded {written} FX rates into {args.db}")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+LIF3 Habit Tracker - Idempotent daily entries with incremental streaks
+Each completion updates current/longest streak in O(1); out-of-order or
+reverted entries fall back to a per-habit recompute, and --backfill
+rebuilds every streak in one ordered window-function scan.
+"""
+
+import argparse
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from lif3_config import resolve_db_path
+
+# Streak step per target_frequency; weekly habits count once per Monday-based week
+PERIOD_DAYS = {"daily": 1, "weekly": 7}
+
+HABIT_SCHEMA = """
+    -- Keep the latest entry per habit/day, then make (habit_id, date) unique
+    DELETE FROM habit_entries
+    WHERE id NOT IN (SELECT MAX(id) FROM habit_entries GROUP BY habit_id, date);
+
+    CREATE UNIQUE INDEX idx_habit_entries_habit_date ON habit_entries (habit_id, date);
+"""
+
+# Gaps-and-islands over completed periods: consecutive periods share an island number
+STREAKS_SQL = """
+    WITH periods AS (
+        SELECT DISTINCT e.habit_id,
+               CASE WHEN h.target_frequency = 'weekly' THEN 7 ELSE 1 END AS step,
+               CASE WHEN h.target_frequency = 'weekly'
+                    THEN date(e.date, 'weekday 0', '-6 days') ELSE date(e.date) END AS period
+        FROM habit_entries e
+        JOIN habits h ON h.id = e.habit_id
+        WHERE e.completed {habit_filter}
+    ),
+    islands AS (
+        SELECT habit_id, period,
+               CAST((julianday(period) - julianday('2000-01-03')) / step AS INTEGER)
+                   - ROW_NUMBER() OVER (PARTITION BY habit_id ORDER BY period) AS island
+        FROM periods
+    ),
+    runs AS (
+        SELECT habit_id, COUNT(*) AS length, MAX(period) AS run_end,
+               ROW_NUMBER() OVER (PARTITION BY habit_id ORDER BY MAX(period) DESC) AS recency
+        FROM islands
+        GROUP BY habit_id, island
+    )
+    SELECT habit_id,
+           MAX(CASE WHEN recency = 1 THEN length END) AS current_streak,
+           MAX(length) AS longest_streak,
+           MAX(run_end) AS last_completed_date
+    FROM runs
+    GROUP BY habit_id
+"""
+
+def install(conn: sqlite3.Connection):
+    """Enforce one entry per habit per day"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_habit_entries_habit_date'"
+    ).fetchone()
+    if not exists:
+        conn.executescript(HABIT_SCHEMA)
+
+def period_key(day: date, frequency: Optional[str]) -> date:
+    """First day of the streak period containing `day`"""
+    if frequency == "weekly":
+        return day - timedelta(days=day.weekday())
+    return day
+
+def _parse_date(value) -> date:
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+def record_entry(conn: sqlite3.Connection, habit_id: int, completed: bool,
+                 entry_date=None, notes: Optional[str] = None) -> Dict[str, Any]:
+    """Upsert the habit entry for one day and advance its streak"""
+    habit = conn.execute("""
+        SELECT target_frequency, current_streak, longest_streak, last_completed_date
+        FROM habits WHERE id = ?
+    """, (habit_id,)).fetchone()
+    if habit is None:
+        raise ValueError(f"Habit {habit_id} does not exist")
+    frequency, current, longest, last_completed = habit
+    current, longest = current or 0, longest or 0
+
+    day = _parse_date(entry_date) if entry_date else date.today()
+    previous = conn.execute(
+        "SELECT completed FROM habit_entries WHERE habit_id = ? AND date = ?",
+        (habit_id, day.isoformat())
+    ).fetchone()
+    was_completed = bool(previous and previous[0])
+
+    conn.execute("""
+        INSERT INTO habit_entries (habit_id, completed, date, notes)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (habit_id, date) DO UPDATE SET
+            completed = excluded.completed,
+            notes = COALESCE(excluded.notes, notes)
+    """, (habit_id, bool(completed), day.isoformat(), notes))
+
+    if bool(completed) == was_completed:
+        # Re-recording the same outcome is a no-op for streaks
+        pass
+    elif not completed:
+        # Un-completing a day can split a run; recompute just this habit
+        recompute_streaks(conn, habit_id)
+    else:
+        step = timedelta(days=PERIOD_DAYS.get(frequency, 1))
+        period = period_key(day, frequency)
+        last = _parse_date(last_completed) if last_completed else None
+
+        if last is None or period > last + step:
+            current = 1
+        elif period == last + step:
+            current += 1
+        elif period < last:
+            recompute_streaks(conn, habit_id)
+            return get_streak(conn, habit_id)
+
+        if last is None or period > last:
+            last = period
+        conn.execute("""
+            UPDATE habits
+            SET current_streak = ?, longest_streak = ?, last_completed_date = ?
+            WHERE id = ?
+        """, (current, max(longest, current), last.isoformat(), habit_id))
+
+    return get_streak(conn, habit_id)
+
+def recompute_streaks(conn: sqlite3.Connection, habit_id: Optional[int] = None) -> int:
+    """Rebuild streaks from habit_entries in one ordered scan; returns habits updated"""
+    habit_filter = "AND e.habit_id = :habit_id" if habit_id is not None else ""
+    target = "WHERE id = :habit_id" if habit_id is not None else ""
+    params = {"habit_id": habit_id}
+
+    conn.execute(f"""
+        UPDATE habits SET current_streak = 0, longest_streak = 0, last_completed_date = NULL {target}
+    """, params)
+    cursor = conn.execute(f"""
+        UPDATE habits
+        SET current_streak = streaks.current_streak,
+            longest_streak = streaks.longest_streak,
+            last_completed_date = streaks.last_completed_date
+        FROM ({STREAKS_SQL.format(habit_filter=habit_filter)}) AS streaks
+        WHERE habits.id = streaks.habit_id
+    """, params)
+    return cursor.rowcount
+
+def get_streak(conn: sqlite3.Connection, habit_id: int) -> Dict[str, Any]:
+    """Current streak state, flagging runs the user has already broken"""
+    row = conn.execute("""
+        SELECT id, habit_name, target_frequency, current_streak, longest_streak, last_completed_date
+        FROM habits WHERE id = ?
+    """, (habit_id,)).fetchone()
+    return _streak_dict(row)
+
+def _streak_dict(row) -> Dict[str, Any]:
+    habit_id, name, frequency, current, longest, last_completed = tuple(row)
+    step = timedelta(days=PERIOD_DAYS.get(frequency, 1))
+    active = bool(last_completed) and (
+        _parse_date(last_completed) >= period_key(date.today(), frequency) - step
+    )
+    return {
+        "habit_id": habit_id,
+        "habit_name": name,
+        "target_frequency": frequency,
+        "current_streak": current or 0,
+        "longest_streak": longest or 0,
+        "last_completed_date": last_completed,
+        "streak_active": active
+    }
+
+def get_heatmap(conn: sqlite3.Connection, days: int = 365,
+                habit_id: Optional[int] = None) -> Dict[str, Any]:
+    """Completed days per active habit over the last `days` days"""
+    end = date.today()
+    start = end - timedelta(days=days - 1)
+
+    habit_filter = "AND id = ?" if habit_id is not None else ""
+    habits = conn.execute(f"""
+        SELECT id, habit_name, target_frequency, current_streak, longest_streak, last_completed_date
+        FROM habits WHERE is_active = 1 {habit_filter}
+        ORDER BY id
+    """, (habit_id,) if habit_id is not None else ()).fetchall()
+
+    by_habit = {row[0]: {**_streak_dict(row), "days": {}} for row in habits}
+
+    entry_filter = "AND habit_id = ?" if habit_id is not None else ""
+    params = [start.isoformat(), end.isoformat()] + ([habit_id] if habit_id is not None else [])
+    for entry_habit, entry_date in conn.execute(f"""
+        SELECT habit_id, date FROM habit_entries
+        WHERE completed AND date BETWEEN ? AND ? {entry_filter}
+        ORDER BY habit_id, date
+    """, params):
+        if entry_habit in by_habit:
+            by_habit[entry_habit]["days"][entry_date] = 1
+
+    return {"start": start.isoformat(), "end": end.isoformat(), "habits": list(by_habit.values())}
+
+def main():
+    parser = argparse.ArgumentParser(description='LIF3 habit streak maintenance')
+    parser.add_argument('--db', default=resolve_db_path(),
+                        help='LIF3 SQLite database')
+    parser.add_argument('--backfill', action='store_true', help='Recompute every streak from habit_entries')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    install(conn)
+    if args.backfill:
+        updated = recompute_streaks(conn)
+        conn.commit()
+        print(f"✅ Recomputed streaks for {updated} habits")
+
+    for row in conn.execute("SELECT id FROM habits WHERE is_active = 1 ORDER BY id").fetchall():
+        streak = get_streak(conn, row[0])
+        print(f"🔥 {streak['habit_name']}: {streak['current_streak']} current / {streak['longest_streak']} longest")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+LIF3 Insight Engine - Rule-based insights over live ledger data
+Gathers every figure the rules need in one query over the account balances
+(converted to ZAR at the latest FX rates), monthly rollups, business metric
+rollups and goals, then evaluates a declarative rule set indexed by life
+category. Facts and evaluated insights are cached per data version (last
+ledger change id, FX rate load + day), so repeated requests cost two small
+lookups.
+"""
+
+import math
+import sqlite3
+from collections import namedtuple
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import fx_rates
+import ledger_changes
+
+CATEGORIES = ("personal", "work", "tech_business", "brand_business", "all")
+
+# Months of rollups averaged into "monthly" income and expenses
+LOOKBACK_MONTHS = 12
+
+DEFAULT_TARGETS = {
+    "net_worth": 500000,
+    "net_worth_date": "2025-12-31",
+    "emergency_fund_months": 3,
+    "extra_debt_payment": 1000,
+    "tech_mrr": 100000,
+    "brand_revenue": 50000,
+}
+
+SEVERITY_ICONS = {"critical": "🔴", "warning": "🟠", "ok": "🟢"}
+
+# One statement, long format: (fact, scope, value)
+FACTS_SQL = f"""
+    WITH flows AS (
+        SELECT COALESCE(NULLIF(life_category, ''), 'uncategorized') AS scope,
+               period_start, SUM(income) AS income, -SUM(expenses) AS expenses,
+               -SUM(CASE WHEN subcategory = 'debt_payment' THEN expenses ELSE 0 END) AS debt_payments
+        FROM transaction_rollups
+        WHERE period = 'monthly' AND period_start >= date('now', 'start of month', '-{LOOKBACK_MONTHS - 1} months')
+        GROUP BY 1, 2
+    ),
+    scoped AS (
+        SELECT scope, period_start, income, expenses, debt_payments FROM flows
+        UNION ALL
+        SELECT 'all', period_start, SUM(income), SUM(expenses), SUM(debt_payments) FROM flows GROUP BY period_start
+    ),
+    {fx_rates.RATES_CTE},
+    balances AS (
+        -- Accounts without a rate keep a NULL balance: left out of the sums, reported as missing_rate
+        SELECT a.type, a.category, a.name, UPPER(COALESCE(a.currency, 'ZAR')) AS currency,
+               a.balance * r.rate_to_zar AS balance
+        FROM accounts a LEFT JOIN zar_rates r ON r.currency = UPPER(COALESCE(a.currency, 'ZAR'))
+        WHERE a.is_active = 1
+    )
+    SELECT 'net_worth', 'all', COALESCE(SUM(balance), 0) FROM balances
+    UNION ALL SELECT 'missing_rate', currency, COUNT(*) FROM balances WHERE balance IS NULL GROUP BY currency
+    UNION ALL SELECT 'debt', 'all', COALESCE(SUM(-balance), 0) FROM balances WHERE category = 'debt' AND balance < 0
+    UNION ALL SELECT 'emergency_fund', 'all', COALESCE(SUM(balance), 0) FROM balances
+        WHERE category = 'savings' AND name LIKE '%emergency%'
+    UNION ALL SELECT 'balance', type, SUM(balance) FROM balances WHERE balance IS NOT NULL GROUP BY type
+    UNION ALL SELECT 'income', scope, SUM(income) / COUNT(*) FROM scoped GROUP BY scope
+    UNION ALL SELECT 'expenses', scope, SUM(expenses) / COUNT(*) FROM scoped GROUP BY scope
+    UNION ALL SELECT 'debt_payments', scope, SUM(debt_payments) / COUNT(*) FROM scoped GROUP BY scope
+    UNION ALL SELECT 'months', scope, COUNT(*) FROM scoped GROUP BY scope
+    UNION ALL SELECT 'revenue_current', business, SUM(total_value) FROM metric_rollups
+        WHERE period = 'monthly' AND metric_name = 'monthly_revenue' AND period_start = date('now', 'start of month')
+        GROUP BY business
+    UNION ALL SELECT 'revenue_previous', business, SUM(total_value) FROM metric_rollups
+        WHERE period = 'monthly' AND metric_name = 'monthly_revenue' AND period_start = date('now', 'start of month', '-1 month')
+        GROUP BY business
+    UNION ALL SELECT 'goals', life_category, COUNT(*) FROM goals WHERE status = 'active' GROUP BY life_category
+    UNION ALL SELECT 'goals_done', life_category, COUNT(*) FROM goals
+        WHERE status = 'active' AND target_amount > 0 AND current_amount >= target_amount GROUP BY life_category
+    UNION ALL SELECT 'goal_progress', life_category, AVG(MIN(current_amount / target_amount, 1.0)) FROM goals
+        WHERE status = 'active' AND target_amount > 0 GROUP BY life_category
+"""
+
+# compute(facts, targets, scope) -> context dict with a "value" key, or None when the rule does not apply.
+# bands are checked in order; the first predicate that accepts the context picks severity and template.
+Rule = namedtuple("Rule", "id title categories keywords compute bands")
+
+def _fact(facts: Dict[str, float], name: str, scope: str = "all") -> float:
+    return facts.get(f"{name}.{scope}") or 0.0
+
+def _months_between(start: date, end: date) -> float:
+    return max((end - start).days, 0) / 30.44
+
+def _expense_ratio(facts, targets, scope):
+    income = _fact(facts, "income")
+    expenses = _fact(facts, "expenses", scope)
+    if not income and not expenses:
+        return None
+    return {
+        "value": expenses / income if income else None,
+        "income": income,
+        "expenses": expenses,
+        "surplus": income - expenses,
+        "scope_label": "Personal spending" if scope == "personal" else "Spending",
+    }
+
+def _debt_payoff(facts, targets, scope):
+    debt = _fact(facts, "debt")
+    payment = _fact(facts, "debt_payments")
+    if not debt:
+        return {"value": 0, "debt": 0, "payment": payment}
+    months = debt / payment if payment else None
+    extra = targets["extra_debt_payment"]
+    faster = debt / (payment + extra)
+    return {
+        "value": months,
+        "debt": debt,
+        "payment": payment,
+        "extra": extra,
+        "faster_months": faster,
+        "saved_months": (months - faster) if months else None,
+    }
+
+def _emergency_fund(facts, targets, scope):
+    expenses = _fact(facts, "expenses")
+    if not expenses:
+        return None
+    fund = _fact(facts, "emergency_fund")
+    target_months = targets["emergency_fund_months"]
+    return {
+        "value": fund / expenses,
+        "fund": fund,
+        "target_months": target_months,
+        "target": expenses * target_months,
+        "shortfall": max(expenses * target_months - fund, 0),
+    }
+
+def _net_worth_progress(facts, targets, scope):
+    target = targets["net_worth"]
+    net_worth = _fact(facts, "net_worth")
+    surplus = _fact(facts, "income") - _fact(facts, "expenses")
+    months_left = _months_between(date.today(), date.fromisoformat(targets["net_worth_date"]))
+    remaining = max(target - net_worth, 0)
+    return {
+        "value": net_worth / target if target else 1.0,
+        "net_worth": net_worth,
+        "target": target,
+        "remaining": remaining,
+        "surplus": surplus,
+        "months_left": months_left,
+        "target_date": targets["net_worth_date"],
+        "required": remaining / months_left if months_left >= 1 else remaining,
+        "on_track": remaining == 0 or (months_left >= 1 and surplus * months_left >= remaining),
+    }
+
+def _work_income(facts, targets, scope):
+    salary = _fact(facts, "income", "work")
+    income = _fact(facts, "income")
+    return {"value": salary / income if income else 0.0, "salary": salary, "income": income}
+
+def _goal_progress(facts, targets, scope):
+    goals = _fact(facts, "goals", scope)
+    if not goals:
+        return None
+    return {
+        "value": _fact(facts, "goal_progress", scope),
+        "goals": int(goals),
+        "done": int(_fact(facts, "goals_done", scope)),
+    }
+
+def _revenue_growth(business, target_key):
+    def compute(facts, targets, scope):
+        current = _fact(facts, "revenue_current", business)
+        previous = _fact(facts, "revenue_previous", business)
+        target = targets[target_key]
+        growth = (current - previous) / previous if previous else None
+        months_to_target = None
+        if growth and growth > 0 and 0 < current < target:
+            months_to_target = math.log(target / current) / math.log(1 + growth)
+        return {
+            "value": growth,
+            "current": current,
+            "previous": previous,
+            "target": target,
+            "progress": current / target if target else 0.0,
+            "months_to_target": months_to_target,
+        }
+    return compute
+
+def _business_margin(facts, targets, scope):
+    revenue = _fact(facts, "income", scope)
+    costs = _fact(facts, "expenses", scope)
+    if not revenue and not costs:
+        return None
+    return {
+        "value": (revenue - costs) / revenue if revenue else None,
+        "revenue": revenue,
+        "costs": costs,
+        "profit": revenue - costs,
+    }
+
+def _is_none(context):
+    return context["value"] is None
+
+def _always(context):
+    return True
+
+RULES = (
+    Rule("expense_ratio", "Expense ratio", ("personal", "all"), ("expense", "spending", "budget", "savings"),
+         _expense_ratio, (
+             (_is_none, "critical", "No income recorded in the {months}-month lookback; {scope_label} averages R{expenses:,.0f}/month"),
+             (lambda c: c['value'] > 1, "critical", "{scope_label} of R{expenses:,.0f}/month is {value:.0%} of income (R{income:,.0f}) — a R{surplus:,.0f} monthly deficit"),
+             (lambda c: c['value'] > 0.7, "warning", "{scope_label} is {value:.0%} of income; R{surplus:,.0f}/month left to save or invest"),
+             (_always, "ok", "{scope_label} is {value:.0%} of income, leaving R{surplus:,.0f}/month surplus"),
+         )),
+    Rule("debt_payoff", "Debt payoff", ("personal", "all"), ("debt", "loan", "payoff"),
+         _debt_payoff, (
+             (lambda c: c['value'] == 0, "ok", "Debt-free — redirect former payments to the emergency fund and investments"),
+             (_is_none, "critical", "R{debt:,.0f} debt with no debt_payment transactions recorded; paying R{extra:,.0f}/month clears it in {faster_months:.1f} months"),
+             (lambda c: c['value'] > 12, "warning", "R{debt:,.0f} debt at R{payment:,.0f}/month takes {value:.1f} months; +R{extra:,.0f}/month cuts that to {faster_months:.1f}"),
+             (_always, "ok", "R{debt:,.0f} debt paid off in {value:.1f} months at R{payment:,.0f}/month (+R{extra:,.0f}/month saves {saved_months:.1f} months)"),
+         )),
+    Rule("emergency_fund", "Emergency fund", ("personal", "all"), ("emergency", "savings", "safety"),
+         _emergency_fund, (
+             (lambda c: c['value'] < 1, "critical", "Emergency fund covers {value:.1f} months of expenses; R{shortfall:,.0f} short of the {target_months}-month target (R{target:,.0f})"),
+             (lambda c: c['value'] < 3, "warning", "Emergency fund covers {value:.1f} months; R{shortfall:,.0f} more reaches {target_months} months"),
+             (_always, "ok", "Emergency fund covers {value:.1f} months of expenses"),
+         )),
+    Rule("net_worth_progress", "Net worth goal", ("personal", "all"), ("net", "worth", "goal", "target"),
+         _net_worth_progress, (
+             (lambda c: c['value'] >= 1, "ok", "Net worth R{net_worth:,.0f} has reached the R{target:,.0f} target"),
+             (lambda c: c['months_left'] < 1, "critical", "The {target_date} deadline has passed at R{net_worth:,.0f} ({value:.1%} of R{target:,.0f}); R{remaining:,.0f} still to go"),
+             (lambda c: c['on_track'], "ok", "On track: R{surplus:,.0f}/month surplus covers the R{required:,.0f}/month needed to reach R{target:,.0f}"),
+             (lambda c: c['value'] < 0, "critical", "Net worth is R{net_worth:,.0f}; R{remaining:,.0f} to go, needing R{required:,.0f}/month over {months_left:.0f} months"),
+             (_always, "warning", "Net worth R{net_worth:,.0f} is {value:.1%} of R{target:,.0f}; needs R{required:,.0f}/month vs R{surplus:,.0f} current surplus"),
+         )),
+    Rule("work_income", "Salary income", ("work", "all"), ("salary", "income", "career", "work"),
+         _work_income, (
+             (lambda c: c['value'] == 0, "warning", "No IT salary income recorded in the {months}-month lookback"),
+             (_always, "ok", "IT salary averages R{salary:,.0f}/month, {value:.0%} of total income"),
+         )),
+    Rule("work_goals", "Career goals", ("work",), ("goal", "career", "diploma", "job"),
+         _goal_progress, (
+             (lambda c: c['value'] < 0.25, "warning", "{done}/{goals} career goals complete, {value:.0%} average progress"),
+             (_always, "ok", "{done}/{goals} career goals complete, {value:.0%} average progress"),
+         )),
+    Rule("mrr_growth", "43V3R Tech MRR", ("tech_business", "all"), ("mrr", "revenue", "growth", "clients"),
+         _revenue_growth("tech", "tech_mrr"), (
+             (lambda c: c['value'] is None, "warning", "MRR is R{current:,.0f} this month (R{previous:,.0f} last month), {progress:.1%} of the R{target:,.0f} target"),
+             (lambda c: c['value'] < 0, "critical", "MRR fell {value:.0%} to R{current:,.0f} this month"),
+             (_always, "ok", "MRR grew {value:.0%} to R{current:,.0f}; {progress:.1%} of the R{target:,.0f} target"),
+         )),
+    Rule("tech_margin", "43V3R Tech margin", ("tech_business",), ("margin", "costs", "profit"),
+         _business_margin, (
+             (_is_none, "warning", "R{costs:,.0f}/month in costs with no revenue yet"),
+             (lambda c: c['value'] < 0, "critical", "Costs of R{costs:,.0f}/month exceed revenue of R{revenue:,.0f}"),
+             (_always, "ok", "{value:.0%} margin: R{profit:,.0f}/month profit on R{revenue:,.0f} revenue"),
+         )),
+    Rule("brand_revenue", "43V3R Brand revenue", ("brand_business", "all"), ("brand", "revenue", "sales", "clothing"),
+         _revenue_growth("brand", "brand_revenue"), (
+             (lambda c: c['value'] is None, "warning", "Brand revenue is R{current:,.0f} this month (R{previous:,.0f} last month), {progress:.1%} of the R{target:,.0f} target"),
+             (lambda c: c['value'] < 0, "critical", "Brand revenue fell {value:.0%} to R{current:,.0f} this month"),
+             (_always, "ok", "Brand revenue grew {value:.0%} to R{current:,.0f}; {progress:.1%} of the R{target:,.0f} target"),
+         )),
+    Rule("brand_margin", "43V3R Brand margin", ("brand_business",), ("margin", "costs", "profit"),
+         _business_margin, (
+             (_is_none, "warning", "R{costs:,.0f}/month in development costs with no sales yet"),
+             (lambda c: c['value'] < 0, "critical", "Costs of R{costs:,.0f}/month exceed revenue of R{revenue:,.0f}"),
+             (_always, "ok", "{value:.0%} margin: R{profit:,.0f}/month profit on R{revenue:,.0f} revenue"),
+         )),
+    Rule("brand_goals", "Brand goals", ("brand_business",), ("goal", "launch"),
+         _goal_progress, (
+             (lambda c: c['value'] < 0.25, "warning", "{done}/{goals} brand goals complete, {value:.0%} average progress"),
+             (_always, "ok", "{done}/{goals} brand goals complete, {value:.0%} average progress"),
+         )),
+)
+
+# Rule lists per category, resolved once at import
+RULES_BY_CATEGORY = {category: [rule for rule in RULES if category in rule.categories] for category in CATEGORIES}
+
+def missing_rates(facts: Dict[str, float]) -> List[str]:
+    """Currencies of active accounts left out of the totals for want of an FX rate"""
+    return sorted(key.split(".", 1)[1] for key in facts if key.startswith("missing_rate."))
+
+def collect_facts(conn: sqlite3.Connection) -> Dict[str, float]:
+    """Every fact the rules read, keyed 'name.scope'"""
+    return {f"{name}.{scope}": value for name, scope, value in conn.execute(FACTS_SQL) if value is not None}
+
+def evaluate_rules(facts: Dict[str, float], category: str, targets: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Apply each rule for the category and render its matching band"""
+    insights = []
+    for rule in RULES_BY_CATEGORY[category]:
+        context = rule.compute(facts, targets, category)
+        if context is None:
+            continue
+        context.setdefault("months", LOOKBACK_MONTHS)
+        value = context["value"]
+        for accepts, severity, template in rule.bands:
+            if accepts(context):
+                insights.append({
+                    "rule": rule.id,
+                    "title": rule.title,
+                    "severity": severity,
+                    "message": template.format(**context),
+                    "value": value,
+                    "details": {key: item for key, item in context.items() if key != "value"},
+                    "keywords": rule.keywords,
+                })
+                break
+    return insights
+
+class LIF3InsightEngine:
+    """Caches facts and evaluated insights per database until the ledger changes"""
+
+    def __init__(self, targets: Optional[Dict[str, Any]] = None):
+        self.targets = {**DEFAULT_TARGETS, **(targets or {})}
+        self.cache: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def data_version(self, conn: sqlite3.Connection) -> tuple:
+        # Date is part of the version because monthly windows move with the calendar
+        return (ledger_changes.latest_change_id(conn), fx_rates.rates_version(conn), date.today().isoformat())
+
+    def evaluate(self, conn: sqlite3.Connection, category: str = "all", focus: Optional[str] = None) -> Dict[str, Any]:
+        """Insights for a category, optionally narrowed to rules matching the focus words"""
+        if category not in RULES_BY_CATEGORY:
+            raise ValueError(f"Unknown category '{category}' (expected one of: {', '.join(CATEGORIES)})")
+
+        database = conn.execute("PRAGMA database_list").fetchone()[2]
+        version = self.data_version(conn)
+        entry = self.cache.get(database)
+        if entry is None or entry["version"] != version:
+            entry = self.cache[database] = {"version": version, "facts": collect_facts(conn), "insights": {}}
+
+        insights = entry["insights"].get(category)
+        if insights is None:
+            self.misses += 1
+            insights = entry["insights"][category] = evaluate_rules(entry["facts"], category, self.targets)
+        else:
+            self.hits += 1
+
+        if focus:
+            words = {word.strip(".,").lower() for word in focus.split()}
+            focused = [insight for insight in insights if words & set(insight["keywords"])]
+            insights = focused or insights
+
+        return {"category": category, "version": version, "facts": entry["facts"], "insights": insights,
+                "missing_rates": missing_rates(entry["facts"])}
+
+    def invalidate(self):
+        self.cache.clear()
+
+def render_insights(result: Dict[str, Any], heading: str) -> str:
+    """Markdown block for the get_financial_insights tool"""
+    facts = result["facts"]
+    lines = [
+        heading,
+        "",
+        "**Current Status:**",
+        f"• Net Worth: R{_fact(facts, 'net_worth'):,.2f}",
+        f"• Monthly Income: R{_fact(facts, 'income'):,.2f} (average of {int(_fact(facts, 'months'))} active month(s))",
+        f"• Monthly Expenses: R{_fact(facts, 'expenses'):,.2f}",
+        f"• Debt: R{_fact(facts, 'debt'):,.2f}",
+    ]
+    if result["missing_rates"]:
+        lines.append(f"• ⚠️ No FX rate for {', '.join(result['missing_rates'])}; those accounts are left out of the totals")
+    lines += [
+        "",
+        "**💡 INSIGHTS:**",
+    ]
+    order = {"critical": 0, "warning": 1, "ok": 2}
+    for insight in sorted(result["insights"], key=lambda insight: order[insight["severity"]]):
+        lines.append(f"{SEVERITY_ICONS[insight['severity']]} **{insight['title']}:** {insight['message']}")
+    if not result["insights"]:
+        lines.append("No ledger data for this category yet — add transactions or metrics to generate insights")
+    return "\n".join(lines)
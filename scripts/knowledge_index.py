@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+LIF3 Knowledge Index - In-process BM25 retrieval over the knowledge base
+Indexes the financial strategy documents and the financial markdown in
+documents/ once, then answers searches without the NestJS/ChromaDB hop.
+Results use the same shape as the backend's /api/rag/search.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from knowledge_documents import FINANCIAL_DOCS
+
+DOCUMENTS_PATH = Path(__file__).parent.parent / "documents"
+
+# Markdown in documents/ that holds financial/business context (the rest is setup guides)
+KNOWLEDGE_FILES = (
+    "BUSINESS_STRATEGY.md",
+    "ETHAN_FINANCIAL_STATUS.md",
+    "FINANCIAL_OVERVIEW.md",
+    "IMMEDIATE_PRIORITIES.md",
+)
+
+CHUNK_CHARS = 900
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "by", "at", "as",
+    "is", "are", "be", "was", "it", "this", "that", "from", "i", "my", "me", "what", "how",
+    "should", "can", "do", "which", "best", "would", "could", "into", "via", "per"
+}
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9&%]*(?:\.[0-9]+)?")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed and plurals folded"""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("ies"):
+            token = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+def chunk_text(text: str, max_chars: int = CHUNK_CHARS) -> List[str]:
+    """Split on blank lines, packing paragraphs into chunks of at most max_chars"""
+    paragraphs = [re.sub(r"[ \t]+", " ", p).strip() for p in re.split(r"\n\s*\n", text)]
+    chunks, current = [], ""
+    for paragraph in filter(None, paragraphs):
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+class LIF3KnowledgeIndex:
+    """BM25 inverted index over knowledge base chunks"""
+
+    def __init__(self):
+        self.chunks: List[Dict[str, Any]] = []
+        self.postings: Dict[str, List[tuple]] = defaultdict(list)  # term -> [(chunk_idx, tf)]
+        self.lengths: List[int] = []
+        self.idf: Dict[str, float] = {}
+        self.avg_length = 0.0
+
+    @classmethod
+    def load_default(cls, extra_paths: Iterable[str] = ()) -> "LIF3KnowledgeIndex":
+        """Index FINANCIAL_DOCS, the financial markdown files and any extra files"""
+        index = cls()
+        for doc in FINANCIAL_DOCS:
+            index.add_document(doc["title"], doc["content"], doc["category"], doc.get("tags", []))
+
+        paths = [DOCUMENTS_PATH / name for name in KNOWLEDGE_FILES] + [Path(p) for p in extra_paths]
+        for path in paths:
+            if path.exists():
+                index.add_document(path.stem.replace("_", " ").title(), path.read_text(), "knowledge_file",
+                                   [], source=str(path))
+        index.build()
+        return index
+
+    def add_document(self, title: str, content: str, category: str, tags: List[str],
+                     source: Optional[str] = None):
+        """Chunk a document; call build() once all documents are added"""
+        slug = re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_")
+        for position, text in enumerate(chunk_text(content)):
+            self.chunks.append({
+                "id": f"{slug}#{position}",
+                "content": text,
+                "document_title": title,
+                "category": category,
+                "tags": tags,
+                "source": source or "knowledge_documents"
+            })
+
+    def build(self):
+        """Compute postings, lengths and IDF for every chunk"""
+        self.postings.clear()
+        self.lengths = []
+        for idx, chunk in enumerate(self.chunks):
+            # Titles and tags are weighted like an extra mention in the body
+            terms = tokenize(f"{chunk['document_title']} {' '.join(chunk['tags'])} {chunk['content']}")
+            self.lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self.postings[term].append((idx, tf))
+
+        count = len(self.chunks)
+        self.avg_length = sum(self.lengths) / count if count else 0.0
+        self.idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, query: str, limit: int = 10, threshold: float = 0.0,
+               category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Rank chunks by BM25; similarity is the IDF-weighted share of query terms matched"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        query_weight = sum(self.idf.get(term, 0.0) for term in terms)
+        if not query_weight:
+            return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        matched: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for idx, tf in self.postings[term]:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[idx] / self.avg_length)
+                scores[idx] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+                matched[idx] += idf
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for idx, score in ranked:
+            chunk = self.chunks[idx]
+            if category and chunk["category"] != category:
+                continue
+            similarity = matched[idx] / query_weight
+            if similarity < threshold:
+                continue
+            results.append({"chunk": chunk, "similarity": round(similarity, 4), "score": round(score, 4)})
+            if len(results) >= limit:
+                break
+        return results
+
+    def documents(self) -> List[Dict[str, Any]]:
+        """One summary row per indexed document"""
+        summary: Dict[str, Dict[str, Any]] = {}
+        for chunk in self.chunks:
+            entry = summary.setdefault(chunk["document_title"], {
+                "title": chunk["document_title"],
+                "category": chunk["category"],
+                "tags": chunk["tags"],
+                "source": chunk["source"],
+                "chunks": 0
+            })
+            entry["chunks"] += 1
+        return list(summary.values())
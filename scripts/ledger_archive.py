@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+LIF3 Ledger Archive - Per-year cold storage for old transactions and metrics
+Rows of transactions and both business metrics tables dated before the
+horizon (LIF3_ARCHIVE_HORIZON_DAYS, two years by default) move into one
+SQLite file per year under archive/ next to the database. Rollups,
+balances and the event log stay in the hot file, so dashboards and series
+are unchanged. attach_archive() ATTACHes the year files and creates TEMP
+<table>_all views (UNION ALL of hot and archived rows) for queries that
+need the whole history.
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from lif3_config import resolve_db_path
+
+ARCHIVE_TABLES = ("transactions", "tech_business_metrics", "brand_business_metrics")
+
+DEFAULT_ARCHIVE_HORIZON_DAYS = 730
+
+_ARCHIVE_FILE = re.compile(r"_(\d{4})\.db$")
+
+def archive_horizon_days() -> int:
+    return int(os.environ.get("LIF3_ARCHIVE_HORIZON_DAYS", DEFAULT_ARCHIVE_HORIZON_DAYS))
+
+def archive_dir(db_path: str) -> Path:
+    return Path(db_path).parent / "archive"
+
+def archive_path(db_path: str, year: str) -> Path:
+    """data/lif3_financial.db, 2023 -> data/archive/lif3_financial_2023.db"""
+    return archive_dir(db_path) / f"{Path(db_path).stem}_{year}.db"
+
+def archive_years(db_path: str) -> List[str]:
+    """Years with an archive file, oldest first"""
+    directory = archive_dir(db_path)
+    if not directory.exists():
+        return []
+    years = []
+    for path in directory.glob(f"{Path(db_path).stem}_*.db"):
+        match = _ARCHIVE_FILE.search(path.name)
+        if match:
+            years.append(match.group(1))
+    return sorted(years)
+
+def _attached(conn: sqlite3.Connection) -> Dict[str, str]:
+    return {row[1]: row[2] for row in conn.execute("PRAGMA database_list")}
+
+def _attach(conn: sqlite3.Connection, db_path: str, year: str) -> str:
+    """Attach a year's archive (creating the file when new) and return its schema name"""
+    schema = f"archive_{year}"
+    if schema not in _attached(conn):
+        path = archive_path(db_path, year)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn.execute("ATTACH DATABASE ? AS " + schema, (str(path),))
+    return schema
+
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> List[tuple]:
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+def _ensure_archive_table(conn: sqlite3.Connection, schema: str, table: str):
+    """Create the archive copy of a table, or add the columns the hot table has gained since"""
+    hot = _columns(conn, "main", table)
+    cold = {name for name, _ in _columns(conn, schema, table)}
+    if not cold:
+        definition = ", ".join(
+            "id INTEGER PRIMARY KEY" if name == "id" else f"{name} {declared}" for name, declared in hot
+        )
+        conn.execute(f"CREATE TABLE {schema}.{table} ({definition})")
+        conn.execute(f"CREATE INDEX {schema}.idx_{table}_date ON {table} (date)")
+        return
+    for name, declared in hot:
+        if name not in cold:
+            conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {name} {declared}")
+
+def plan(conn: sqlite3.Connection, before: str) -> Dict[str, Dict[str, int]]:
+    """Rows per table and year dated before `before`"""
+    result: Dict[str, Dict[str, int]] = {}
+    for table in ARCHIVE_TABLES:
+        for year, count in conn.execute(f"""
+            SELECT strftime('%Y', date), COUNT(*) FROM main.{table}
+            WHERE date < ? GROUP BY 1 ORDER BY 1
+        """, (before,)):
+            if year:
+                result.setdefault(year, {})[table] = count
+    return result
+
+def archive(conn: sqlite3.Connection, db_path: str, before: Optional[str] = None,
+            dry_run: bool = False) -> Dict[str, Any]:
+    """Move rows dated before `before` (default: the horizon) into per-year archive files
+
+    Each year is copied and committed into its archive file first, then deleted from the hot file in a
+    second transaction, and only for ids the archive holds. SQLite does not commit across files atomically
+    when the hot file is in WAL mode, so this order means an interruption can leave a row in both files but
+    never in neither; copies use INSERT OR REPLACE by id, so re-running finishes the move.
+    """
+    before = before or (date.today() - timedelta(days=archive_horizon_days())).isoformat()
+    years = plan(conn, before)
+    if dry_run or not years:
+        return {"before": before, "dry_run": dry_run, "years": years, "moved": 0}
+
+    moved = 0
+    # Free every attach slot for the years being written; the views are rebuilt afterwards
+    for name in _attached(conn):
+        if name.startswith("archive_"):
+            conn.execute(f"DETACH DATABASE {name}")
+    try:
+        for year, tables in years.items():
+            # ATTACH and DETACH are not allowed inside a transaction
+            schema = _attach(conn, db_path, year)
+            bounds = (f"{year}-01-01", min(f"{int(year) + 1}-01-01", before))
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table in tables:
+                    _ensure_archive_table(conn, schema, table)
+                    names = ", ".join(name for name, _ in _columns(conn, "main", table))
+                    conn.execute(f"""
+                        INSERT OR REPLACE INTO {schema}.{table} ({names})
+                        SELECT {names} FROM main.{table} WHERE date >= ? AND date < ?
+                    """, bounds)
+                conn.commit()
+                conn.execute("BEGIN IMMEDIATE")
+                for table in tables:
+                    conn.execute(f"""
+                        DELETE FROM main.{table}
+                        WHERE date >= ? AND date < ? AND id IN (SELECT id FROM {schema}.{table})
+                    """, bounds)
+                    moved += conn.execute("SELECT changes()").fetchone()[0]
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            conn.execute(f"DETACH DATABASE {schema}")
+    finally:
+        attach_archive(conn, db_path)
+    return {"before": before, "dry_run": False, "years": years, "moved": moved}
+
+def attach_archive(conn: sqlite3.Connection, db_path: str) -> Dict[str, Any]:
+    """Attach the newest archive years that fit and (re)create the TEMP <table>_all union views
+
+    SQLite caps attached databases (10 by default), so the oldest years beyond that are left out
+    and reported as unattached.
+    """
+    years = archive_years(db_path)
+    limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    others = [name for name in _attached(conn) if name not in ("main", "temp") and not name.startswith("archive_")]
+    room = limit - len(others)
+    attached = years[-room:] if room > 0 else []
+    for year in attached:
+        _attach(conn, db_path, year)
+
+    for table in ARCHIVE_TABLES:
+        hot = [name for name, _ in _columns(conn, "main", table)]
+        if not hot:
+            continue
+        selects = [f"SELECT {', '.join(hot)} FROM main.{table}"]
+        for year in attached:
+            cold = {name for name, _ in _columns(conn, f"archive_{year}", table)}
+            if cold:
+                columns = ", ".join(name if name in cold else f"NULL AS {name}" for name in hot)
+                selects.append(f"SELECT {columns} FROM archive_{year}.{table}")
+        conn.execute(f"DROP VIEW IF EXISTS temp.{table}_all")
+        conn.execute(f"CREATE TEMP VIEW {table}_all AS " + " UNION ALL ".join(selects))
+    return {"attached": attached, "unattached": [year for year in years if year not in attached]}
+
+def render_archive(result: Dict[str, Any]) -> str:
+    """Markdown block for the archive_ledger tool"""
+    if not result["years"]:
+        return f"🗄️ Nothing dated before {result['before']} to archive"
+    heading = "🗄️ **Archive plan (dry run)**" if result["dry_run"] else f"🗄️ **Archived {result['moved']:,} row(s)**"
+    lines = [heading, "", f"Rows dated before {result['before']}:"]
+    for year, tables in result["years"].items():
+        lines.append(f"• {year}: " + ", ".join(f"{table} {count:,}" for table, count in tables.items()))
+    lines += ["", "Full history: query transactions_all, tech_business_metrics_all or brand_business_metrics_all"]
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Move old LIF3 transactions and metrics into per-year archive files')
+    parser.add_argument('--db', default=resolve_db_path(), help='LIF3 SQLite database')
+    parser.add_argument('--before', help='Archive rows dated before this day (YYYY-MM-DD)')
+    parser.add_argument('--horizon-days', type=int, help=f'Archive rows older than this many days (default {archive_horizon_days()})')
+    parser.add_argument('--dry-run', action='store_true', help='Only count what would move')
+    args = parser.parse_args()
+
+    before = args.before
+    if before is None and args.horizon_days is not None:
+        before = (date.today() - timedelta(days=args.horizon_days)).isoformat()
+    conn = sqlite3.connect(args.db)
+    print(render_archive(archive(conn, args.db, before, args.dry_run)))
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+LIF3 Ledger Change Feed - Change data capture for lif3_financial.db
+Triggers append every new transaction, balance change, goal update,
+business metric and habit streak change to an append-only ledger_changes
+table; LIF3ChangeFeed watches PRAGMA data_version and hands out only the
+new rows. prune() keeps the log to the newest LIF3_CHANGES_KEEP rows; it
+runs with event log compaction and ledger archiving, or from the CLI.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from lif3_config import resolve_db_path
+
+CHANGE_TYPES = ("transaction", "balance", "goal_progress", "business_metric", "habit")
+
+DEFAULT_CHANGES_KEEP = 10000
+
+CHANGES_SCHEMA = """
+    -- Append-only change log consumed by dashboard clients
+    CREATE TABLE IF NOT EXISTS ledger_changes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        change_type TEXT NOT NULL, -- 'transaction', 'balance', 'goal_progress', 'business_metric', 'habit'
+        table_name TEXT NOT NULL,
+        row_id INTEGER,
+        payload TEXT, -- JSON delta
+        created_at DATETIME DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+    );
+
+    CREATE TRIGGER IF NOT EXISTS trg_ledger_changes_append_only
+    BEFORE UPDATE ON ledger_changes
+    BEGIN
+        SELECT RAISE(ABORT, 'ledger_changes is append-only');
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_change
+    AFTER INSERT ON transactions
+    BEGIN
+        INSERT INTO ledger_changes (change_type, table_name, row_id, payload)
+        VALUES ('transaction', 'transactions', NEW.id, json_object(
+            'account_id', NEW.account_id,
+            'amount', NEW.amount,
+            'description', NEW.description,
+            'category', NEW.category,
+            'subcategory', NEW.subcategory,
+            'life_category', NEW.life_category,
+            'date', COALESCE(NEW.date, date('now'))
+        ));
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_balance_change
+    AFTER UPDATE OF balance ON accounts
+    WHEN NEW.balance IS NOT OLD.balance
+    BEGIN
+        INSERT INTO ledger_changes (change_type, table_name, row_id, payload)
+        VALUES ('balance', 'accounts', NEW.id, json_object(
+            'account_name', NEW.name,
+            'account_type', NEW.type,
+            'old_balance', OLD.balance,
+            'new_balance', NEW.balance,
+            'delta', NEW.balance - COALESCE(OLD.balance, 0)
+        ));
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_goals_progress_change
+    AFTER UPDATE OF current_amount ON goals
+    WHEN NEW.current_amount IS NOT OLD.current_amount
+    BEGIN
+        INSERT INTO ledger_changes (change_type, table_name, row_id, payload)
+        VALUES ('goal_progress', 'goals', NEW.id, json_object(
+            'title', NEW.title,
+            'life_category', NEW.life_category,
+            'old_amount', OLD.current_amount,
+            'current_amount', NEW.current_amount,
+            'target_amount', NEW.target_amount,
+            'progress_pct', CASE WHEN NEW.target_amount > 0
+                                 THEN round(NEW.current_amount * 100.0 / NEW.target_amount, 1) END
+        ));
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_tech_business_metrics_change
+    AFTER INSERT ON tech_business_metrics
+    BEGIN
+        INSERT INTO ledger_changes (change_type, table_name, row_id, payload)
+        VALUES ('business_metric', 'tech_business_metrics', NEW.id, json_object(
+            'business', 'tech',
+            'metric_name', NEW.metric_name,
+            'metric_value', NEW.metric_value,
+            'date', COALESCE(NEW.date, date('now'))
+        ));
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_brand_business_metrics_change
+    AFTER INSERT ON brand_business_metrics
+    BEGIN
+        INSERT INTO ledger_changes (change_type, table_name, row_id, payload)
+        VALUES ('business_metric', 'brand_business_metrics', NEW.id, json_object(
+            'business', 'brand',
+            'metric_name', NEW.metric_name,
+            'metric_value', NEW.metric_value,
+            'date', COALESCE(NEW.date, date('now'))
+        ));
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_habits_streak_change
+    AFTER UPDATE OF current_streak, longest_streak ON habits
+    WHEN NEW.current_streak IS NOT OLD.current_streak OR NEW.longest_streak IS NOT OLD.longest_streak
+    BEGIN
+        INSERT INTO ledger_changes (change_type, table_name, row_id, payload)
+        VALUES ('habit', 'habits', NEW.id, json_object(
+            'habit_name', NEW.habit_name,
+            'current_streak', NEW.current_streak,
+            'longest_streak', NEW.longest_streak,
+            'last_completed_date', NEW.last_completed_date
+        ));
+    END;
+"""
+
+def install(conn: sqlite3.Connection):
+    """Create the change log and the triggers that feed it"""
+    conn.executescript(CHANGES_SCHEMA)
+
+def latest_change_id(conn: sqlite3.Connection) -> int:
+    """Highest change id written so far (0 for an empty log)
+
+    Read from sqlite_sequence, so it never goes backwards when prune() empties the log.
+    """
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'ledger_changes'").fetchone()
+    if row is not None:
+        return row[0]
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM ledger_changes").fetchone()[0]
+
+def changes_since(conn: sqlite3.Connection, last_id: int, limit: int = 500) -> List[Dict[str, Any]]:
+    """Return changes with id > last_id, oldest first"""
+    rows = conn.execute("""
+        SELECT id, change_type, table_name, row_id, payload, created_at
+        FROM ledger_changes
+        WHERE id > ?
+        ORDER BY id
+        LIMIT ?
+    """, (last_id, limit)).fetchall()
+
+    return [
+        {"id": row[0], "change_type": row[1], "table": row[2], "row_id": row[3],
+         "delta": json.loads(row[4]) if row[4] else {}, "created_at": row[5]}
+        for row in rows
+    ]
+
+def changes_keep() -> int:
+    return int(os.environ.get("LIF3_CHANGES_KEEP", DEFAULT_CHANGES_KEEP))
+
+def prune(conn: sqlite3.Connection, keep_last: Optional[int] = None) -> int:
+    """Drop all but the newest keep_last changes; returns rows removed (the caller commits)"""
+    keep_last = changes_keep() if keep_last is None else keep_last
+    cursor = conn.execute(
+        "DELETE FROM ledger_changes WHERE id <= (SELECT COALESCE(MAX(id), 0) FROM ledger_changes) - ?",
+        (keep_last,)
+    )
+    return cursor.rowcount
+
+class LIF3ChangeFeed:
+    """Tails ledger_changes, waking only when another connection has committed"""
+
+    def __init__(self, db_path: str, poll_interval: float = 0.02, batch_size: int = 500):
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.conn: Optional[sqlite3.Connection] = None
+        self.last_id = 0
+        self.data_version = None
+
+    def open(self):
+        """Open the feed connection and start from the current end of the log"""
+        self.conn = sqlite3.connect(self.db_path)
+        install(self.conn)
+        self.conn.commit()
+        self.last_id = latest_change_id(self.conn)
+        self.data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """Return new changes, or [] without touching the table if nothing committed"""
+        if self.conn is None:
+            self.open()
+
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self.data_version:
+            return []
+        self.data_version = version
+
+        changes = []
+        while True:
+            batch = changes_since(self.conn, self.last_id, self.batch_size)
+            if not batch:
+                break
+            changes.extend(batch)
+            self.last_id = batch[-1]["id"]
+            if len(batch) < self.batch_size:
+                break
+        return changes
+
+    def backlog(self, since_id: int) -> List[Dict[str, Any]]:
+        """Replay changes a reconnecting client missed, up to the feed position"""
+        if self.conn is None:
+            self.open()
+        return [change for change in changes_since(self.conn, since_id, self.batch_size)
+                if change["id"] <= self.last_id]
+
+    async def run(self, publish: Callable[[List[Dict[str, Any]]], Awaitable[None]]):
+        """Poll forever, publishing each non-empty batch of changes"""
+        try:
+            while True:
+                changes = self.poll()
+                if changes:
+                    await publish(changes)
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            self.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='LIF3 ledger change log maintenance')
+    parser.add_argument('--db', default=resolve_db_path(), help='LIF3 SQLite database')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    prune_parser = subparsers.add_parser('prune', help='Delete all but the newest changes')
+    prune_parser.add_argument('--keep-last', type=int, default=changes_keep(), help='Changes to keep')
+    subparsers.add_parser('latest', help='Print the latest change id')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    install(conn)
+    if args.command == 'prune':
+        removed = prune(conn, args.keep_last)
+        conn.commit()
+        print(f"🗜️  Pruned {removed:,} changes (kept the newest {args.keep_last:,})")
+    else:
+        print(f"📡 Latest change #{latest_change_id(conn)}")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
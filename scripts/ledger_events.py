@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+LIF3 Ledger Events - Append-only balance event log with periodic snapshots
+Every account insert and balance change appends a delta event; every
+SNAPSHOT_INTERVAL events a trigger folds the log into per-account snapshot
+balances. A point-in-time balance is one snapshot plus at most one interval
+of replayed deltas. Compaction drops events already folded into snapshots
+and thins old snapshots to one per month. net_worth_daily keeps the
+end-of-day net worth for every day with activity, so history charts are a
+single range read that survives compaction.
+"""
+
+import argparse
+import sqlite3
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import ledger_changes
+from lif3_config import resolve_db_path
+
+SNAPSHOT_INTERVAL = 1000
+
+EVENTS_SCHEMA = f"""
+    -- Balance deltas in append order; effective_date never decreases with id
+    CREATE TABLE IF NOT EXISTS ledger_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account_id INTEGER NOT NULL,
+        event_type TEXT NOT NULL, -- 'opening', 'balance'
+        delta REAL NOT NULL,
+        balance REAL, -- account balance after the event
+        effective_date DATE NOT NULL DEFAULT CURRENT_DATE,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Per-account balances folded up to and including event snapshot_id
+    CREATE TABLE IF NOT EXISTS balance_snapshots (
+        snapshot_id INTEGER NOT NULL,
+        account_id INTEGER NOT NULL,
+        balance REAL NOT NULL,
+        as_of_date DATE NOT NULL,
+        PRIMARY KEY (snapshot_id, account_id)
+    ) WITHOUT ROWID;
+
+    CREATE INDEX IF NOT EXISTS idx_balance_snapshots_as_of ON balance_snapshots (as_of_date, snapshot_id);
+
+    CREATE TRIGGER IF NOT EXISTS trg_ledger_events_append_only
+    BEFORE UPDATE ON ledger_events
+    BEGIN
+        SELECT RAISE(ABORT, 'ledger_events is append-only');
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_opening_event
+    AFTER INSERT ON accounts
+    WHEN COALESCE(NEW.balance, 0) != 0
+    BEGIN
+        INSERT INTO ledger_events (account_id, event_type, delta, balance)
+        VALUES (NEW.id, 'opening', NEW.balance, NEW.balance);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_balance_event
+    AFTER UPDATE OF balance ON accounts
+    WHEN NEW.balance IS NOT OLD.balance
+    BEGIN
+        INSERT INTO ledger_events (account_id, event_type, delta, balance)
+        VALUES (NEW.id, 'balance', COALESCE(NEW.balance, 0) - COALESCE(OLD.balance, 0), NEW.balance);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_ledger_events_snapshot
+    AFTER INSERT ON ledger_events
+    WHEN NEW.id % {SNAPSHOT_INTERVAL} = 0
+    BEGIN
+        INSERT INTO balance_snapshots (snapshot_id, account_id, balance, as_of_date)
+        SELECT NEW.id, account_id, SUM(amount), NEW.effective_date
+        FROM (
+            SELECT account_id, balance AS amount FROM balance_snapshots
+            WHERE snapshot_id = (SELECT MAX(snapshot_id) FROM balance_snapshots WHERE snapshot_id < NEW.id)
+            UNION ALL
+            SELECT account_id, delta FROM ledger_events
+            WHERE id > COALESCE((SELECT MAX(snapshot_id) FROM balance_snapshots WHERE snapshot_id < NEW.id), 0)
+              AND id <= NEW.id
+        )
+        GROUP BY account_id;
+    END;
+"""
+
+NET_WORTH_DAILY_SCHEMA = """
+    -- End-of-day net worth for each day with balance events (days without events carry forward)
+    CREATE TABLE IF NOT EXISTS net_worth_daily (
+        day DATE PRIMARY KEY,
+        net_worth REAL NOT NULL,
+        change REAL NOT NULL DEFAULT 0,
+        events INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID;
+
+    CREATE TRIGGER IF NOT EXISTS trg_ledger_events_net_worth_daily
+    AFTER INSERT ON ledger_events
+    BEGIN
+        INSERT INTO net_worth_daily (day, net_worth, change, events)
+        VALUES (
+            NEW.effective_date,
+            COALESCE((SELECT net_worth FROM net_worth_daily WHERE day < NEW.effective_date ORDER BY day DESC LIMIT 1), 0)
+                + NEW.delta,
+            NEW.delta,
+            1
+        )
+        ON CONFLICT (day) DO UPDATE SET
+            net_worth = net_worth + excluded.change,
+            change = change + excluded.change,
+            events = events + 1;
+    END;
+"""
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()[0] > 0
+
+def install(conn: sqlite3.Connection):
+    """Create the event log, snapshots and daily net worth, seeding history when they are new"""
+    events_exist = _table_exists(conn, "ledger_events")
+    daily_exists = _table_exists(conn, "net_worth_daily")
+    conn.executescript(EVENTS_SCHEMA)
+    conn.executescript(NET_WORTH_DAILY_SCHEMA)
+    if not events_exist:
+        backfill(conn)
+    if not daily_exists or not events_exist:
+        rebuild_net_worth_daily(conn)
+
+def backfill(conn: sqlite3.Connection):
+    """Seed the log in date order from opening balances and the balance changes in ledger_changes"""
+    has_changes = _table_exists(conn, "ledger_changes")
+    changes = "SELECT NULL, NULL, NULL, NULL, NULL WHERE 0"
+    if has_changes:
+        changes = """
+            SELECT id, row_id, json_extract(payload, '$.old_balance'), json_extract(payload, '$.new_balance'),
+                   date(created_at)
+            FROM ledger_changes WHERE change_type = 'balance'
+        """
+    # Opening balance = balance before the first recorded change (or the current balance)
+    conn.execute(f"""
+        WITH changes (seq, account_id, old_balance, new_balance, day) AS ({changes}),
+        first_change AS (
+            SELECT account_id, old_balance, day,
+                   ROW_NUMBER() OVER (PARTITION BY account_id ORDER BY seq) AS n
+            FROM changes
+        ),
+        events AS (
+            SELECT 0 AS seq, a.id AS account_id, 'opening' AS event_type,
+                   COALESCE(f.old_balance, a.balance) AS delta, COALESCE(f.old_balance, a.balance) AS balance,
+                   MIN(COALESCE(date(a.created_at), date('now')), COALESCE(f.day, date('now'))) AS day
+            FROM accounts a
+            LEFT JOIN first_change f ON f.account_id = a.id AND f.n = 1
+            WHERE COALESCE(f.old_balance, a.balance, 0) != 0
+            UNION ALL
+            SELECT seq, account_id, 'balance', COALESCE(new_balance, 0) - COALESCE(old_balance, 0), new_balance, day
+            FROM changes
+        )
+        INSERT INTO ledger_events (account_id, event_type, delta, balance, effective_date)
+        SELECT account_id, event_type, delta, balance, day FROM events ORDER BY day, seq
+    """)
+
+def rebuild_net_worth_daily(conn: sqlite3.Connection):
+    """Recompute the daily series from the event log (run before any compaction)"""
+    conn.execute("DELETE FROM net_worth_daily")
+    conn.execute("""
+        INSERT INTO net_worth_daily (day, net_worth, change, events)
+        SELECT effective_date, SUM(SUM(delta)) OVER (ORDER BY effective_date), SUM(delta), COUNT(*)
+        FROM ledger_events
+        GROUP BY effective_date
+    """)
+
+def net_worth_history(conn: sqlite3.Connection, start: Optional[str] = None,
+                      end: Optional[str] = None) -> List[Dict[str, Any]]:
+    """One point per day from start to end (default: last 90 days), carrying values across quiet days"""
+    end = end or date.today().isoformat()
+    start = start or (date.fromisoformat(end) - timedelta(days=89)).isoformat()
+    rows = conn.execute("""
+        SELECT day, net_worth, change, events FROM (
+            SELECT day, net_worth, 0 AS change, 0 AS events FROM (
+                SELECT day, net_worth FROM net_worth_daily WHERE day < ? ORDER BY day DESC LIMIT 1
+            )
+            UNION ALL
+            SELECT day, net_worth, change, events FROM net_worth_daily WHERE day BETWEEN ? AND ?
+        )
+        ORDER BY day
+    """, (start, start, end)).fetchall()
+
+    series = []
+    by_day = {row[0]: row for row in rows}
+    net_worth = rows[0][1] if rows and rows[0][0] < start else 0.0
+    day = date.fromisoformat(start)
+    last = date.fromisoformat(end)
+    while day <= last:
+        row = by_day.get(day.isoformat())
+        if row:
+            net_worth = row[1]
+        series.append({
+            "date": day.isoformat(),
+            "net_worth": round(net_worth, 2),
+            "change": round(row[2], 2) if row else 0.0,
+            "events": row[3] if row else 0
+        })
+        day += timedelta(days=1)
+    return series
+
+def latest_snapshot(conn: sqlite3.Connection, as_of: str) -> tuple:
+    """(snapshot_id, as_of_date) of the newest snapshot not after as_of, or (0, None)"""
+    row = conn.execute("""
+        SELECT snapshot_id, as_of_date FROM balance_snapshots
+        WHERE as_of_date <= ? ORDER BY as_of_date DESC, snapshot_id DESC LIMIT 1
+    """, (as_of,)).fetchone()
+    return (row[0], row[1]) if row else (0, None)
+
+def balances_at(conn: sqlite3.Connection, as_of: Optional[str] = None) -> Dict[int, float]:
+    """Per-account balances at the end of as_of: nearest snapshot plus the deltas after it"""
+    as_of = as_of or date.today().isoformat()
+    snapshot_id, _ = latest_snapshot(conn, as_of)
+
+    # Dates never decrease with id, so nothing after the next later snapshot can apply
+    upper = conn.execute("""
+        SELECT MIN(snapshot_id) FROM balance_snapshots WHERE as_of_date > ? AND snapshot_id > ?
+    """, (as_of, snapshot_id)).fetchone()[0]
+
+    rows = conn.execute("""
+        SELECT account_id, SUM(amount) FROM (
+            SELECT account_id, balance AS amount FROM balance_snapshots WHERE snapshot_id = ?
+            UNION ALL
+            SELECT account_id, delta FROM ledger_events
+            WHERE id > ? AND id <= ? AND effective_date <= ?
+        )
+        GROUP BY account_id
+    """, (snapshot_id, snapshot_id, upper if upper is not None else 2 ** 62, as_of)).fetchall()
+    return {account_id: round(balance, 2) for account_id, balance in rows}
+
+def net_worth_at(conn: sqlite3.Connection, as_of: Optional[str] = None) -> float:
+    return round(sum(balances_at(conn, as_of).values()), 2)
+
+def replay_net_worth(conn: sqlite3.Connection, as_of: str) -> float:
+    """Full-log replay (reference for benchmarks; wrong once the log has been compacted)"""
+    return round(conn.execute(
+        "SELECT COALESCE(SUM(delta), 0) FROM ledger_events WHERE effective_date <= ?", (as_of,)
+    ).fetchone()[0], 2)
+
+def snapshot(conn: sqlite3.Connection) -> int:
+    """Fold every event so far into a snapshot now; returns its snapshot_id"""
+    last_event = conn.execute("SELECT MAX(id), MAX(effective_date) FROM ledger_events").fetchone()
+    if last_event[0] is None:
+        return 0
+    previous = conn.execute("SELECT COALESCE(MAX(snapshot_id), 0) FROM balance_snapshots").fetchone()[0]
+    if previous == last_event[0]:
+        return previous
+    conn.execute("""
+        INSERT INTO balance_snapshots (snapshot_id, account_id, balance, as_of_date)
+        SELECT ?, account_id, SUM(amount), ?
+        FROM (
+            SELECT account_id, balance AS amount FROM balance_snapshots WHERE snapshot_id = ?
+            UNION ALL
+            SELECT account_id, delta FROM ledger_events WHERE id > ? AND id <= ?
+        )
+        GROUP BY account_id
+    """, (last_event[0], last_event[1], previous, previous, last_event[0]))
+    return last_event[0]
+
+def compact(conn: sqlite3.Connection, before: str) -> Dict[str, int]:
+    """Drop events folded into snapshots dated before `before`; keep the last snapshot per month there
+
+    Returns deleted event and snapshot row counts (one snapshot row per account), plus the
+    ledger_changes rows pruned along the way.
+    """
+    changes_pruned = ledger_changes.prune(conn) if _table_exists(conn, "ledger_changes") else 0
+    snapshot_id, _ = conn.execute("""
+        SELECT COALESCE(MAX(snapshot_id), 0), MAX(as_of_date) FROM balance_snapshots WHERE as_of_date < ?
+    """, (before,)).fetchone()
+    if not snapshot_id:
+        conn.commit()
+        return {"events_deleted": 0, "snapshots_deleted": 0, "changes_pruned": changes_pruned}
+
+    events_deleted = conn.execute("DELETE FROM ledger_events WHERE id <= ?", (snapshot_id,)).rowcount
+    snapshots_deleted = conn.execute("""
+        DELETE FROM balance_snapshots
+        WHERE snapshot_id < ? AND snapshot_id NOT IN (
+            SELECT MAX(snapshot_id) FROM balance_snapshots
+            WHERE snapshot_id <= ?
+            GROUP BY strftime('%Y-%m', as_of_date)
+        )
+    """, (snapshot_id, snapshot_id)).rowcount
+    conn.commit()
+    return {"events_deleted": events_deleted, "snapshots_deleted": snapshots_deleted, "changes_pruned": changes_pruned}
+
+def main():
+    parser = argparse.ArgumentParser(description='LIF3 balance event log maintenance')
+    parser.add_argument('--db', default=resolve_db_path(), help='LIF3 SQLite database')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('snapshot', help='Fold all events into a snapshot now')
+    compact_parser = subparsers.add_parser('compact', help='Delete events already folded into old snapshots')
+    compact_parser.add_argument('--before', required=True, help='Compact history before this date (YYYY-MM-DD)')
+    net_worth_parser = subparsers.add_parser('net-worth', help='Point-in-time net worth')
+    net_worth_parser.add_argument('--date', default=date.today().isoformat(), help='As-of date (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    install(conn)
+    if args.command == 'snapshot':
+        print(f"📸 Snapshot at event {snapshot(conn)}")
+        conn.commit()
+    elif args.command == 'compact':
+        snapshot(conn)
+        result = compact(conn, args.before)
+        print(f"🗜️  Deleted {result['events_deleted']:,} events and {result['snapshots_deleted']:,} snapshots before {args.before}, "
+              f"pruned {result['changes_pruned']:,} changes")
+    else:
+        print(f"💰 Net worth on {args.date}: R{net_worth_at(conn, args.date):,.2f}")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+LIF3 Ledger Export - Columnar snapshots of the ledger for offline analysis
+Streams transactions, goals, habit entries and both business metrics tables
+out in id-ordered chunks, one part file per chunk: Parquet when pyarrow is
+installed, NumPy .npz when only numpy is, gzipped CSV otherwise. A
+manifest.json in the export directory records the last exported id per
+table, so the next run only appends rows added since. Goals and habit
+entries are updated in place (progress, un-completed days), so they are
+re-exported whole each run. Transactions are appended, but recurring
+detection rewrites their is_recurring/recurring_frequency flags, so those
+columns are left out of the transactions parts and exported whole as the
+transaction_flags snapshot (the flagged rows' ids) instead. A table whose
+columns changed since its last export is exported again from the start.
+Tables with per-year archive files are read through their <table>_all
+views, so archived years stay in the export.
+"""
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import ledger_archive
+from lif3_config import REPO_ROOT, resolve_db_path
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+DEFAULT_EXPORT_DIR = REPO_ROOT / "data" / "exports"
+
+# export -> "append" (immutable rows, exported once by id) or "snapshot" (rows change, rewritten each run)
+EXPORT_TABLES = {
+    "transactions": "append",
+    "goals": "snapshot",
+    "habit_entries": "snapshot",  # record_entry upserts per (habit, day)
+    "tech_business_metrics": "append",
+    "brand_business_metrics": "append",
+    "transaction_flags": "snapshot",
+}
+
+# Exports that are a slice of another table: name -> (source table, columns, row filter)
+DERIVED_EXPORTS = {
+    "transaction_flags": ("transactions", ("id", "is_recurring", "recurring_frequency"),
+                          "is_recurring OR recurring_frequency IS NOT NULL"),
+}
+
+# Columns recomputed on existing rows, which an append export would keep stale
+UPDATED_COLUMNS = {
+    "transactions": ("is_recurring", "recurring_frequency"),
+}
+
+CHUNK_ROWS = 50000
+
+def export_dir() -> Path:
+    return Path(os.environ.get("LIF3_EXPORT_DIR") or DEFAULT_EXPORT_DIR)
+
+def column_kind(declared_type: str) -> str:
+    """SQLite affinity of a declared column type, with BOOLEAN kept apart from INTEGER"""
+    declared = (declared_type or "").upper()
+    if "BOOL" in declared:
+        return "bool"
+    if "INT" in declared:
+        return "int"
+    if any(name in declared for name in ("REAL", "FLOA", "DOUB")):
+        return "float"
+    return "text"
+
+def table_columns(conn: sqlite3.Connection, table: str) -> List[tuple]:
+    return [(row[1], column_kind(row[2])) for row in conn.execute(f"PRAGMA table_info({table})")]
+
+def export_columns(conn: sqlite3.Connection, table: str) -> List[tuple]:
+    """Columns an export writes: a derived export's slice, or the table minus its recomputed columns"""
+    if table in DERIVED_EXPORTS:
+        source, names, _ = DERIVED_EXPORTS[table]
+        return [column for column in table_columns(conn, source) if column[0] in names]
+    updated = UPDATED_COLUMNS.get(table, ())
+    return [column for column in table_columns(conn, table) if column[0] not in updated]
+
+def table_source(conn: sqlite3.Connection, table: str) -> str:
+    """<table>_all when attach_archive has created it (hot and archived rows), else the table itself"""
+    view = f"{table}_all"
+    exists = conn.execute("SELECT COUNT(*) FROM temp.sqlite_master WHERE type = 'view' AND name = ?", (view,)).fetchone()[0]
+    return view if exists else table
+
+def _coerce(kind: str, column: list) -> list:
+    """SQLite stores booleans as 0/1 and does not enforce declared types; columnar types are strict"""
+    cast = {"bool": bool, "int": int, "float": float, "text": str}[kind]
+    return [None if value is None else cast(value) for value in column]
+
+def _write_parquet(path: Path, columns: List[tuple], values: List[list]):
+    types = {"bool": pyarrow.bool_(), "int": pyarrow.int64(), "float": pyarrow.float64(), "text": pyarrow.string()}
+    table = pyarrow.table({
+        name: pyarrow.array(_coerce(kind, column), type=types[kind]) for (name, kind), column in zip(columns, values)
+    })
+    pyarrow.parquet.write_table(table, path, compression="zstd")
+
+def _write_npz(path: Path, columns: List[tuple], values: List[list]):
+    arrays = {}
+    for (name, kind), column in zip(columns, values):
+        column = _coerce(kind, column)
+        nulls = [value is None for value in column]
+        if kind == "text":
+            arrays[name] = numpy.array(["" if value is None else value for value in column], dtype=str)
+        elif any(nulls):
+            # NaN stands in for NULL, which forces integer and boolean columns to float
+            arrays[name] = numpy.array([numpy.nan if value is None else value for value in column], dtype=float)
+        else:
+            arrays[name] = numpy.array(column, dtype={"bool": bool, "int": numpy.int64, "float": float}[kind])
+        if any(nulls):
+            arrays[f"{name}__null"] = numpy.array(nulls, dtype=bool)
+    numpy.savez_compressed(path, **arrays)
+
+def _write_csv(path: Path, columns: List[tuple], values: List[list]):
+    with gzip.open(path, "wt", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(name for name, _ in columns)
+        writer.writerows(zip(*values))
+
+# format -> (file extension, writer), fastest to read back first
+FORMATS = {}
+if pyarrow is not None:
+    FORMATS["parquet"] = (".parquet", _write_parquet)
+if numpy is not None:
+    FORMATS["npz"] = (".npz", _write_npz)
+FORMATS["csv"] = (".csv.gz", _write_csv)
+
+def get_format(name: Optional[str] = None) -> str:
+    """Requested format, or the best one installed"""
+    name = name or os.environ.get("LIF3_EXPORT_FORMAT")
+    if name and name not in FORMATS:
+        raise ValueError(f"Export format '{name}' unavailable (installed: {', '.join(FORMATS)})")
+    return name or next(iter(FORMATS))
+
+def load_manifest(directory: Path) -> Dict[str, Any]:
+    path = directory / "manifest.json"
+    if not path.exists():
+        return {"tables": {}}
+    return json.loads(path.read_text())
+
+def save_manifest(directory: Path, manifest: Dict[str, Any]):
+    """Rewrite the manifest atomically, so an interrupted export resumes from its last finished part"""
+    tmp_path = directory / "manifest.json.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_path, directory / "manifest.json")
+
+def export_table(conn: sqlite3.Connection, directory: Path, table: str, manifest: Dict[str, Any],
+                 fmt: str, chunk_rows: int = CHUNK_ROWS) -> Dict[str, Any]:
+    """Write one part file per chunk of rows past the table's last exported id"""
+    extension, write = FORMATS[fmt]
+    columns = export_columns(conn, table)
+    names = ", ".join(name for name, _ in columns)
+    source, _, condition = DERIVED_EXPORTS.get(table, (table, None, None))
+    table_dir = directory / table
+    table_dir.mkdir(parents=True, exist_ok=True)
+
+    state = manifest["tables"].setdefault(table, {"last_id": 0, "rows": 0, "parts": []})
+    # Parts of one table share a schema: start over when it changed (or predates the manifest recording it)
+    if EXPORT_TABLES[table] == "snapshot" or state.get("columns") != [name for name, _ in columns]:
+        for part in state["parts"]:
+            (directory / part["file"]).unlink(missing_ok=True)
+        state.update(last_id=0, rows=0, parts=[], columns=[name for name, _ in columns])
+
+    exported = 0
+    cursor = conn.execute(f"""
+        SELECT {names} FROM {table_source(conn, source)}
+        WHERE id > ?{f" AND ({condition})" if condition else ""}
+        ORDER BY id
+    """, (state["last_id"],))
+    while True:
+        rows = cursor.fetchmany(chunk_rows)
+        if not rows:
+            break
+        values = [list(column) for column in zip(*rows)]
+        first_id, last_id = values[0][0], values[0][-1]
+        part_path = table_dir / f"part-{first_id:012d}-{last_id:012d}{extension}"
+        write(part_path, columns, values)
+        state["parts"].append({"file": str(part_path.relative_to(directory)), "format": fmt,
+                               "first_id": first_id, "last_id": last_id, "rows": len(rows)})
+        state["last_id"] = last_id
+        state["rows"] += len(rows)
+        exported += len(rows)
+        save_manifest(directory, manifest)
+    return {"table": table, "exported": exported, "total_rows": state["rows"],
+            "parts": len(state["parts"]), "last_id": state["last_id"]}
+
+def export_ledger(conn: sqlite3.Connection, directory: Optional[Path] = None, tables: Optional[List[str]] = None,
+                  fmt: Optional[str] = None, full: bool = False, chunk_rows: int = CHUNK_ROWS) -> Dict[str, Any]:
+    """Export new rows of each table (all rows with full=True) into directory"""
+    directory = Path(directory or export_dir())
+    tables = tables or list(EXPORT_TABLES)
+    unknown = [table for table in tables if table not in EXPORT_TABLES]
+    if unknown:
+        raise ValueError(f"Cannot export {', '.join(unknown)} (choose from {', '.join(EXPORT_TABLES)})")
+    fmt = get_format(fmt)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    manifest = load_manifest(directory)
+    if full:
+        for table in tables:
+            for part in manifest["tables"].pop(table, {}).get("parts", []):
+                (directory / part["file"]).unlink(missing_ok=True)
+
+    started = time.perf_counter()
+    results = [export_table(conn, directory, table, manifest, fmt, chunk_rows) for table in tables]
+    manifest["exported_at"] = datetime.now().isoformat(timespec="seconds")
+    save_manifest(directory, manifest)
+    return {
+        "directory": str(directory),
+        "format": fmt,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "tables": results
+    }
+
+def render_export(result: Dict[str, Any]) -> str:
+    """Markdown block for the export_ledger tool"""
+    lines = [f"📤 **Ledger exported** ({result['format']}, {result['elapsed_ms']:,.0f} ms)", "",
+             f"Directory: {result['directory']}", ""]
+    for table in result["tables"]:
+        lines.append(f"• {table['table']}: +{table['exported']:,} row(s), {table['total_rows']:,} total "
+                     f"in {table['parts']} part(s), last id {table['last_id']}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Export LIF3 ledger tables to columnar files')
+    parser.add_argument('--db', default=resolve_db_path(), help='LIF3 SQLite database')
+    parser.add_argument('--out', default=str(export_dir()), help='Export directory (holds manifest.json)')
+    parser.add_argument('--tables', help=f'Comma-separated subset of: {", ".join(EXPORT_TABLES)}')
+    parser.add_argument('--format', choices=list(FORMATS), help='Defaults to the best installed format')
+    parser.add_argument('--full', action='store_true', help='Discard earlier parts and export everything again')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help='Rows per part file')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(f"{Path(args.db).resolve().as_uri()}?mode=ro", uri=True)
+    ledger_archive.attach_archive(conn, args.db)
+    result = export_ledger(conn, Path(args.out), args.tables.split(",") if args.tables else None,
+                           args.format, args.full, args.chunk_rows)
+    conn.close()
+    print(render_export(result))
+
+if __name__ == "__main__":
+    main()
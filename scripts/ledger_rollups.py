@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+LIF3 Ledger Rollups - Pre-aggregated time series
+Daily, weekly and monthly totals per account, life category and subcategory,
+plus business metric rollups (MRR over time), maintained by insert triggers
+"""
+
+import sqlite3
+from typing import Dict, List, Any, Optional
+
+PERIODS = ("daily", "weekly", "monthly")
+
+# Maps a DATE expression to the first day of its bucket (weeks start on Monday)
+PERIOD_START_SQL = {
+    "daily": "date({col})",
+    "weekly": "date({col}, 'weekday 0', '-6 days')",
+    "monthly": "date({col}, 'start of month')",
+}
+
+METRIC_TABLES = {
+    "tech": "tech_business_metrics",
+    "brand": "brand_business_metrics",
+}
+
+ROLLUP_SCHEMA = """
+    -- Transaction totals per period bucket
+    CREATE TABLE IF NOT EXISTS transaction_rollups (
+        period TEXT NOT NULL, -- 'daily', 'weekly', 'monthly'
+        period_start DATE NOT NULL,
+        account_id INTEGER NOT NULL DEFAULT 0,
+        life_category TEXT NOT NULL DEFAULT '',
+        subcategory TEXT NOT NULL DEFAULT '',
+        income REAL DEFAULT 0,
+        expenses REAL DEFAULT 0,
+        net_amount REAL DEFAULT 0,
+        transaction_count INTEGER DEFAULT 0,
+        PRIMARY KEY (period, period_start, account_id, life_category, subcategory)
+    ) WITHOUT ROWID;
+
+    -- Business metric totals per period bucket
+    CREATE TABLE IF NOT EXISTS metric_rollups (
+        business TEXT NOT NULL, -- 'tech', 'brand'
+        metric_name TEXT NOT NULL,
+        period TEXT NOT NULL,
+        period_start DATE NOT NULL,
+        total_value REAL DEFAULT 0,
+        sample_count INTEGER DEFAULT 0,
+        min_value REAL,
+        max_value REAL,
+        last_value REAL,
+        last_date DATE,
+        PRIMARY KEY (business, metric_name, period, period_start)
+    ) WITHOUT ROWID;
+"""
+
+# Balance adjustments record a new balance, not a cash flow, so they stay out of the series
+TRANSACTION_ROLLUP_UPSERT = """
+        INSERT INTO transaction_rollups
+            (period, period_start, account_id, life_category, subcategory,
+             income, expenses, net_amount, transaction_count)
+        VALUES ('{period}', {period_start}, COALESCE(NEW.account_id, 0),
+                COALESCE(NEW.life_category, ''), COALESCE(NEW.subcategory, ''),
+                MAX(NEW.amount, 0), MIN(NEW.amount, 0), NEW.amount, 1)
+        ON CONFLICT (period, period_start, account_id, life_category, subcategory) DO UPDATE SET
+            income = income + excluded.income,
+            expenses = expenses + excluded.expenses,
+            net_amount = net_amount + excluded.net_amount,
+            transaction_count = transaction_count + 1;
+"""
+
+METRIC_ROLLUP_UPSERT = """
+        INSERT INTO metric_rollups
+            (business, metric_name, period, period_start, total_value, sample_count,
+             min_value, max_value, last_value, last_date)
+        VALUES ('{business}', NEW.metric_name, '{period}', {period_start},
+                COALESCE(NEW.metric_value, 0), 1, NEW.metric_value, NEW.metric_value,
+                NEW.metric_value, COALESCE(NEW.date, date('now')))
+        ON CONFLICT (business, metric_name, period, period_start) DO UPDATE SET
+            total_value = total_value + excluded.total_value,
+            sample_count = sample_count + 1,
+            min_value = MIN(COALESCE(min_value, excluded.min_value), excluded.min_value),
+            max_value = MAX(COALESCE(max_value, excluded.max_value), excluded.max_value),
+            last_value = CASE WHEN excluded.last_date >= last_date THEN excluded.last_value ELSE last_value END,
+            last_date = MAX(last_date, excluded.last_date);
+"""
+
+def _trigger_sql() -> str:
+    """Build the insert triggers that keep every rollup bucket current"""
+    transaction_body = "".join(
+        TRANSACTION_ROLLUP_UPSERT.format(
+            period=period,
+            period_start=PERIOD_START_SQL[period].format(col="COALESCE(NEW.date, 'now')")
+        )
+        for period in PERIODS
+    )
+    statements = [f"""
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup
+    AFTER INSERT ON transactions
+    WHEN NEW.category IS NOT 'adjustment'
+    BEGIN{transaction_body}    END;
+    """]
+
+    for business, table in METRIC_TABLES.items():
+        metric_body = "".join(
+            METRIC_ROLLUP_UPSERT.format(
+                business=business,
+                period=period,
+                period_start=PERIOD_START_SQL[period].format(col="COALESCE(NEW.date, 'now')")
+            )
+            for period in PERIODS
+        )
+        statements.append(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup
+    AFTER INSERT ON {table}
+    BEGIN{metric_body}    END;
+    """)
+
+    return "".join(statements)
+
+def install(conn: sqlite3.Connection):
+    """Create rollup tables and triggers, backfilling when the tables are new"""
+    existing = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('transaction_rollups', 'metric_rollups')"
+    ).fetchone()[0]
+
+    conn.executescript(ROLLUP_SCHEMA)
+    conn.executescript(_trigger_sql())
+
+    if existing < 2:
+        rebuild(conn)
+
+def rebuild(conn: sqlite3.Connection):
+    """Recompute every rollup bucket from the raw tables"""
+    conn.execute("DELETE FROM transaction_rollups")
+    conn.execute("DELETE FROM metric_rollups")
+
+    for period in PERIODS:
+        period_start = PERIOD_START_SQL[period].format(col="COALESCE(date, 'now')")
+        conn.execute(f"""
+            INSERT INTO transaction_rollups
+                (period, period_start, account_id, life_category, subcategory,
+                 income, expenses, net_amount, transaction_count)
+            SELECT '{period}', {period_start}, COALESCE(account_id, 0),
+                   COALESCE(life_category, ''), COALESCE(subcategory, ''),
+                   SUM(MAX(amount, 0)), SUM(MIN(amount, 0)), SUM(amount), COUNT(*)
+            FROM transactions
+            WHERE category IS NOT 'adjustment'
+            GROUP BY 2, 3, 4, 5
+        """)
+
+        for business, table in METRIC_TABLES.items():
+            conn.execute(f"""
+                INSERT INTO metric_rollups
+                    (business, metric_name, period, period_start, total_value, sample_count,
+                     min_value, max_value, last_value, last_date)
+                SELECT '{business}', metric_name, '{period}', bucket,
+                       SUM(COALESCE(metric_value, 0)), COUNT(*), MIN(metric_value), MAX(metric_value),
+                       MAX(CASE WHEN newest = 1 THEN metric_value END),
+                       MAX(CASE WHEN newest = 1 THEN metric_date END)
+                FROM (
+                    SELECT metric_name, metric_value, {period_start} AS bucket,
+                           COALESCE(date, date('now')) AS metric_date,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY metric_name, {period_start}
+                               ORDER BY COALESCE(date, date('now')) DESC, id DESC
+                           ) AS newest
+                    FROM {table}
+                )
+                GROUP BY metric_name, bucket
+            """)
+
+def _check_period(period: str):
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}' (expected one of: {', '.join(PERIODS)})")
+
+def get_transaction_series(conn: sqlite3.Connection, period: str = "monthly",
+                           account_id: Optional[int] = None,
+                           life_category: Optional[str] = None,
+                           subcategory: Optional[str] = None,
+                           start: Optional[str] = None,
+                           end: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Return one row per bucket, summed over the dimensions that are not filtered"""
+    _check_period(period)
+    clauses, params = ["period = ?"], [period]
+    for column, value in (("account_id", account_id), ("life_category", life_category),
+                          ("subcategory", subcategory)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if start:
+        clauses.append("period_start >= ?")
+        params.append(start)
+    if end:
+        clauses.append("period_start <= ?")
+        params.append(end)
+
+    rows = conn.execute(f"""
+        SELECT period_start, SUM(income), SUM(expenses), SUM(net_amount), SUM(transaction_count)
+        FROM transaction_rollups
+        WHERE {' AND '.join(clauses)}
+        GROUP BY period_start
+        ORDER BY period_start
+    """, params).fetchall()
+
+    return [
+        {"period_start": row[0], "income": row[1], "expenses": row[2],
+         "net_amount": row[3], "transaction_count": row[4]}
+        for row in rows
+    ]
+
+def get_subcategory_breakdown(conn: sqlite3.Connection, period: str = "monthly",
+                              start: Optional[str] = None,
+                              end: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Return spend per subcategory and bucket, e.g. monthly spend by subcategory"""
+    _check_period(period)
+    clauses, params = ["period = ?"], [period]
+    if start:
+        clauses.append("period_start >= ?")
+        params.append(start)
+    if end:
+        clauses.append("period_start <= ?")
+        params.append(end)
+
+    rows = conn.execute(f"""
+        SELECT period_start, life_category, subcategory, SUM(expenses), SUM(income), SUM(transaction_count)
+        FROM transaction_rollups
+        WHERE {' AND '.join(clauses)}
+        GROUP BY period_start, life_category, subcategory
+        ORDER BY period_start, life_category, subcategory
+    """, params).fetchall()
+
+    return [
+        {"period_start": row[0], "life_category": row[1], "subcategory": row[2],
+         "expenses": row[3], "income": row[4], "transaction_count": row[5]}
+        for row in rows
+    ]
+
+def get_metric_series(conn: sqlite3.Connection, period: str = "monthly",
+                      business: Optional[str] = None,
+                      metric_name: Optional[str] = None,
+                      start: Optional[str] = None,
+                      end: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Return business metric buckets, e.g. monthly_revenue per month for MRR"""
+    _check_period(period)
+    clauses, params = ["period = ?"], [period]
+    if business:
+        clauses.append("business = ?")
+        params.append(business)
+    if metric_name:
+        clauses.append("metric_name = ?")
+        params.append(metric_name)
+    if start:
+        clauses.append("period_start >= ?")
+        params.append(start)
+    if end:
+        clauses.append("period_start <= ?")
+        params.append(end)
+
+    rows = conn.execute(f"""
+        SELECT business, metric_name, period_start, total_value, sample_count,
+               min_value, max_value, last_value, last_date
+        FROM metric_rollups
+        WHERE {' AND '.join(clauses)}
+        ORDER BY business, metric_name, period_start
+    """, params).fetchall()
+
+    return [
+        {"business": row[0], "metric_name": row[1], "period_start": row[2],
+         "total_value": row[3], "sample_count": row[4], "min_value": row[5],
+         "max_value": row[6], "last_value": row[7], "last_date": row[8]}
+        for row in rows
+    ]
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+LIF3 Ledger Search - FTS5 full-text index over transactions and goals
+External-content FTS5 tables mirror transactions.description/notes and
+goals.title/description, kept in sync by triggers, so searching is a ranked
+index lookup instead of a LIKE scan. Date, life category and amount filters
+are backed by B-tree indexes on transactions.
+"""
+
+import argparse
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from lif3_config import resolve_db_path
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Matches counted and scored by bm25 per query (newest first); older ones need a narrower query or date filter
+RANK_WINDOW = 250
+
+SEARCH_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+        description, notes,
+        content = 'transactions', content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    );
+
+    CREATE VIRTUAL TABLE IF NOT EXISTS goals_fts USING fts5(
+        title, description,
+        content = 'goals', content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    );
+
+    -- Filter columns for search (and for the date-ordered listings elsewhere)
+    CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+    CREATE INDEX IF NOT EXISTS idx_transactions_life_category_date ON transactions (life_category, date);
+    CREATE INDEX IF NOT EXISTS idx_transactions_amount ON transactions (amount);
+
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_insert
+    AFTER INSERT ON transactions
+    BEGIN
+        INSERT INTO transactions_fts (rowid, description, notes) VALUES (NEW.id, NEW.description, NEW.notes);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_delete
+    AFTER DELETE ON transactions
+    BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description, notes)
+        VALUES ('delete', OLD.id, OLD.description, OLD.notes);
+    END;
+
+    -- Only text edits touch the index (recurring detection rewrites flags in bulk)
+    CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_update
+    AFTER UPDATE OF description, notes ON transactions
+    BEGIN
+        INSERT INTO transactions_fts (transactions_fts, rowid, description, notes)
+        VALUES ('delete', OLD.id, OLD.description, OLD.notes);
+        INSERT INTO transactions_fts (rowid, description, notes) VALUES (NEW.id, NEW.description, NEW.notes);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_goals_fts_insert
+    AFTER INSERT ON goals
+    BEGIN
+        INSERT INTO goals_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_goals_fts_delete
+    AFTER DELETE ON goals
+    BEGIN
+        INSERT INTO goals_fts (goals_fts, rowid, title, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_goals_fts_update
+    AFTER UPDATE OF title, description ON goals
+    BEGIN
+        INSERT INTO goals_fts (goals_fts, rowid, title, description)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description);
+        INSERT INTO goals_fts (rowid, title, description) VALUES (NEW.id, NEW.title, NEW.description);
+    END;
+"""
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+def install(conn: sqlite3.Connection):
+    """Create the FTS tables, triggers and filter indexes, indexing existing rows when new"""
+    is_new = not _table_exists(conn, "transactions_fts")
+    conn.executescript(SEARCH_SCHEMA)
+    if is_new:
+        rebuild(conn)
+
+def rebuild(conn: sqlite3.Connection):
+    """Re-read both content tables into their indexes"""
+    conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO goals_fts (goals_fts) VALUES ('rebuild')")
+
+def match_expression(query: str) -> Optional[str]:
+    """Free text → FTS5 query: every word must match, the last one as a prefix"""
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+def highlight(text: Optional[str], query: str) -> Optional[str]:
+    """Bold the words the query matched (FTS5 snippet() re-runs the whole MATCH per row, so this is done here)"""
+    tokens = _TOKEN.findall(query)
+    if not text or not tokens:
+        return text
+    words = "|".join(re.escape(token) for token in tokens[:-1])
+    pattern = rf"\b(?:(?:{words})\b|{re.escape(tokens[-1])}\w*)" if words else rf"\b{re.escape(tokens[-1])}\w*"
+    return re.sub(pattern, lambda hit: f"**{hit.group(0)}**", text, flags=re.IGNORECASE)
+
+def search_transactions(conn: sqlite3.Connection, query: str = "", start: Optional[str] = None,
+                        end: Optional[str] = None, life_category: Optional[str] = None,
+                        min_amount: Optional[float] = None, max_amount: Optional[float] = None,
+                        page: int = 1, page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+    """Ranked matches (newest first without a query) with filters and page-based pagination
+
+    Only the newest RANK_WINDOW matches are counted and ranked ("more" flags the rest), so a common
+    word costs the same on any size of ledger.
+    """
+    page = max(int(page), 1)
+    page_size = min(max(int(page_size), 1), MAX_PAGE_SIZE)
+    match = match_expression(query or "")
+
+    clauses = []
+    params: List[Any] = []
+    for clause, value in (
+        ("t.date >= ?", start),
+        ("t.date <= ?", end),
+        ("t.life_category = ?", life_category),
+        ("t.amount >= ?", min_amount),
+        ("t.amount <= ?", max_amount),
+    ):
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+
+    where = "".join(f" AND {clause}" for clause in clauses)
+
+    if match:
+        # CROSS JOIN keeps the FTS lookup outermost (otherwise the planner may run MATCH once per
+        # filtered row); newest-first rowid order lets the scan stop after RANK_WINDOW hits
+        window = conn.execute(f"""
+            SELECT f.rowid, bm25(transactions_fts, 2.0, 1.0), t.date
+            FROM transactions_fts f CROSS JOIN transactions t ON t.id = f.rowid
+            WHERE transactions_fts MATCH ?{where}
+            ORDER BY f.rowid DESC
+            LIMIT {RANK_WINDOW + 1}
+        """, [match] + params).fetchall()
+        total = len(window)
+        window = sorted(window[:RANK_WINDOW], key=lambda hit: hit[2] or "", reverse=True)
+        window.sort(key=lambda hit: hit[1])
+        scores = {hit[0]: hit[1] for hit in window[(page - 1) * page_size:page * page_size]}
+        placeholders = ",".join("?" * len(scores))
+        rows = sorted(conn.execute(f"""
+            SELECT t.id, t.date, t.amount, t.description, t.category, t.subcategory, t.life_category, t.notes, NULL
+            FROM transactions t WHERE t.id IN ({placeholders})
+        """, list(scores)).fetchall(), key=lambda row: list(scores).index(row[0])) if scores else []
+        rows = [tuple(row[:8]) + (scores[row[0]],) for row in rows]
+    else:
+        total = conn.execute(f"""
+            SELECT COUNT(*) FROM (SELECT 1 FROM transactions t WHERE 1{where} LIMIT {RANK_WINDOW + 1})
+        """, params).fetchone()[0]
+        rows = conn.execute(f"""
+            SELECT t.id, t.date, t.amount, t.description, t.category, t.subcategory, t.life_category,
+                   t.notes, NULL
+            FROM transactions t
+            WHERE 1{where}
+            ORDER BY t.date DESC, t.id DESC
+            LIMIT ? OFFSET ?
+        """, params + [page_size, (page - 1) * page_size]).fetchall()
+    more = total > RANK_WINDOW
+    total = min(total, RANK_WINDOW)
+
+    return {
+        "query": query,
+        "match": match,
+        "total": total,
+        "more": more,
+        "page": page,
+        "page_size": page_size,
+        "pages": (total + page_size - 1) // page_size,
+        "results": [
+            {
+                "id": row[0], "date": row[1], "amount": row[2], "description": row[3], "category": row[4],
+                "subcategory": row[5], "life_category": row[6], "notes": row[7],
+                "score": None if row[8] is None else round(row[8], 4),
+                "snippet": highlight(row[3], query) if match else None
+            }
+            for row in rows
+        ]
+    }
+
+def search_goals(conn: sqlite3.Connection, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Ranked goals whose title or description matches (title hits first)"""
+    match = match_expression(query)
+    if not match:
+        return []
+    rows = conn.execute("""
+        SELECT g.id, g.title, g.life_category, g.current_amount, g.target_amount, g.status
+        FROM goals_fts f JOIN goals g ON g.id = f.rowid
+        WHERE goals_fts MATCH ?
+        ORDER BY bm25(goals_fts, 3.0, 1.0)
+        LIMIT ?
+    """, (match, limit)).fetchall()
+    return [
+        {"id": row[0], "title": row[1], "life_category": row[2], "current_amount": row[3],
+         "target_amount": row[4], "status": row[5]}
+        for row in rows
+    ]
+
+def render_results(result: Dict[str, Any], goals: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Markdown block for the search_transactions tool"""
+    heading = f"🔎 **{result['total']:,}{'+' if result['more'] else ''} transaction(s)**" + (f" matching \"{result['query']}\"" if result["query"] else "")
+    lines = [heading, ""]
+    if not result["results"]:
+        lines.append("No matching transactions — try fewer words or a wider date range")
+    for row in result["results"]:
+        text = row["snippet"] or row["description"] or ""
+        lines.append(f"• {row['date']} | R{row['amount']:,.2f} | {text} ({row['life_category'] or 'uncategorized'}, #{row['id']})")
+    if result["pages"] > 1:
+        lines += ["", f"Page {result['page']} of {result['pages']} (page_size {result['page_size']})"]
+    if goals:
+        lines += ["", "**Matching goals:**"]
+        lines += [f"• {goal['title']} ({goal['life_category']}, {goal['status']})" for goal in goals]
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Search LIF3 transactions and goals')
+    parser.add_argument('query', nargs='?', default='', help='Words to search for (last word matches as a prefix)')
+    parser.add_argument('--db', default=resolve_db_path(), help='LIF3 SQLite database')
+    parser.add_argument('--start', help='First date (YYYY-MM-DD)')
+    parser.add_argument('--end', help='Last date (YYYY-MM-DD)')
+    parser.add_argument('--life-category', help='personal, work, tech_business or brand_business')
+    parser.add_argument('--page', type=int, default=1)
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild both indexes from their tables first')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    install(conn)
+    if args.rebuild:
+        rebuild(conn)
+        conn.commit()
+    result = search_transactions(conn, args.query, args.start, args.end, args.life_category, page=args.page)
+    print(render_results(result, search_goals(conn, args.query) if args.query else None))
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+LIF3 Configuration - Database locations and per-tenant connection routing
+Honors LIF3_DB_PATH / DATABASE_PATH (as passed by config/mcp_servers.json)
+and maps tenant ids to one SQLite file each under LIF3_TENANT_DIR.
+"""
+
+import os
+import re
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+REPO_ROOT = Path(__file__).parent.parent
+DEFAULT_DB_PATH = REPO_ROOT / "data" / "lif3_financial.db"
+DEFAULT_TENANT_DIR = REPO_ROOT / "data" / "tenants"
+DEFAULT_MAX_TENANT_CONNECTIONS = 16
+
+# How long a connection waits on another process's write lock before "database is locked"
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+
+# PRAGMA user_version stamp for a file holding only lif3_mcp_server's base tables;
+# mcp_financial_server stamps a higher SCHEMA_VERSION once its full schema is installed
+BASE_SCHEMA_VERSION = 1
+
+TENANT_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+def resolve_db_path() -> str:
+    """Primary database: LIF3_DB_PATH, then DATABASE_PATH, then data/lif3_financial.db"""
+    return os.environ.get("LIF3_DB_PATH") or os.environ.get("DATABASE_PATH") or str(DEFAULT_DB_PATH)
+
+def busy_timeout_ms() -> int:
+    return int(os.environ.get("LIF3_BUSY_TIMEOUT_MS", DEFAULT_BUSY_TIMEOUT_MS))
+
+def tenant_dir() -> Path:
+    return Path(os.environ.get("LIF3_TENANT_DIR") or DEFAULT_TENANT_DIR)
+
+def tenant_db_path(tenant: Optional[str], primary_path: Optional[str] = None) -> str:
+    """Database file for a tenant; None or 'default' maps to the primary database"""
+    if tenant in (None, "", "default"):
+        return primary_path or resolve_db_path()
+    if not TENANT_ID.match(tenant):
+        raise ValueError(f"Invalid tenant id: {tenant!r} (letters, digits, '-' and '_' only)")
+    return str(tenant_dir() / f"{tenant}.db")
+
+def schema_version(path: str) -> int:
+    """PRAGMA user_version of a database file (0 when missing or never stamped)"""
+    if not os.path.exists(path):
+        return 0
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+class LIF3TenantRouter:
+    """Lazily opens one connection per tenant database, closing the least recently used past the cap"""
+
+    def __init__(self, open_connection: Callable[[str], sqlite3.Connection],
+                 max_connections: Optional[int] = None,
+                 primary_path: Callable[[], str] = resolve_db_path):
+        self.open_connection = open_connection
+        self.primary_path = primary_path
+        self.max_connections = max_connections or int(
+            os.environ.get("LIF3_MAX_TENANT_CONNECTIONS", DEFAULT_MAX_TENANT_CONNECTIONS)
+        )
+        self.connections: "OrderedDict[str, sqlite3.Connection]" = OrderedDict()
+        self.opened = 0
+        self.evicted = 0
+
+    def get(self, tenant: Optional[str] = None) -> sqlite3.Connection:
+        """Connection for a tenant, opening (and schema-checking) it on first use"""
+        primary = self.primary_path()
+        path = tenant_db_path(tenant, primary)
+        conn = self.connections.get(path)
+        if conn is not None:
+            self.connections.move_to_end(path)
+            return conn
+
+        if path != primary:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self.open_connection(path)
+        self.connections[path] = conn
+        self.opened += 1
+
+        while len(self.connections) > self.max_connections:
+            _, oldest = self.connections.popitem(last=False)
+            oldest.close()
+            self.evicted += 1
+        return conn
+
+    def close_all(self):
+        while self.connections:
+            _, conn = self.connections.popitem()
+            conn.close()
+
+    def stats(self) -> dict:
+        return {
+            "open_connections": len(self.connections),
+            "max_connections": self.max_connections,
+            "opened": self.opened,
+            "evicted": self.evicted,
+            "databases": list(self.connections)
+        }
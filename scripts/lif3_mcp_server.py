@@ -1,23 +1,101 @@
 #!/usr/bin/env python3
 
+import argparse
 import asyncio
+import contextlib
 import sqlite3
 import json
 import sys
 import os
 from datetime import datetime
 from mcp.server import Server
-from mcp.server.stdio import stdio_server
-from mcp.types import Tool, TextContent
+from mcp.types import Resource, Tool, TextContent
+
+import server_metrics
+from server_metrics import instrument
+from lif3_config import resolve_db_path, schema_version, BASE_SCHEMA_VERSION, LIF3TenantRouter
+from read_replica import LIF3ReadReplicas
+import ledger_archive
+import mcp_transport
+from mcp_transport import LIF3SessionLimits
 
 # Configuration
-DATABASE_PATH = "/Users/ccladysmith/Desktop/dev/l1f3/data/lif3_financial.db"
-CURRENT_NET_WORTH = 239625
+DATABASE_PATH = resolve_db_path()
 TARGET_NET_WORTH = 1800000
 
 # Initialize MCP server
 server = Server("lif3-financial")
 
+# Per-session request rate and concurrency caps, enabled when serving many sessions over HTTP
+SESSIONS = LIF3SessionLimits()
+
+# Year files attached per database, so a query re-attaches only after archive_ledger adds a year
+ARCHIVE_YEARS = {}
+
+def open_connection(path: str) -> sqlite3.Connection:
+    """Open an instrumented connection with the archive attached (transactions_all and friends)"""
+    conn = server_metrics.connect(path)
+    ledger_archive.attach_archive(conn, path)
+    ARCHIVE_YEARS[path] = ledger_archive.archive_years(path)
+    return conn
+
+# One cached connection shared by every request and session (the first open pays connect and archive attach)
+ROUTER = LIF3TenantRouter(open_connection, primary_path=lambda: DATABASE_PATH)
+
+def get_db_connection():
+    """Get the shared instrumented database connection"""
+    return ROUTER.get()
+
+# Ad-hoc queries read from a backup-API snapshot when LIF3_READ_REPLICA is memory or file
+REPLICAS = LIF3ReadReplicas()
+
+# Ad-hoc SQL runs on connections every session shares, so it may only read: writes, PRAGMA assignments,
+# ATTACH/DETACH and schema changes would persist for everyone else
+READ_ONLY_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+READ_ONLY_PRAGMAS = {"table_info", "table_xinfo", "table_list", "index_list", "index_info", "index_xinfo",
+                     "foreign_key_list", "database_list"}
+
+@contextlib.contextmanager
+def read_only(conn: sqlite3.Connection):
+    """Deny every statement but queries (and schema-inspection pragmas) while the block runs"""
+    denied = []
+
+    def authorizer(action, arg1, arg2, db_name, source):
+        if action in READ_ONLY_ACTIONS:
+            return sqlite3.SQLITE_OK
+        if action == sqlite3.SQLITE_PRAGMA and arg1.lower() in READ_ONLY_PRAGMAS:
+            return sqlite3.SQLITE_OK
+        denied.append(action)
+        return sqlite3.SQLITE_DENY
+
+    conn.set_authorizer(authorizer)
+    try:
+        yield
+    except sqlite3.DatabaseError:
+        if denied:
+            raise ValueError("query_database only runs read-only queries (SELECT or WITH ... SELECT)") from None
+        raise
+    finally:
+        conn.set_authorizer(None)
+
+def run_query(query: str) -> tuple:
+    """Rows and column names for a read-only ad-hoc query, from the read replica when enabled"""
+    if REPLICAS.enabled:
+        conn = REPLICAS.get(DATABASE_PATH)
+    else:
+        conn = get_db_connection()
+        years = ledger_archive.archive_years(DATABASE_PATH)
+        if ARCHIVE_YEARS.get(DATABASE_PATH) != years:
+            ledger_archive.attach_archive(conn, DATABASE_PATH)
+            ARCHIVE_YEARS[DATABASE_PATH] = years
+    with read_only(conn):
+        cursor = conn.execute(query)
+        return cursor.fetchall(), [description[0] for description in cursor.description]
+
+def current_net_worth() -> float:
+    """Sum of active account balances"""
+    return get_db_connection().execute("SELECT COALESCE(SUM(balance), 0) FROM accounts WHERE is_active = 1").fetchone()[0]
+
 def init_database():
     """Initialize the database with LIF3 schema and data"""
     conn = sqlite3.connect(DATABASE_PATH)
@@ -85,9 +163,41 @@ def init_database():
             ('Emergency Fund', 'Build R300,000 emergency fund', 'personal', 300000, 88750, '2025-12-31', 'high')
         """)
     
+    cursor.execute(f"PRAGMA user_version = {BASE_SCHEMA_VERSION}")
     conn.commit()
     conn.close()
 
+@server.list_resources()
+async def list_resources():
+    """List LIF3 server resources"""
+    return [
+        Resource(
+            uri="lif3://metrics",
+            name="Server Metrics",
+            description="Latency, response size and SQL statement histograms per tool and statement",
+            mimeType="application/json"
+        ),
+        Resource(
+            uri="lif3://metrics/prometheus",
+            name="Server Metrics (Prometheus)",
+            description="Same metrics in Prometheus text exposition format",
+            mimeType="text/plain"
+        )
+    ]
+
+@server.read_resource()
+@SESSIONS.guard(server)
+@instrument("resource")
+async def read_resource(uri):
+    """Read LIF3 server resources"""
+    uri = str(uri)
+    if uri == "lif3://metrics":
+        return json.dumps({**server_metrics.REGISTRY.snapshot(), "connections": ROUTER.stats(), "sessions": SESSIONS.stats()},
+                          separators=(",", ":"))
+    elif uri == "lif3://metrics/prometheus":
+        return server_metrics.REGISTRY.render_prometheus()
+    raise ValueError(f"Unknown resource: {uri}")
+
 @server.list_tools()
 async def list_tools():
     """List available LIF3 tools"""
@@ -137,7 +247,7 @@ async def list_tools():
         ),
         Tool(
             name="query_database",
-            description="Query the LIF3 financial database",
+            description="Query the LIF3 financial database (transactions_all and *_business_metrics_all include archived years)",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -149,12 +259,15 @@ async def list_tools():
     ]
 
 @server.call_tool()
+@SESSIONS.guard(server)
+@instrument("tool")
 async def call_tool(name: str, arguments: dict):
     """Handle tool calls"""
     
     if name == "net_worth_progress":
-        progress = (CURRENT_NET_WORTH / TARGET_NET_WORTH) * 100
-        remaining = TARGET_NET_WORTH - CURRENT_NET_WORTH
+        net_worth = current_net_worth()
+        progress = (net_worth / TARGET_NET_WORTH) * 100
+        remaining = TARGET_NET_WORTH - net_worth
         monthly_required = remaining / 18
         
         return [TextContent(
@@ -162,10 +275,10 @@ async def call_tool(name: str, arguments: dict):
             text=f"""💰 LIF3 NET WORTH PROGRESS
 
 📊 Current Status:
-• Current Net Worth: R{CURRENT_NET_WORTH:,}
+• Current Net Worth: R{net_worth:,.0f}
 • Target Net Worth: R{TARGET_NET_WORTH:,}
 • Progress: {progress:.1f}%
-• Remaining: R{remaining:,}
+• Remaining: R{remaining:,.0f}
 
 🎯 Timeline Analysis:
 • Target Timeline: 18 months
@@ -173,9 +286,9 @@ async def call_tool(name: str, arguments: dict):
 • Current Monthly Capacity: R35,500 (based on savings rate)
 
 📈 Milestone Breakdown:
-• Emergency Fund (R300K): {(CURRENT_NET_WORTH/300000*100):.1f}%
-• Investment Base (R500K): {(CURRENT_NET_WORTH/500000*100):.1f}%
-• First Million (R1M): {(CURRENT_NET_WORTH/1000000*100):.1f}%
+• Emergency Fund (R300K): {(net_worth/300000*100):.1f}%
+• Investment Base (R500K): {(net_worth/500000*100):.1f}%
+• First Million (R1M): {(net_worth/1000000*100):.1f}%
 • Ultimate Goal (R1.8M): {progress:.1f}%
 
 🚀 Strategy: 43V3R business growth + IT career advancement + smart investments"""
@@ -188,14 +301,12 @@ async def call_tool(name: str, arguments: dict):
         transaction_type = arguments.get('type', 'expense')
         
         # Log to database
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        cursor.execute("""
+        conn = get_db_connection()
+        conn.execute("""
             INSERT INTO transactions (account_id, amount, description, category, life_category, date)
             VALUES (1, ?, ?, ?, 'personal', DATE('now'))
         """, (amount if transaction_type == 'income' else -abs(amount), description, category))
         conn.commit()
-        conn.close()
         
         return [TextContent(
             type="text",
@@ -221,7 +332,8 @@ async def call_tool(name: str, arguments: dict):
     
     elif name == "savings_calculator":
         months = arguments.get('months', 18)
-        monthly_needed = (TARGET_NET_WORTH - CURRENT_NET_WORTH) / months
+        net_worth = current_net_worth()
+        monthly_needed = (TARGET_NET_WORTH - net_worth) / months
         
         return [TextContent(
             type="text",
@@ -229,7 +341,7 @@ async def call_tool(name: str, arguments: dict):
 
 Required Monthly Savings: R{monthly_needed:,.0f}
 Timeline: {months} months
-Current Net Worth: R{CURRENT_NET_WORTH:,}
+Current Net Worth: R{net_worth:,.0f}
 Target Net Worth: R{TARGET_NET_WORTH:,}"""
         )]
     
@@ -237,12 +349,7 @@ Target Net Worth: R{TARGET_NET_WORTH:,}"""
         query = arguments.get('query', '')
         
         try:
-            conn = sqlite3.connect(DATABASE_PATH)
-            cursor = conn.cursor()
-            cursor.execute(query)
-            results = cursor.fetchall()
-            columns = [description[0] for description in cursor.description]
-            conn.close()
+            results, columns = run_query(query)
             
             if not results:
                 return [TextContent(type="text", text="No results found.")]
@@ -263,14 +370,16 @@ Target Net Worth: R{TARGET_NET_WORTH:,}"""
     else:
         return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
-async def main():
+async def main(args: argparse.Namespace):
     """Run the MCP server"""
-    # Initialize database
-    init_database()
+    # Initialize database only if neither server has stamped it yet
+    if schema_version(DATABASE_PATH) < BASE_SCHEMA_VERSION:
+        init_database()
     
     # Start server
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(read_stream, write_stream, server.create_initialization_options())
+    await mcp_transport.serve(server, args, SESSIONS)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='LIF3 MCP server')
+    mcp_transport.add_transport_arguments(parser, default_port=8766, port_env="LIF3_MCP_SERVER_PORT")
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file
@@ -5,19 +5,68 @@ Ethan Barnes - Starting Fresh: R0 → R500,000 by Dec 2025
 4 Life Categories: Personal, Work, 43V3R Tech, 43V3R Brand
 """
 
+import argparse
 import asyncio
+import contextvars
+import inspect
 import sqlite3
 import json
 import os
-from datetime import datetime, date
-from typing import Dict, List, Any, Optional
+import sys
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Any, Optional, Union
+from urllib.parse import urlsplit, parse_qsl
 from mcp.server import Server, NotificationOptions
-from mcp.types import Resource, Tool, TextContent, EmbeddedResource
+from mcp.types import Resource, ResourceTemplate, Tool, TextContent, EmbeddedResource, TextResourceContents
 
-app = Server("lif3-financial-server")
+import ledger_rollups
+import ledger_changes
+import ledger_events
+import habit_tracker
+import insight_engine
+import expense_analytics
+import fx_rates
+import portfolio
+import ledger_search
+import ledger_export
+import ledger_archive
+from name_resolver import NAMES, matched_note
+from payload_serializer import get_serializer, fetch_dicts
+import server_metrics
+from server_metrics import instrument
+from lif3_config import resolve_db_path, tenant_db_path, LIF3TenantRouter
+from read_replica import LIF3ReadReplicas
+from write_queue import LIF3WriteQueue
+from resource_subscriptions import LIF3ResourceSubscriptions
+import mcp_transport
+from mcp_transport import LIF3SessionLimits
 
-# Real data from Ethan Barnes
-DB_PATH = "/Users/ccladysmith/Desktop/dev/l1f3/data/lif3_financial.db"
+class LIF3FinancialServer(Server):
+    """Advertises list-changed notifications and resource subscriptions on every transport"""
+
+    def create_initialization_options(self, notification_options=None, experimental_capabilities=None):
+        return super().create_initialization_options(
+            notification_options or NotificationOptions(tools_changed=True, resources_changed=True),
+            experimental_capabilities
+        )
+
+    def get_capabilities(self, notification_options, experimental_capabilities):
+        capabilities = super().get_capabilities(notification_options, experimental_capabilities)
+        # The SDK always advertises subscribe=False; subscribe_resource below implements it
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True
+        return capabilities
+
+app = LIF3FinancialServer("lif3-financial-server")
+
+# Per-session request rate and concurrency caps, enabled when serving many sessions over HTTP
+SESSIONS = LIF3SessionLimits()
+
+# Real data from Ethan Barnes; LIF3_DB_PATH / DATABASE_PATH override the repo's data/ file
+DB_PATH = resolve_db_path()
+
+# Compact JSON (or orjson) for resource payloads; LIF3_SERIALIZER=json-pretty restores indented output
+SERIALIZER = get_serializer(text_only=True)
 
 # Ethan's Real Financial Data
 REAL_DATA = {
@@ -29,16 +78,7 @@ REAL_DATA = {
         "target_net_worth": 500000,
         "target_date": "2025-12-31",
         "monthly_income_min": 18000,
-        "monthly_income_max": 24000,
-        "monthly_expenses": {
-            "loan_payment": 1664,
-            "rent": 3000,
-            "wifi": 500,
-            "bash_clothing": 2929,
-            "iphone": 1200,
-            "claude_ai": 350,
-            "total": 9643
-        }
+        "monthly_income_max": 24000
     },
     "work": {
         "role": "IT Engineer",
@@ -54,7 +94,6 @@ REAL_DATA = {
         "target_mrr": 100000,
         "timeline": "2-3 years",
         "current_clients": 0,
-        "monthly_expenses": 350,  # Claude AI
         "tools": ["Claude CLI", "Cursor", "Gemini CLI"]
     },
     "brand_business": {
@@ -72,122 +111,148 @@ REAL_DATA = {
     ]
 }
 
-def init_database():
+# Insight rules are evaluated once per ledger change and served from cache in between
+INSIGHTS = insight_engine.LIF3InsightEngine(targets={
+    "net_worth": REAL_DATA["personal"]["target_net_worth"],
+    "net_worth_date": REAL_DATA["personal"]["target_date"],
+    "tech_mrr": REAL_DATA["tech_business"]["target_mrr"],
+    "brand_revenue": REAL_DATA["brand_business"]["target_revenue"],
+})
+
+# Budget (recurring commitments + discretionary spend), rebuilt from the stored recurring flags when the ledger changes
+BUDGETS = expense_analytics.LIF3BudgetCache()
+
+INSIGHT_HEADINGS = {
+    "personal": "📊 **PERSONAL FINANCE INSIGHTS**",
+    "work": "💼 **IT ENGINEERING CAREER INSIGHTS**",
+    "tech_business": "🚀 **43V3R TECHNOLOGY BUSINESS INSIGHTS**",
+    "brand_business": "👕 **43V3R BRAND INSIGHTS**",
+    "all": "🎯 **COMPLETE LIFE STRATEGY - ETHAN BARNES**",
+}
+
+SCHEMA_SQL = """
+    -- Personal Financial Accounts
+    CREATE TABLE IF NOT EXISTS accounts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        type TEXT NOT NULL, -- 'personal', 'work', 'tech_business', 'brand_business'
+        category TEXT NOT NULL, -- 'checking', 'savings', 'investment', 'debt'
+        balance REAL DEFAULT 0,
+        currency TEXT DEFAULT 'ZAR',
+        is_active BOOLEAN DEFAULT TRUE,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- All Transactions
+    CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account_id INTEGER,
+        amount REAL NOT NULL,
+        description TEXT,
+        category TEXT, -- 'income', 'expense', 'transfer', 'investment'
+        subcategory TEXT, -- 'rent', 'food', 'business_expense', etc.
+        life_category TEXT, -- 'personal', 'work', 'tech_business', 'brand_business'
+        date DATE DEFAULT CURRENT_DATE,
+        is_recurring BOOLEAN DEFAULT FALSE,
+        recurring_frequency TEXT,
+        notes TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (account_id) REFERENCES accounts (id)
+    );
+
+    -- Goals across all life areas
+    CREATE TABLE IF NOT EXISTS goals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        life_category TEXT NOT NULL,
+        target_amount REAL,
+        current_amount REAL DEFAULT 0,
+        target_date DATE,
+        status TEXT DEFAULT 'active',
+        priority TEXT DEFAULT 'medium',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Business Metrics for 43V3R Technology
+    CREATE TABLE IF NOT EXISTS tech_business_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        metric_name TEXT NOT NULL,
+        metric_value REAL,
+        metric_unit TEXT,
+        date DATE DEFAULT CURRENT_DATE,
+        notes TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Business Metrics for 43V3R Brand
+    CREATE TABLE IF NOT EXISTS brand_business_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        metric_name TEXT NOT NULL,
+        metric_value REAL,
+        metric_unit TEXT,
+        platform TEXT,
+        date DATE DEFAULT CURRENT_DATE,
+        notes TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Habits Tracking
+    CREATE TABLE IF NOT EXISTS habits (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        habit_name TEXT NOT NULL,
+        life_category TEXT,
+        target_frequency TEXT,
+        current_streak INTEGER DEFAULT 0,
+        longest_streak INTEGER DEFAULT 0,
+        last_completed_date DATE, -- start of the last completed streak period
+        is_active BOOLEAN DEFAULT TRUE,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Habit Entries
+    CREATE TABLE IF NOT EXISTS habit_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        habit_id INTEGER,
+        completed BOOLEAN DEFAULT FALSE,
+        date DATE DEFAULT CURRENT_DATE,
+        notes TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (habit_id) REFERENCES habits (id)
+    );
+"""
+
+# Accounts - Starting Fresh (All R0 except debt)
+BASE_ACCOUNTS = [
+    ('Liquid Cash', 'personal', 'checking', 0),
+    ('Emergency Fund', 'personal', 'savings', 0), 
+    ('Savings Account', 'personal', 'savings', 0),
+    ('Current Debt', 'personal', 'debt', -7000),
+    ('43V3R Tech Business', 'tech_business', 'checking', 0),
+    ('43V3R Brand Business', 'brand_business', 'checking', 0),
+    ('IT Engineering Income', 'work', 'income', 0)
+]
+
+def seed_accounts(conn: sqlite3.Connection):
+    """Create the base accounts the tools book against"""
+    conn.executemany("""
+        INSERT OR REPLACE INTO accounts (name, type, category, balance) 
+        VALUES (?, ?, ?, ?)
+    """, BASE_ACCOUNTS)
+
+def init_database(db_path: Optional[str] = None):
     """Initialize database with Ethan's real data"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(db_path or DB_PATH)
     
     # Create tables
-    conn.executescript("""
-        -- Personal Financial Accounts
-        CREATE TABLE IF NOT EXISTS accounts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            type TEXT NOT NULL, -- 'personal', 'work', 'tech_business', 'brand_business'
-            category TEXT NOT NULL, -- 'checking', 'savings', 'investment', 'debt'
-            balance REAL DEFAULT 0,
-            currency TEXT DEFAULT 'ZAR',
-            is_active BOOLEAN DEFAULT TRUE,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-
-        -- All Transactions
-        CREATE TABLE IF NOT EXISTS transactions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            account_id INTEGER,
-            amount REAL NOT NULL,
-            description TEXT,
-            category TEXT, -- 'income', 'expense', 'transfer', 'investment'
-            subcategory TEXT, -- 'rent', 'food', 'business_expense', etc.
-            life_category TEXT, -- 'personal', 'work', 'tech_business', 'brand_business'
-            date DATE DEFAULT CURRENT_DATE,
-            is_recurring BOOLEAN DEFAULT FALSE,
-            recurring_frequency TEXT,
-            notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (account_id) REFERENCES accounts (id)
-        );
-
-        -- Goals across all life areas
-        CREATE TABLE IF NOT EXISTS goals (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            description TEXT,
-            life_category TEXT NOT NULL,
-            target_amount REAL,
-            current_amount REAL DEFAULT 0,
-            target_date DATE,
-            status TEXT DEFAULT 'active',
-            priority TEXT DEFAULT 'medium',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-
-        -- Business Metrics for 43V3R Technology
-        CREATE TABLE IF NOT EXISTS tech_business_metrics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            metric_name TEXT NOT NULL,
-            metric_value REAL,
-            metric_unit TEXT,
-            date DATE DEFAULT CURRENT_DATE,
-            notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-
-        -- Business Metrics for 43V3R Brand
-        CREATE TABLE IF NOT EXISTS brand_business_metrics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            metric_name TEXT NOT NULL,
-            metric_value REAL,
-            metric_unit TEXT,
-            platform TEXT,
-            date DATE DEFAULT CURRENT_DATE,
-            notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-
-        -- Habits Tracking
-        CREATE TABLE IF NOT EXISTS habits (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            habit_name TEXT NOT NULL,
-            life_category TEXT,
-            target_frequency TEXT,
-            current_streak INTEGER DEFAULT 0,
-            longest_streak INTEGER DEFAULT 0,
-            is_active BOOLEAN DEFAULT TRUE,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-
-        -- Habit Entries
-        CREATE TABLE IF NOT EXISTS habit_entries (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            habit_id INTEGER,
-            completed BOOLEAN DEFAULT FALSE,
-            date DATE DEFAULT CURRENT_DATE,
-            notes TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (habit_id) REFERENCES habits (id)
-        );
-    """)
+    conn.executescript(SCHEMA_SQL)
     
     # Insert Ethan's real data (starting fresh)
     data = REAL_DATA
     
-    # Accounts - Starting Fresh (All R0 except debt)
-    accounts_data = [
-        ('Liquid Cash', 'personal', 'checking', 0),
-        ('Emergency Fund', 'personal', 'savings', 0), 
-        ('Savings Account', 'personal', 'savings', 0),
-        ('Current Debt', 'personal', 'debt', -7000),
-        ('43V3R Tech Business', 'tech_business', 'checking', 0),
-        ('43V3R Brand Business', 'brand_business', 'checking', 0),
-        ('IT Engineering Income', 'work', 'income', 0)
-    ]
-    
-    conn.executemany("""
-        INSERT OR REPLACE INTO accounts (name, type, category, balance) 
-        VALUES (?, ?, ?, ?)
-    """, accounts_data)
+    seed_accounts(conn)
     
     # Goals - Ethan's Real Goals
     goals_data = [
@@ -245,16 +310,92 @@ def init_database():
     
     conn.commit()
     conn.close()
-    print("✅ Database initialized with Ethan's real financial data")
+    # stdout carries the MCP stdio protocol
+    print("✅ Database initialized with Ethan's real financial data", file=sys.stderr)
 
-def get_db_connection():
-    """Get database connection"""
-    if not os.path.exists(DB_PATH):
-        init_database()
-    conn = sqlite3.connect(DB_PATH)
+# Stamped into PRAGMA user_version once ensure_schema has run, so later opens skip the DDL pass.
+# Bump whenever SCHEMA_SQL or an installed module's tables/triggers change (always > BASE_SCHEMA_VERSION).
+SCHEMA_VERSION = 7
+
+def upgrade_legacy_tables(conn):
+    """Add columns from SCHEMA_SQL that older database files are missing"""
+    reference = sqlite3.connect(":memory:")
+    reference.executescript(SCHEMA_SQL)
+    tables = [row[0] for row in reference.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    
+    for table in tables:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for _, column, col_type, _, default, _ in reference.execute(f"PRAGMA table_info({table})"):
+            if column in existing:
+                continue
+            # ALTER TABLE only accepts constant defaults
+            if default is not None and not default.upper().startswith("CURRENT_"):
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type} DEFAULT {default}")
+            else:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+    reference.close()
+
+def ensure_schema(conn):
+    """Bring the base tables, rollups and triggers up to date when user_version is behind"""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+    # WAL lets the dashboard change feed read while tools write
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA_SQL)
+    upgrade_legacy_tables(conn)
+    ledger_rollups.install(conn)
+    ledger_changes.install(conn)
+    ledger_events.install(conn)
+    habit_tracker.install(conn)
+    fx_rates.install(conn)
+    portfolio.install(conn)
+    ledger_search.install(conn)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+
+def open_connection(path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Open a database file, seeding the primary one and schema-checking every file once"""
+    if path == DB_PATH and not os.path.exists(path):
+        init_database(path)
+    conn = server_metrics.connect(path, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
+    ensure_schema(conn)
+    if conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0] == 0:
+        # New tenant files only get the schema; give them the accounts every tool expects
+        seed_accounts(conn)
+        conn.commit()
+    # transactions_all and friends span the per-year archive files
+    ledger_archive.attach_archive(conn, path)
+    NAMES.warm(conn)
     return conn
 
+# One cached connection per tenant database (the primary database is the default tenant)
+ROUTER = LIF3TenantRouter(open_connection, primary_path=lambda: DB_PATH)
+
+def get_db_connection(tenant: Optional[str] = None):
+    """Get database connection for a tenant (None → primary database)"""
+    return ROUTER.get(tenant)
+
+# Rollups, history and heatmaps read from a backup-API snapshot when LIF3_READ_REPLICA is memory or file
+REPLICAS = LIF3ReadReplicas(row_factory=sqlite3.Row)
+
+def get_read_connection(tenant: Optional[str] = None):
+    """Connection for long analytical reads: the tenant's snapshot replica when enabled, else the live database"""
+    conn = get_db_connection(tenant)
+    if not REPLICAS.enabled:
+        return conn
+    return REPLICAS.get(tenant_db_path(tenant, DB_PATH))
+
+def open_writer_connection(path: str) -> sqlite3.Connection:
+    # Used only on the write queue's thread, but that thread is replaced along with the queue
+    return open_connection(path, check_same_thread=False)
+
+# The writer applies and commits on a thread of its own, so it gets connections of its own too
+WRITER_ROUTER = LIF3TenantRouter(open_writer_connection, primary_path=lambda: DB_PATH)
+
+# Write tools are applied by one writer task and committed in groups (one commit per tenant every few ms)
+WRITES = LIF3WriteQueue(WRITER_ROUTER.get)
+
 @app.list_resources()
 async def list_resources() -> List[Resource]:
     """List available financial resources"""
@@ -292,97 +433,354 @@ async def list_resources() -> List[Resource]:
         Resource(
             uri="lif3://net-worth",
             name="Net Worth Calculation",
-            description="Real-time net worth calculation across all accounts",
+            description="Real-time net worth across all accounts, per currency and converted to ZAR",
+            mimeType="application/json"
+        ),
+        Resource(
+            uri="lif3://net-worth/history",
+            name="Net Worth History",
+            description="Daily net worth series (?start=YYYY-MM-DD&end=YYYY-MM-DD or ?days=N, default 90 days)",
+            mimeType="application/json"
+        ),
+        Resource(
+            uri="lif3://budget",
+            name="Computed Monthly Budget",
+            description="Recurring payments detected from transaction history plus discretionary spend",
+            mimeType="application/json"
+        ),
+        Resource(
+            uri="lif3://portfolio",
+            name="Portfolio Valuation",
+            description="Holdings marked to market in ZAR with allocation drift against the strategy targets",
             mimeType="application/json"
+        ),
+        Resource(
+            uri="lif3://rollups/transactions/monthly",
+            name="Monthly Cash Flow",
+            description="Pre-aggregated monthly income/expenses (filters: life_category, subcategory, account_id, start, end)",
+            mimeType="application/json"
+        ),
+        Resource(
+            uri="lif3://rollups/metrics/monthly",
+            name="Monthly Business Metrics",
+            description="Pre-aggregated 43V3R metrics per month, e.g. MRR over time (filters: business, metric_name, start, end)",
+            mimeType="application/json"
+        ),
+        Resource(
+            uri="lif3://habits/heatmap",
+            name="Habit Streak Heatmap",
+            description="Completed days and streaks per habit (filters: days, habit_id)",
+            mimeType="application/json"
+        ),
+        Resource(
+            uri="lif3://metrics",
+            name="Server Metrics",
+            description="Latency, response size and SQL statement histograms per tool, resource and statement",
+            mimeType="application/json"
+        ),
+        Resource(
+            uri="lif3://metrics/prometheus",
+            name="Server Metrics (Prometheus)",
+            description="Same metrics in Prometheus text exposition format",
+            mimeType="text/plain"
         )
     ]
 
+@app.list_resource_templates()
+async def list_resource_templates() -> List[ResourceTemplate]:
+    """List parameterised rollup series"""
+    return [
+        ResourceTemplate(
+            uriTemplate="lif3://rollups/transactions/{period}",
+            name="Cash Flow Series",
+            description="Daily, weekly or monthly transaction totals",
+            mimeType="application/json"
+        ),
+        ResourceTemplate(
+            uriTemplate="lif3://rollups/subcategories/{period}",
+            name="Spend by Subcategory",
+            description="Daily, weekly or monthly totals per life category and subcategory",
+            mimeType="application/json"
+        ),
+        ResourceTemplate(
+            uriTemplate="lif3://rollups/metrics/{period}",
+            name="Business Metric Series",
+            description="Daily, weekly or monthly 43V3R Tech/Brand metric totals",
+            mimeType="application/json"
+        )
+    ]
+
+def split_resource_uri(uri) -> tuple:
+    """Split 'lif3://path?key=value' into the bare URI and its query parameters"""
+    parts = urlsplit(str(uri))
+    return f"{parts.scheme}://{parts.netloc}{parts.path}", dict(parse_qsl(parts.query))
+
+def read_rollup_resource(conn, uri: str, params: Dict[str, str]) -> str:
+    """Serve a pre-aggregated series straight from the rollup tables"""
+    _, series, period = uri[len("lif3://"):].split("/", 2)
+    
+    if series == "transactions":
+        account_id = params.get("account_id")
+        rows = ledger_rollups.get_transaction_series(
+            conn, period,
+            account_id=int(account_id) if account_id else None,
+            life_category=params.get("life_category"),
+            subcategory=params.get("subcategory"),
+            start=params.get("start"),
+            end=params.get("end")
+        )
+    elif series == "subcategories":
+        rows = ledger_rollups.get_subcategory_breakdown(conn, period, start=params.get("start"), end=params.get("end"))
+    elif series == "metrics":
+        rows = ledger_rollups.get_metric_series(
+            conn, period,
+            business=params.get("business"),
+            metric_name=params.get("metric_name"),
+            start=params.get("start"),
+            end=params.get("end")
+        )
+    else:
+        raise ValueError(f"Unknown rollup series: {series}")
+    
+    return SERIALIZER.dumps({"series": series, "period": period, "filters": params, "points": rows})
+
+def history_range(params: Dict[str, Any]) -> tuple:
+    """(start, end) ISO dates from start/end/days arguments, defaulting to the last 90 days"""
+    try:
+        end = date.fromisoformat(params.get("end") or date.today().isoformat())
+        start = date.fromisoformat(params["start"]) if params.get("start") else None
+    except ValueError:
+        raise ValueError(f"start and end must be YYYY-MM-DD dates (got start={params.get('start')!r}, end={params.get('end')!r})")
+    days = int(params["days"]) if params.get("days") not in (None, "") else 90
+    if start is None:
+        if days < 1:
+            raise ValueError(f"days must be at least 1 (got {days})")
+        start = end - timedelta(days=days - 1)
+    if start > end:
+        raise ValueError(f"start ({start}) is after end ({end})")
+    return start.isoformat(), end.isoformat()
+
+def format_account_balance(name: str, balance: float, currency: Optional[str], rates: Dict[str, float]) -> str:
+    """Breakdown line: ZAR balances as-is, foreign ones with their ZAR equivalent"""
+    currency = (currency or fx_rates.BASE_CURRENCY).upper()
+    if currency == fx_rates.BASE_CURRENCY:
+        return f"  {name}: R{balance:,.2f}"
+    zar = fx_rates.convert(balance, currency, rates)
+    converted = f"R{zar:,.2f}" if zar is not None else "no FX rate"
+    return f"  {name}: {currency} {balance:,.2f} ({converted})"
+
+def build_dashboard(conn, recent_limit: int = 10) -> Dict[str, Any]:
+    """Complete dashboard for all 4 life categories"""
+    budget = BUDGETS.get(conn)
+    dashboard = {
+        "personal": {
+            "net_worth": fx_rates.net_worth_by_currency(conn, account_type="personal")["net_worth_zar"],
+            "target_net_worth": 500000,
+            "target_date": "2025-12-31",
+            "monthly_income": "R18,000 - R24,000",
+            "monthly_expenses": budget["monthly_expenses"],
+            "debt": 7000,
+            "accounts": fetch_dicts(conn, "SELECT * FROM accounts WHERE type = 'personal'"),
+            "goals": fetch_dicts(conn, "SELECT * FROM goals WHERE life_category = 'personal'")
+        },
+        "work": {
+            "role": "IT Engineer",
+            "education": "Computer Engineering Diploma",
+            "linkedin": "https://www.linkedin.com/in/ethan-barnes17/",
+            "salary_range": "R18,000 - R24,000",
+            "goals": fetch_dicts(conn, "SELECT * FROM goals WHERE life_category = 'work'")
+        },
+        "tech_business": {
+            "name": "43V3R Technology",
+            "services": ["AI", "Web3", "Blockchain", "Quantum Computing"],
+            "current_mrr": 0,
+            "target_mrr": 100000,
+            "current_clients": 0,
+            "monthly_expenses": expense_analytics.business_tool_costs(budget),
+            "tools": ["Claude CLI", "Cursor", "Gemini CLI"],
+            "goals": fetch_dicts(conn, "SELECT * FROM goals WHERE life_category = 'tech_business'"),
+            "metrics": fetch_dicts(conn, "SELECT * FROM tech_business_metrics ORDER BY date DESC LIMIT 10")
+        },
+        "brand_business": {
+            "name": "43V3R Brand",
+            "focus": ["Futuristic Dystopian Clothing", "Smart LED Fabrics", "Content Creation", "Music"],
+            "current_revenue": 0,
+            "status": "Development Phase",
+            "goals": fetch_dicts(conn, "SELECT * FROM goals WHERE life_category = 'brand_business'"),
+            "metrics": fetch_dicts(conn, "SELECT * FROM brand_business_metrics ORDER BY date DESC LIMIT 10")
+        },
+        "habits": fetch_dicts(conn, "SELECT * FROM habits WHERE is_active = 1"),
+        "recent_transactions": fetch_dicts(conn, "SELECT t.*, a.name as account_name FROM transactions t LEFT JOIN accounts a ON t.account_id = a.id ORDER BY t.date DESC LIMIT ?", (recent_limit,)),
+        "generated_at": datetime.now().isoformat()
+    }
+    return dashboard
+
 @app.read_resource()
+@SESSIONS.guard(app)
+@instrument("resource")
 async def read_resource(uri: str) -> str:
     """Read financial resource data"""
-    with get_db_connection() as conn:
-        if uri == "lif3://dashboard":
-            # Complete dashboard for all 4 life categories
-            dashboard = {
-                "personal": {
-                    "net_worth": conn.execute("SELECT SUM(balance) FROM accounts WHERE type = 'personal'").fetchone()[0] or 0,
-                    "target_net_worth": 500000,
-                    "target_date": "2025-12-31",
-                    "monthly_income": "R18,000 - R24,000",
-                    "monthly_expenses": 9643,
-                    "debt": 7000,
-                    "accounts": [dict(row) for row in conn.execute("SELECT * FROM accounts WHERE type = 'personal'").fetchall()],
-                    "goals": [dict(row) for row in conn.execute("SELECT * FROM goals WHERE life_category = 'personal'").fetchall()]
-                },
-                "work": {
-                    "role": "IT Engineer",
-                    "education": "Computer Engineering Diploma",
-                    "linkedin": "https://www.linkedin.com/in/ethan-barnes17/",
-                    "salary_range": "R18,000 - R24,000",
-                    "goals": [dict(row) for row in conn.execute("SELECT * FROM goals WHERE life_category = 'work'").fetchall()]
-                },
-                "tech_business": {
-                    "name": "43V3R Technology",
-                    "services": ["AI", "Web3", "Blockchain", "Quantum Computing"],
-                    "current_mrr": 0,
-                    "target_mrr": 100000,
-                    "current_clients": 0,
-                    "monthly_expenses": 350,
-                    "tools": ["Claude CLI", "Cursor", "Gemini CLI"],
-                    "goals": [dict(row) for row in conn.execute("SELECT * FROM goals WHERE life_category = 'tech_business'").fetchall()],
-                    "metrics": [dict(row) for row in conn.execute("SELECT * FROM tech_business_metrics ORDER BY date DESC LIMIT 10").fetchall()]
-                },
-                "brand_business": {
-                    "name": "43V3R Brand",
-                    "focus": ["Futuristic Dystopian Clothing", "Smart LED Fabrics", "Content Creation", "Music"],
-                    "current_revenue": 0,
-                    "status": "Development Phase",
-                    "goals": [dict(row) for row in conn.execute("SELECT * FROM goals WHERE life_category = 'brand_business'").fetchall()],
-                    "metrics": [dict(row) for row in conn.execute("SELECT * FROM brand_business_metrics ORDER BY date DESC LIMIT 10").fetchall()]
-                },
-                "habits": [dict(row) for row in conn.execute("SELECT * FROM habits WHERE is_active = 1").fetchall()],
-                "recent_transactions": [dict(row) for row in conn.execute("SELECT t.*, a.name as account_name FROM transactions t LEFT JOIN accounts a ON t.account_id = a.id ORDER BY t.date DESC LIMIT 10").fetchall()],
-                "generated_at": datetime.now().isoformat()
-            }
-            return json.dumps(dashboard, indent=2, default=str)
+    uri, params = split_resource_uri(uri)
+    tenant = params.pop("tenant", None)
+    
+    # Metrics are served from memory and never open the database
+    if uri == "lif3://metrics":
+        return SERIALIZER.dumps({**server_metrics.REGISTRY.snapshot(), "tenants": ROUTER.stats(), "writer_connections": WRITER_ROUTER.stats(), "writes": WRITES.stats(), "replicas": REPLICAS.stats(), "subscriptions": SUBSCRIPTIONS.stats(), "sessions": SESSIONS.stats()})
+    elif uri == "lif3://metrics/prometheus":
+        return server_metrics.REGISTRY.render_prometheus()
+    
+    # Long scans over history are served from the snapshot replica when one is enabled
+    if uri.startswith("lif3://rollups/") or uri in ("lif3://habits/heatmap", "lif3://net-worth/history"):
+        conn = get_read_connection(tenant)
+        if uri.startswith("lif3://rollups/"):
+            return read_rollup_resource(conn, uri, params)
+        
+        elif uri == "lif3://habits/heatmap":
+            habit_id = params.get("habit_id")
+            heatmap = habit_tracker.get_heatmap(
+                conn,
+                days=int(params.get("days", 365)),
+                habit_id=int(habit_id) if habit_id else None
+            )
+            return SERIALIZER.dumps(heatmap)
+        
+        else:
+            start, end = history_range(params)
+            return SERIALIZER.dumps({
+                "start": start,
+                "end": end,
+                "points": ledger_events.net_worth_history(conn, start, end)
+            })
+    
+    with get_db_connection(tenant) as conn:
+        if uri == "lif3://net-worth":
+            return SERIALIZER.dumps(fx_rates.net_worth_by_currency(conn, params.get("as_of")))
+        
+        elif uri == "lif3://budget":
+            return SERIALIZER.dumps(BUDGETS.get(conn))
+        
+        elif uri == "lif3://portfolio":
+            return SERIALIZER.dumps(portfolio.valuation(conn))
+        
+        elif uri == "lif3://dashboard":
+            return SERIALIZER.dumps(build_dashboard(conn))
         
         elif uri == "lif3://personal":
-            personal_data = conn.execute("SELECT SUM(balance) FROM accounts WHERE type = 'personal'").fetchone()[0] or 0
+            # Converted to ZAR like calculate_net_worth and lif3://net-worth
+            personal_data = fx_rates.net_worth_by_currency(conn, account_type="personal")["net_worth_zar"]
             goal_progress = (personal_data / 500000) * 100
             days_remaining = (datetime(2025, 12, 31) - datetime.now()).days
             
-            return json.dumps({
+            return SERIALIZER.dumps({
                 "current_net_worth": personal_data,
                 "target_net_worth": 500000,
                 "goal_progress": goal_progress,
                 "days_remaining": days_remaining,
                 "monthly_income_min": 18000,
                 "monthly_income_max": 24000,
-                "monthly_expenses": 9643,
+                "monthly_expenses": BUDGETS.get(conn)["monthly_expenses"],
                 "debt": 7000,
-                "accounts": [dict(row) for row in conn.execute("SELECT * FROM accounts WHERE type = 'personal'").fetchall()],
-                "goals": [dict(row) for row in conn.execute("SELECT * FROM goals WHERE life_category = 'personal'").fetchall()]
-            }, indent=2, default=str)
+                "accounts": fetch_dicts(conn, "SELECT * FROM accounts WHERE type = 'personal'"),
+                "goals": fetch_dicts(conn, "SELECT * FROM goals WHERE life_category = 'personal'")
+            })
         
         elif uri == "lif3://tech-business":
-            return json.dumps({
+            return SERIALIZER.dumps({
                 "business_name": "43V3R Technology",
                 "services": ["AI", "Web3", "Blockchain", "Quantum Computing", "Enterprise AI Solutions"],
                 "current_mrr": 0,
                 "target_mrr": 100000,
                 "timeline": "2-3 years to R100K MRR",
                 "current_clients": 0,
-                "monthly_expenses": 350,
+                "monthly_expenses": expense_analytics.business_tool_costs(BUDGETS.get(conn)),
                 "tools": ["Claude CLI", "Cursor", "Gemini CLI"],
                 "strategy": "Start with AI consulting R2K-R10K/project",
-                "goals": [dict(row) for row in conn.execute("SELECT * FROM goals WHERE life_category = 'tech_business'").fetchall()],
-                "metrics": [dict(row) for row in conn.execute("SELECT * FROM tech_business_metrics ORDER BY date DESC").fetchall()]
-            }, indent=2, default=str)
+                "goals": fetch_dicts(conn, "SELECT * FROM goals WHERE life_category = 'tech_business'"),
+                "metrics": fetch_dicts(conn, "SELECT * FROM tech_business_metrics ORDER BY date DESC")
+            })
+
+def database_version(tenant: Optional[str] = None) -> tuple:
+    """Moves when another connection commits (data_version) or this one writes (total_changes)"""
+    conn = get_db_connection(tenant)
+    return conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes
+
+async def catch_up_replica(tenant: Optional[str] = None):
+    """Replica-backed resources must render the write that triggered a change check, not a lagging snapshot"""
+    if REPLICAS.enabled:
+        await REPLICAS.catch_up(tenant_db_path(tenant, DB_PATH))
+
+# Change checks render through the unwrapped handler so they stay out of the resource metrics and session limits
+SUBSCRIPTIONS = LIF3ResourceSubscriptions(inspect.unwrap(read_resource), database_version, prepare=catch_up_replica)
+
+# Recurring-payment flags are refreshed by a queued write once tool calls settle, never while rendering a read
+RECURRING_DETECT_DELAY_MS = float(os.environ.get("LIF3_RECURRING_DETECT_MS", 1000))
+RECURRING_DETECTIONS: Dict[Optional[str], asyncio.Task] = {}
+
+def schedule_recurring_detection(tenant: Optional[str] = None):
+    """Queue BUDGETS.detect for a tenant; tool calls within the delay share one run"""
+    tenant = None if tenant in ("", "default") else tenant
+    task = RECURRING_DETECTIONS.get(tenant)
+    if task is None or task.done():
+        # A fresh context, so the detection's SQL is not counted against the tool call that scheduled it
+        RECURRING_DETECTIONS[tenant] = contextvars.Context().run(
+            asyncio.get_running_loop().create_task, detect_recurring_later(tenant)
+        )
+
+async def detect_recurring_later(tenant: Optional[str]):
+    await asyncio.sleep(RECURRING_DETECT_DELAY_MS / 1000)
+    # Calls from here on schedule another run, so a write landing mid-detection is not missed
+    RECURRING_DETECTIONS.pop(tenant, None)
+    try:
+        detected = await WRITES.submit_exclusive(tenant, BUDGETS.detect)
+    except Exception:
+        server_metrics.REGISTRY.increment("lif3_recurring_detections_total", status="error")
+        return
+    server_metrics.REGISTRY.increment("lif3_recurring_detections_total", status="ran" if detected else "unchanged")
+    if detected:
+        SUBSCRIPTIONS.touch(tenant)
+
+@app.subscribe_resource()
+async def subscribe_resource(uri) -> None:
+    """Send this session resources/updated whenever the resource's content changes"""
+    await SUBSCRIPTIONS.subscribe(app.request_context.session, str(uri))
+
+@app.unsubscribe_resource()
+async def unsubscribe_resource(uri) -> None:
+    SUBSCRIPTIONS.unsubscribe(app.request_context.session, str(uri))
+
+TENANT_PROPERTY = {"type": "string", "description": "Tenant id (separate database under LIF3_TENANT_DIR); omit for the primary database"}
+
+RESPONSE_FORMATS = ("both", "text", "json")
+RESPONSE_FORMAT_PROPERTY = {
+    "type": "string", "enum": list(RESPONSE_FORMATS), "default": "both",
+    "description": "'text' for the readable report, 'json' for the structured payload only, 'both' for both"
+}
+
+def check_response_format(arguments: Dict[str, Any]) -> str:
+    """The requested response_format; run_tool checks it before dispatch, so a bad value never follows a committed write"""
+    response_format = arguments.get("response_format", "both")
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"response_format must be one of {', '.join(RESPONSE_FORMATS)} (got {response_format!r})")
+    return response_format
+
+def tool_response(name: str, arguments: Dict[str, Any], text: str, data: Any) -> List[Union[TextContent, EmbeddedResource]]:
+    """Readable text and/or a compact JSON payload (as an embedded resource), per the response_format argument"""
+    response_format = arguments.get("response_format", "both")
+    
+    content = []
+    if response_format != "json":
+        content.append(TextContent(type="text", text=text))
+    if response_format != "text":
+        content.append(EmbeddedResource(
+            type="resource",
+            resource=TextResourceContents(uri=f"lif3://tool-result/{name}", mimeType="application/json", text=SERIALIZER.dumps(data))
+        ))
+    return content
 
 @app.list_tools()
 async def list_tools() -> List[Tool]:
     """List available financial tools"""
-    return [
+    tools = [
         Tool(
             name="update_balance",
             description="Update account balance for any life category",
@@ -416,6 +814,76 @@ async def list_tools() -> List[Tool]:
             description="Calculate current net worth and progress toward R500K goal",
             inputSchema={"type": "object", "properties": {}, "required": []}
         ),
+        Tool(
+            name="get_net_worth_history",
+            description="Net worth over time from the daily series, or on a single past date",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "start": {"type": "string", "description": "First day (YYYY-MM-DD)"},
+                    "end": {"type": "string", "description": "Last day (YYYY-MM-DD), default today"},
+                    "days": {"type": "integer", "description": "Days back from end when start is omitted", "default": 90},
+                    "as_of": {"type": "string", "description": "Single date for a point-in-time balance breakdown"}
+                },
+                "required": []
+            }
+        ),
+        Tool(
+            name="search_transactions",
+            description="Full-text search over transaction descriptions and notes (ranked, paginated), optionally also goals",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Words to find; the last word matches as a prefix. Omit to list by date"},
+                    "start": {"type": "string", "description": "First date (YYYY-MM-DD)"},
+                    "end": {"type": "string", "description": "Last date (YYYY-MM-DD)"},
+                    "life_category": {"type": "string", "enum": ["personal", "work", "tech_business", "brand_business"]},
+                    "min_amount": {"type": "number", "description": "Lowest amount in ZAR (expenses are negative)"},
+                    "max_amount": {"type": "number", "description": "Highest amount in ZAR"},
+                    "page": {"type": "integer", "description": "Result page, starting at 1", "default": 1},
+                    "page_size": {"type": "integer", "description": f"Results per page (max {ledger_search.MAX_PAGE_SIZE})", "default": ledger_search.DEFAULT_PAGE_SIZE},
+                    "include_goals": {"type": "boolean", "description": "Also search goal titles and descriptions", "default": False}
+                },
+                "required": []
+            }
+        ),
+        Tool(
+            name="get_portfolio",
+            description="Mark holdings to market and compare allocation with the investment strategy targets",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "mark_to_market": {"type": "boolean", "description": "Also write market values into the holding accounts' balances", "default": False}
+                },
+                "required": []
+            }
+        ),
+        Tool(
+            name="export_ledger",
+            description="Export new transactions, goals, habit entries and business metrics to columnar files (Parquet, NumPy .npz or CSV) for offline analysis",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "tables": {"type": "array", "items": {"type": "string", "enum": list(ledger_export.EXPORT_TABLES)}, "description": "Tables to export (default: all)"},
+                    "format": {"type": "string", "enum": list(ledger_export.FORMATS), "description": "Defaults to the best installed format"},
+                    "full": {"type": "boolean", "description": "Discard earlier parts and export every row again", "default": False}
+                },
+                "required": []
+            }
+        ),
+        Tool(
+            name="archive_ledger",
+            description="Move transactions and business metrics older than the horizon into per-year archive files (rollups stay; *_all views span both)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "horizon_days": {"type": "integer", "description": f"Archive rows older than this many days (default {ledger_archive.DEFAULT_ARCHIVE_HORIZON_DAYS})"},
+                    "before": {"type": "string", "description": "Archive rows dated before this day instead (YYYY-MM-DD)"},
+                    "dry_run": {"type": "boolean", "description": "Only count what would move", "default": False}
+                },
+                "required": []
+            }
+        ),
         Tool(
             name="add_business_revenue",
             description="Add revenue for 43V3R Technology or 43V3R Brand",
@@ -451,11 +919,36 @@ async def list_tools() -> List[Tool]:
                 "properties": {
                     "habit_name": {"type": "string", "description": "Habit name"},
                     "completed": {"type": "boolean", "description": "Whether completed today"},
+                    "date": {"type": "string", "description": "Entry date YYYY-MM-DD (defaults to today)"},
                     "notes": {"type": "string", "description": "Optional notes"}
                 },
                 "required": ["habit_name", "completed"]
             }
         ),
+        Tool(
+            name="batch",
+            description="Apply several writes in order as one all-or-nothing transaction (one commit for the whole burst)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "operations": {
+                        "type": "array",
+                        "minItems": 1,
+                        "maxItems": MAX_BATCH_OPERATIONS,
+                        "description": "Ordered operations; arguments are the same as the tool of that name",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "op": {"type": "string", "enum": list(WRITE_OPERATIONS)},
+                                "arguments": {"type": "object"}
+                            },
+                            "required": ["op", "arguments"]
+                        }
+                    }
+                },
+                "required": ["operations"]
+            }
+        ),
         Tool(
             name="get_financial_insights",
             description="Get AI insights and recommendations",
@@ -469,51 +962,220 @@ async def list_tools() -> List[Tool]:
             }
         )
     ]
+    
+    # Every tool can target a tenant database instead of the primary one and choose its result format
+    for tool in tools:
+        tool.inputSchema["properties"]["tenant"] = TENANT_PROPERTY
+        tool.inputSchema["properties"]["response_format"] = RESPONSE_FORMAT_PROPERTY
+    return tools
 
-@app.call_tool()
-async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+def _apply_update_balance(conn, arguments: Dict[str, Any]) -> tuple:
+    new_balance = arguments["new_balance"]
+    notes = arguments.get("notes", "")
+    account = NAMES.resolve(conn, "account", arguments["account_name"])
+    conn.execute("""
+        UPDATE accounts 
+        SET balance = ?, updated_at = CURRENT_TIMESTAMP 
+        WHERE id = ?
+    """, (new_balance, account.id))
+    
+    # Add transaction record
+    conn.execute("""
+        INSERT INTO transactions (account_id, amount, description, category, notes)
+        VALUES (?, ?, ?, 'adjustment', ?)
+    """, (account.id, new_balance, f"Balance update: {account.name}", notes))
+    
+    text = f"✅ Updated {account.name} to R{new_balance:,.2f}{matched_note(account, arguments['account_name'])}. {notes}"
+    return text, {"account_id": account.id, "account": account.name, "match_score": account.score,
+                  "balance": new_balance, "notes": notes}
+
+def _apply_add_transaction(conn, arguments: Dict[str, Any]) -> tuple:
+    amount = arguments["amount"]
+    description = arguments["description"]
+    category = arguments["category"]
+    life_category = arguments["life_category"]
+    account_name = arguments.get("account_name", "Liquid Cash")
+    account = NAMES.resolve(conn, "account", account_name)
+    transaction_id = conn.execute("""
+        INSERT INTO transactions (account_id, amount, description, category, life_category)
+        VALUES (?, ?, ?, ?, ?)
+    """, (account.id, amount, description, category, life_category)).lastrowid
+    conn.execute("""
+        UPDATE accounts 
+        SET balance = balance + ?, updated_at = CURRENT_TIMESTAMP 
+        WHERE id = ?
+    """, (amount, account.id))
+    balance = conn.execute("SELECT balance FROM accounts WHERE id = ?", (account.id,)).fetchone()[0]
+    
+    text = f"✅ Added R{amount:,.2f} ({category}, {life_category}): {description}\n{account.name} balance: R{balance:,.2f}{matched_note(account, account_name)}"
+    return text, {"transaction_id": transaction_id, "account_id": account.id, "account": account.name,
+                  "match_score": account.score, "amount": amount, "description": description,
+                  "category": category, "life_category": life_category, "balance": balance}
+
+def _apply_update_goal_progress(conn, arguments: Dict[str, Any]) -> tuple:
+    progress_amount = arguments["progress_amount"]
+    notes = arguments.get("notes", "")
+    goal = NAMES.resolve(conn, "goal", arguments["goal_title"])
+    conn.execute("""
+        UPDATE goals 
+        SET current_amount = ?, updated_at = CURRENT_TIMESTAMP 
+        WHERE id = ?
+    """, (progress_amount, goal.id))
+    target = conn.execute("SELECT target_amount FROM goals WHERE id = ?", (goal.id,)).fetchone()[0]
+    
+    progress = f" ({progress_amount / target:.1%} of R{target:,.2f})" if target else ""
+    text = f"🎯 {goal.name}: R{progress_amount:,.2f}{progress}{matched_note(goal, arguments['goal_title'])}. {notes}"
+    return text, {"goal_id": goal.id, "goal": goal.name, "match_score": goal.score, "current_amount": progress_amount,
+                  "target_amount": target, "progress_pct": round(progress_amount / target * 100, 1) if target else None,
+                  "notes": notes}
+
+def _apply_track_habit(conn, arguments: Dict[str, Any]) -> tuple:
+    habit_name = arguments["habit_name"]
+    completed = arguments["completed"]
+    habit = NAMES.resolve(conn, "habit", habit_name)
+    streak = habit_tracker.record_entry(conn, habit.id, completed, arguments.get("date"), arguments.get("notes"))
+    
+    status = "✅ Completed" if completed else "⏸️ Missed"
+    text = f"{status}: {streak['habit_name']}{matched_note(habit, habit_name)}\n\n🔥 Current streak: {streak['current_streak']}\n🏆 Longest streak: {streak['longest_streak']}"
+    return text, {"completed": completed, "match_score": habit.score, **streak}
+
+def _apply_add_business_revenue(conn, arguments: Dict[str, Any]) -> tuple:
+    business = arguments["business"]
+    amount = arguments["amount"]
+    description = arguments["description"]
+    client_name = arguments.get("client_name", "")
+    
+    business_name = "43V3R Technology" if business == "tech" else "43V3R Brand"
+    account_type = "tech_business" if business == "tech" else "brand_business"
+    
+    # Add to business account
+    account = conn.execute("SELECT id FROM accounts WHERE type = ? ORDER BY id LIMIT 1", (account_type,)).fetchone()
+    if account is None:
+        raise ValueError(f"No {account_type} account in this database to record {business_name} revenue against")
+    account_id = account[0]
+    
+    transaction_id = conn.execute("""
+        INSERT INTO transactions (account_id, amount, description, category, life_category, notes)
+        VALUES (?, ?, ?, 'income', ?, ?)
+    """, (account_id, amount, description, account_type, f"Client: {client_name}")).lastrowid
+    
+    # Update account balance
+    conn.execute("""
+        UPDATE accounts 
+        SET balance = balance + ?, updated_at = CURRENT_TIMESTAMP 
+        WHERE id = ?
+    """, (amount, account_id))
+    
+    # Add business metric
+    table_name = "tech_business_metrics" if business == "tech" else "brand_business_metrics"
+    conn.execute(f"""
+        INSERT INTO {table_name} (metric_name, metric_value, metric_unit, notes)
+        VALUES ('monthly_revenue', ?, 'ZAR', ?)
+    """, (amount, f"{description} - {client_name}"))
+    
+    text = f"🚀 **{business_name} Revenue Added!**\n\nAmount: R{amount:,.2f}\nDescription: {description}\nClient: {client_name}\n\n🎯 Great progress toward R100K MRR goal!"
+    return text, {"business": business, "transaction_id": transaction_id, "account_id": account_id, "amount": amount,
+                  "description": description, "client_name": client_name}
+
+# Write tools: each applies its change on the writer's connection, leaves the commit to WRITES
+# and returns (text, structured payload)
+WRITE_OPERATIONS = {
+    "update_balance": _apply_update_balance,
+    "add_transaction": _apply_add_transaction,
+    "update_goal_progress": _apply_update_goal_progress,
+    "track_habit": _apply_track_habit,
+    "add_business_revenue": _apply_add_business_revenue,
+}
+
+MAX_BATCH_OPERATIONS = 200
+
+def archive_ledger(conn, path: str, before: Optional[str], dry_run: bool) -> tuple:
+    """Move old rows into the per-year archive files, then trim the change log; runs via WRITES.submit_exclusive"""
+    result = ledger_archive.archive(conn, path, before, dry_run)
+    text = ledger_archive.render_archive(result)
+    if not dry_run:
+        # The change log is the other table that only grows; trim it in the same maintenance pass
+        result["changes_pruned"] = ledger_changes.prune(conn)
+        conn.commit()
+        text += f"\n🗜️ Pruned {result['changes_pruned']:,} old change feed row(s)"
+    return text, result
+
+def apply_batch(conn, operations: List[Dict[str, Any]]) -> List[tuple]:
+    """Apply write operations in order; raises on the first failure so the caller's savepoint undoes all of them"""
+    if not operations:
+        raise ValueError("batch needs at least one operation")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise ValueError(f"batch is limited to {MAX_BATCH_OPERATIONS} operations (got {len(operations)})")
+    
+    results = []
+    for index, operation in enumerate(operations, 1):
+        op = operation.get("op")
+        try:
+            if op not in WRITE_OPERATIONS:
+                raise ValueError(f"unknown operation '{op}' (expected one of: {', '.join(WRITE_OPERATIONS)})")
+            results.append((op, *WRITE_OPERATIONS[op](conn, operation.get("arguments") or {})))
+        except Exception as error:
+            reason = f"missing argument {error}" if isinstance(error, KeyError) else str(error)
+            lines = [f"❌ Batch rolled back: operation {index} [{op}] failed: {reason}"]
+            lines += [f"{done}. [{done_op}] rolled back" for done, (done_op, _, _) in enumerate(results, 1)]
+            if index < len(operations):
+                lines.append(f"Operations {index + 1}-{len(operations)} were not run")
+            raise ValueError("\n".join(lines)) from error
+    return results
+
+async def run_tool(name: str, arguments: Dict[str, Any]) -> List[Union[TextContent, EmbeddedResource]]:
     """Execute financial tools"""
+    check_response_format(arguments)
+    tenant = arguments.get("tenant")
     
-    if name == "update_balance":
-        account_name = arguments["account_name"]
-        new_balance = arguments["new_balance"]
-        notes = arguments.get("notes", "")
-        
-        with get_db_connection() as conn:
-            conn.execute("""
-                UPDATE accounts 
-                SET balance = ?, updated_at = CURRENT_TIMESTAMP 
-                WHERE name = ?
-            """, (new_balance, account_name))
-            
-            # Add transaction record
-            account_id = conn.execute("SELECT id FROM accounts WHERE name = ?", (account_name,)).fetchone()
-            if account_id:
-                conn.execute("""
-                    INSERT INTO transactions (account_id, amount, description, category, notes)
-                    VALUES (?, ?, ?, 'adjustment', ?)
-                """, (account_id[0], new_balance, f"Balance update: {account_name}", notes))
-            
-            conn.commit()
-        
-        return [TextContent(
-            type="text",
-            text=f"✅ Updated {account_name} to R{new_balance:,.2f}. {notes}"
-        )]
+    if name in WRITE_OPERATIONS:
+        text, data = await WRITES.submit(tenant, WRITE_OPERATIONS[name], arguments)
+        return tool_response(name, arguments, text, data)
+    
+    elif name == "batch":
+        results = await WRITES.submit(tenant, apply_batch, arguments["operations"])
+        return tool_response(
+            name, arguments,
+            f"📦 **Batch committed: {len(results)} operation(s)**\n\n" + "\n".join(
+                f"{index}. [{op}] {text}" for index, (op, text, _) in enumerate(results, 1)
+            ),
+            {"committed": len(results), "operations": [{"op": op, **data} for op, _, data in results]}
+        )
     
     elif name == "calculate_net_worth":
-        with get_db_connection() as conn:
-            accounts = conn.execute("SELECT name, balance FROM accounts WHERE is_active = 1").fetchall()
-            net_worth = sum(account[1] for account in accounts)
+        with get_db_connection(tenant) as conn:
+            accounts = conn.execute("SELECT name, balance, currency FROM accounts WHERE is_active = 1").fetchall()
+            totals = fx_rates.net_worth_by_currency(conn)
+            rates = fx_rates.RATES.get(conn)
+            net_worth = totals["net_worth_zar"]
             progress = (net_worth / 500000) * 100
             days_remaining = (datetime(2025, 12, 31) - datetime.now()).days
             daily_target = (500000 - net_worth) / max(days_remaining, 1)
             
-            breakdown = "\n".join([f"  {account[0]}: R{account[1]:,.2f}" for account in accounts])
+            breakdown = "\n".join([format_account_balance(name, balance, currency, rates) for name, balance, currency in accounts])
+            if len(totals["by_currency"]) > 1:
+                breakdown += "\n\n**By Currency:**\n" + "\n".join(
+                    f"  {group['currency']}: {group['balance']:,.2f}"
+                    + (f" → R{group['balance_zar']:,.2f}" if group["balance_zar"] is not None else " (no FX rate, excluded)")
+                    for group in totals["by_currency"]
+                )
             
-            return [TextContent(
-                type="text",
-                text=f"""💰 **ETHAN'S NET WORTH CALCULATION**
+            data = {
+                "net_worth_zar": net_worth,
+                "target_zar": 500000,
+                "progress_pct": round(progress, 2),
+                "remaining_zar": round(500000 - net_worth, 2),
+                "days_remaining": days_remaining,
+                "daily_target_zar": round(daily_target, 2),
+                "accounts": [
+                    {"name": name, "balance": balance, "currency": currency,
+                     "balance_zar": fx_rates.convert(balance, currency, rates)}
+                    for name, balance, currency in accounts
+                ],
+                "by_currency": totals["by_currency"],
+                "missing_rates": totals["missing_rates"]
+            }
+            return tool_response(name, arguments, f"""💰 **ETHAN'S NET WORTH CALCULATION**
 
 {breakdown}
 
@@ -531,188 +1193,146 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
 1. Launch 43V3R Tech AI consulting (R2K-R10K/project)
 2. Eliminate R7,000 debt (R1,664/month payment)
 3. Build emergency fund (R28,929 = 3 months expenses)
-4. Scale business revenue to accelerate growth"""
-            )]
-    
-    elif name == "add_business_revenue":
-        business = arguments["business"]
-        amount = arguments["amount"]
-        description = arguments["description"]
-        client_name = arguments.get("client_name", "")
-        
-        business_name = "43V3R Technology" if business == "tech" else "43V3R Brand"
-        account_type = "tech_business" if business == "tech" else "brand_business"
-        
-        with get_db_connection() as conn:
-            # Add to business account
-            account_id = conn.execute(
-                f"SELECT id FROM accounts WHERE type = '{account_type}'"
-            ).fetchone()[0]
-            
-            conn.execute("""
-                INSERT INTO transactions (account_id, amount, description, category, life_category, notes)
-                VALUES (?, ?, ?, 'income', ?, ?)
-            """, (account_id, amount, description, account_type, f"Client: {client_name}"))
-            
-            # Update account balance
-            conn.execute(f"""
-                UPDATE accounts 
-                SET balance = balance + ?, updated_at = CURRENT_TIMESTAMP 
-                WHERE type = '{account_type}'
-            """, (amount,))
-            
-            # Add business metric
-            table_name = "tech_business_metrics" if business == "tech" else "brand_business_metrics"
-            conn.execute(f"""
-                INSERT INTO {table_name} (metric_name, metric_value, metric_unit, notes)
-                VALUES ('monthly_revenue', ?, 'ZAR', ?)
-            """, (amount, f"{description} - {client_name}"))
+4. Scale business revenue to accelerate growth""", data)
+    
+    elif name == "get_net_worth_history":
+        with get_read_connection(tenant) as conn:
+            if arguments.get("as_of"):
+                as_of = arguments["as_of"]
+                balances = ledger_events.balances_at(conn, as_of)
+                names = dict(conn.execute("SELECT id, name FROM accounts").fetchall())
+                breakdown = "\n".join(
+                    f"  {names.get(account_id, f'Account {account_id}')}: R{balance:,.2f}"
+                    for account_id, balance in sorted(balances.items())
+                )
+                return tool_response(
+                    name, arguments,
+                    f"📅 **NET WORTH ON {as_of}**\n\n{breakdown}\n\n**Total:** R{sum(balances.values()):,.2f}",
+                    {
+                        "as_of": as_of,
+                        "net_worth": sum(balances.values()),
+                        "accounts": [
+                            {"account_id": account_id, "name": names.get(account_id), "balance": balance}
+                            for account_id, balance in sorted(balances.items())
+                        ]
+                    }
+                )
             
-            conn.commit()
+            start, end = history_range(arguments)
+            points = ledger_events.net_worth_history(conn, start, end)
         
-        return [TextContent(
-            type="text",
-            text=f"🚀 **{business_name} Revenue Added!**\n\nAmount: R{amount:,.2f}\nDescription: {description}\nClient: {client_name}\n\n🎯 Great progress toward R100K MRR goal!"
-        )]
+        values = [point["net_worth"] for point in points]
+        change = values[-1] - values[0]
+        active_days = sum(1 for point in points if point["events"])
+        series_uri = f"lif3://net-worth/history?start={start}&end={end}"
+        return tool_response(name, arguments, f"""📈 **NET WORTH HISTORY** ({start} → {end})
+
+**Start:** R{values[0]:,.2f}
+**End:** R{values[-1]:,.2f}
+**Change:** R{change:+,.2f}
+**Low / High:** R{min(values):,.2f} / R{max(values):,.2f}
+**Days with balance changes:** {active_days} of {len(points)}
+
+Full daily series: {series_uri}""", {
+            "start": start,
+            "end": end,
+            "start_value": values[0],
+            "end_value": values[-1],
+            "change": change,
+            "low": min(values),
+            "high": max(values),
+            "active_days": active_days,
+            "days": len(points),
+            "series_uri": series_uri
+        })
     
     elif name == "get_financial_insights":
         category = arguments["category"]
         focus = arguments.get("focus", "")
         
-        with get_db_connection() as conn:
-            net_worth = conn.execute("SELECT SUM(balance) FROM accounts WHERE is_active = 1").fetchone()[0] or 0
-            
-            if category == "personal":
-                insights = f"""📊 **PERSONAL FINANCE INSIGHTS**
-
-**Current Status:**
-• Net Worth: R{net_worth:,.2f} (Target: R500,000)
-• Progress: {(net_worth/500000)*100:.1f}% to goal
-• Monthly Income: R18,000 - R24,000
-• Monthly Expenses: R9,643
-• Debt: R7,000 (R1,664/month payment)
-
-**💡 KEY RECOMMENDATIONS:**
-
-1. **IMMEDIATE PRIORITY:** Launch 43V3R Tech AI consulting
-   • Target: R2,000-R10,000 per project
-   • 5 clients = R10K-R50K additional monthly income
-   • Leverage Claude CLI and Cursor expertise
-
-2. **EXPENSE OPTIMIZATION:**
-   • Reduce Bash.com clothing: R2,929 → R1,500 (save R1,429)
-   • Quit smoking: Save R2,000+ monthly
-   • Total potential savings: R3,400+ monthly
-
-3. **DEBT ELIMINATION:**
-   • Current payment: R1,664/month
-   • Extra R1,000/month = pay off 4 months early
-   • Interest savings + faster debt freedom
-
-4. **EMERGENCY FUND:**
-   • Target: R28,929 (3 months expenses)
-   • With 43V3R income: achievable in 3-6 months
-
-**🎯 ACTION PLAN:**
-Week 1: Create AI automation portfolio
-Week 2: Contact 10 potential clients
-Week 3: Close first 2 projects
-Month 1: R5,000+ 43V3R revenue"""
-
-            elif category == "tech_business":
-                insights = f"""🚀 **43V3R TECHNOLOGY BUSINESS INSIGHTS**
-
-**Current Status:**
-• MRR: R0 (Target: R100,000)
-• Clients: 0 (Building pipeline)
-• Monthly Costs: R350 (Claude AI)
-• Services: AI, Web3, Blockchain, Quantum
-
-**💡 GROWTH STRATEGY:**
-
-1. **IMMEDIATE REVENUE (Month 1-3):**
-   • AI Consulting: R2,000-R10,000/project
-   • Business automation services
-   • Claude CLI + Cursor competitive advantage
-   • Target: 5 clients = R25,000 initial revenue
-
-2. **SERVICE PORTFOLIO:**
-   • Tier 1: AI chatbots (R2,000-R5,000)
-   • Tier 2: Process automation (R5,000-R15,000)
-   • Tier 3: Enterprise AI (R20,000-R100,000)
-
-3. **CAPE TOWN MARKET ADVANTAGE:**
-   • Lower costs vs international
-   • Strong tech ecosystem
-   • Currency arbitrage for global clients
-
-4. **SCALING TIMELINE:**
-   • Year 1: R0 → R25,000 MRR (Consulting)
-   • Year 2: R25,000 → R75,000 MRR (Enterprise)
-   • Year 3: R75,000 → R100,000+ MRR (Full portfolio)
-
-**🎯 THIS WEEK'S PRIORITIES:**
-1. Build portfolio website
-2. Create 3 service packages
-3. Reach out to 10 local businesses
-4. Price competitively for first clients"""
-
-            else:
-                insights = f"""🎯 **COMPLETE LIFE STRATEGY - ETHAN BARNES**
-
-**THE R500K PATH (Dec 2025):**
-
-**Phase 1 (Months 1-3): Foundation**
-• Launch 43V3R Tech AI consulting
-• Target: R10,000+ monthly business income
-• Eliminate R7,000 debt
-• Quit smoking (health + R2,000 savings)
-
-**Phase 2 (Months 4-6): Growth**
-• Build R28,929 emergency fund
-• Scale 43V3R to R25,000 MRR
-• Optimize IT career (remote position)
-• Start 43V3R Brand development
-
-**Phase 3 (Months 7-12): Acceleration**
-• R50,000+ MRR from combined businesses
-• Investment portfolio growth
-• Advanced Diploma planning
-• House deposit savings
-
-**LIFE CATEGORY PRIORITIES:**
-1. **Personal:** Debt elimination → Emergency fund
-2. **Work:** Skill development for higher salary
-3. **43V3R Tech:** AI consulting launch (IMMEDIATE)
-4. **43V3R Brand:** Development phase
-
-**SUCCESS FORMULA:**
-IT Salary (R18-24K) + 43V3R Tech (R25K+) + Expense optimization (R3K savings) = R46-52K monthly positive cash flow
-
-**YOUR ADVANTAGES:**
-• AI expertise (Claude CLI, Cursor)
-• IT engineering background
-• Cape Town cost arbitrage
-• Young and motivated
-• Clear goals and timeline
-
-🚀 **START TODAY:** Contact first potential AI client!"""
+        with get_db_connection(tenant) as conn:
+            result = INSIGHTS.evaluate(conn, category, focus)
+        insights = insight_engine.render_insights(result, INSIGHT_HEADINGS[category])
         
-        return [TextContent(type="text", text=insights)]
+        return tool_response(name, arguments, insights, {key: value for key, value in result.items() if key != "version"})
     
-    return [TextContent(type="text", text=f"✅ Tool '{name}' executed successfully")]
-
-async def main():
-    from mcp.server.stdio import stdio_server
+    elif name == "search_transactions":
+        query = arguments.get("query", "")
+        
+        with get_db_connection(tenant) as conn:
+            result = ledger_search.search_transactions(
+                conn,
+                query,
+                start=arguments.get("start"),
+                end=arguments.get("end"),
+                life_category=arguments.get("life_category"),
+                min_amount=arguments.get("min_amount"),
+                max_amount=arguments.get("max_amount"),
+                page=arguments.get("page", 1),
+                page_size=arguments.get("page_size", ledger_search.DEFAULT_PAGE_SIZE)
+            )
+            goals = ledger_search.search_goals(conn, query) if arguments.get("include_goals") and query else None
+        
+        return tool_response(name, arguments, ledger_search.render_results(result, goals), {**result, "goals": goals})
     
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            NotificationOptions(capability_changed=True)
+    elif name == "get_portfolio":
+        # Balance updates go through the writer like every other write
+        changed = await WRITES.submit(tenant, portfolio.mark_to_market) if arguments.get("mark_to_market") else 0
+        with get_db_connection(tenant) as conn:
+            result = portfolio.valuation(conn)
+        text = portfolio.render_valuation(result)
+        if changed:
+            text += f"\n\n🔄 Updated {changed} account balance(s) to market value"
+        
+        return tool_response(name, arguments, text, {**result, "marked_accounts": changed})
+    
+    elif name == "export_ledger":
+        directory = ledger_export.export_dir()
+        if tenant not in (None, "", "default"):
+            directory = directory / tenant
+        result = ledger_export.export_ledger(
+            get_read_connection(tenant), directory,
+            tables=arguments.get("tables"),
+            fmt=arguments.get("format"),
+            full=arguments.get("full", False)
         )
+        return tool_response(name, arguments, ledger_export.render_export(result), result)
+    
+    elif name == "archive_ledger":
+        before = arguments.get("before")
+        if before is None and arguments.get("horizon_days") is not None:
+            before = (date.today() - timedelta(days=int(arguments["horizon_days"]))).isoformat()
+        # ATTACH/DETACH and per-year transactions need the writer's connection to themselves
+        path = tenant_db_path(tenant, DB_PATH)
+        text, result = await WRITES.submit_exclusive(tenant, archive_ledger, path, before, arguments.get("dry_run", False))
+        # The writer re-attached its own connection; the read connection's views need any new year files too
+        ledger_archive.attach_archive(get_db_connection(tenant), path)
+        return tool_response(name, arguments, text, result)
+    
+    return tool_response(name, arguments, f"✅ Tool '{name}' executed successfully", {"tool": name})
+
+@app.call_tool()
+@SESSIONS.guard(app)
+@instrument("tool")
+async def call_tool(name: str, arguments: Dict[str, Any]) -> List[Union[TextContent, EmbeddedResource]]:
+    """Execute a tool, then let resource subscribers know if its database may have changed"""
+    try:
+        return await run_tool(name, arguments)
+    finally:
+        # Also when the tool raised: it may have committed before failing
+        SUBSCRIPTIONS.touch(arguments.get("tenant"))
+        schedule_recurring_detection(arguments.get("tenant"))
+
+async def main(args: argparse.Namespace):
+    # Flags may predate ledger changes made while the server was down
+    schedule_recurring_detection()
+    await mcp_transport.serve(app, args, SESSIONS)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='LIF3 financial MCP server')
+    # 8765 is dashboard_sync's WebSocket port
+    mcp_transport.add_transport_arguments(parser, default_port=8767, port_env="LIF3_FINANCIAL_MCP_PORT")
+    args = parser.parse_args()
     if not os.path.exists(DB_PATH):
         init_database()
-    asyncio.run(main())
+    asyncio.run(main(args))
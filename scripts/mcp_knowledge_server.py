@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+LIF3 Knowledge MCP Server - Embedded retrieval over stdio
+Loads the knowledge base index once at startup and answers searches
+in-process, replacing the Python → NestJS → ChromaDB round trip.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Any
+from mcp.server import Server, NotificationOptions
+from mcp.types import Resource, Tool, TextContent
+
+sys.path.append(str(Path(__file__).parent))
+from knowledge_index import LIF3KnowledgeIndex
+from claude_integration import LIF3ClaudeIntegration
+
+app = Server("lif3-knowledge-server")
+
+# Built once per process; see main()
+INDEX: LIF3KnowledgeIndex = None
+
+def get_index() -> LIF3KnowledgeIndex:
+    """Return the process-wide index, building it on first use"""
+    global INDEX
+    if INDEX is None:
+        INDEX = LIF3KnowledgeIndex.load_default()
+    return INDEX
+
+def search_knowledge(query: str, limit: int = 5, threshold: float = 0.3,
+                     category: str = None, expand: bool = True) -> Dict[str, Any]:
+    """Search the index, optionally fusing expanded sub-queries with RRF"""
+    index = get_index()
+    if not expand:
+        return {"results": index.search(query, limit, threshold, category), "queries": [query]}
+
+    integration = LIF3ClaudeIntegration()
+    queries = integration.expand_query(query)
+    ranked = [index.search(sub_query, limit * 2, threshold, category) for sub_query in queries]
+    return {"results": integration.fuse_results(ranked)[:limit], "queries": queries}
+
+@app.list_resources()
+async def list_resources() -> List[Resource]:
+    """List knowledge base resources"""
+    return [
+        Resource(
+            uri="lif3://knowledge/documents",
+            name="Knowledge Base Documents",
+            description="Documents and chunk counts held by the embedded index",
+            mimeType="application/json"
+        )
+    ]
+
+@app.read_resource()
+async def read_resource(uri: str) -> str:
+    """Read knowledge base resources"""
+    uri = str(uri)
+    if uri == "lif3://knowledge/documents":
+        index = get_index()
+        return json.dumps({"chunks": len(index.chunks), "documents": index.documents()}, separators=(",", ":"))
+    raise ValueError(f"Unknown resource: {uri}")
+
+@app.list_tools()
+async def list_tools() -> List[Tool]:
+    """List knowledge base tools"""
+    return [
+        Tool(
+            name="search_knowledge_base",
+            description="Search LIF3 financial strategy knowledge (investing, tax, 43V3R business, risk) in-process",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Question or search terms"},
+                    "limit": {"type": "integer", "description": "Maximum chunks to return", "default": 5},
+                    "threshold": {"type": "number", "description": "Minimum share of query terms matched (0-1)", "default": 0.3},
+                    "category": {"type": "string", "description": "Restrict to one document category"},
+                    "expand": {"type": "boolean", "description": "Fuse synonym/ZAR/JSE sub-queries", "default": True}
+                },
+                "required": ["query"]
+            }
+        )
+    ]
+
+@app.call_tool()
+async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Execute knowledge base tools"""
+    if name == "search_knowledge_base":
+        results = search_knowledge(
+            arguments["query"],
+            limit=int(arguments.get("limit", 5)),
+            threshold=float(arguments.get("threshold", 0.3)),
+            category=arguments.get("category"),
+            expand=arguments.get("expand", True)
+        )
+
+        if not results["results"]:
+            return [TextContent(type="text", text=f"No knowledge base matches for: {arguments['query']}")]
+
+        lines = [f"📚 **Knowledge base results** ({len(results['results'])})\n"]
+        for result in results["results"]:
+            chunk = result["chunk"]
+            lines.append(f"[Source: {chunk['document_title']} | Similarity: {result['similarity']:.2f} | Section: {chunk['category']}]")
+            lines.append(chunk["content"])
+            lines.append("")
+        return [TextContent(type="text", text="\n".join(lines))]
+
+    return [TextContent(type="text", text=f"Unknown tool: {name}")]
+
+async def main():
+    from mcp.server.stdio import stdio_server
+
+    # Load the index before accepting requests so the first search is fast
+    get_index()
+
+    async with stdio_server() as (read_stream, write_stream):
+        await app.run(
+            read_stream,
+            write_stream,
+            app.create_initialization_options(NotificationOptions())
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
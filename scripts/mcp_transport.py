@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+LIF3 MCP Transport - stdio or one long-running HTTP server for many sessions
+--transport stdio (the default) serves a single client over stdin/stdout.
+--transport http serves streamable HTTP at /mcp and legacy SSE at /sse from
+one process, so every session shares the server's connection pool, caches
+and name index instead of spawning its own Python process. Sessions are
+capped (LIF3_MAX_SESSIONS), closed when idle (LIF3_SESSION_IDLE_SECONDS),
+and LIF3SessionLimits bounds each session's request rate and concurrency.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import os
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+from server_metrics import REGISTRY
+
+TRANSPORTS = ("stdio", "http")
+
+DEFAULT_HTTP_HOST = "127.0.0.1"
+DEFAULT_MAX_SESSIONS = 64
+DEFAULT_SESSION_IDLE_SECONDS = 900.0
+DEFAULT_SESSION_RATE = 20.0  # requests per second, refilled continuously
+DEFAULT_SESSION_BURST = 40
+DEFAULT_SESSION_MAX_INFLIGHT = 4
+
+class SessionLimitExceeded(RuntimeError):
+    pass
+
+class SessionState:
+    __slots__ = ("tokens", "updated", "inflight", "requests", "rejected")
+
+    def __init__(self, burst: float, max_inflight: int):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.inflight = asyncio.Semaphore(max_inflight)
+        self.requests = 0
+        self.rejected = 0
+
+class LIF3SessionLimits:
+    """Token-bucket request rate and in-flight cap per MCP session (off under stdio)
+
+    Requests past the rate are rejected with SessionLimitExceeded; requests past the in-flight cap
+    wait for one of the session's earlier requests to finish, so one busy client cannot occupy the
+    shared connections while others queue behind it. A rate of 0 disables the rate limit.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None,
+                 max_inflight: Optional[int] = None, enabled: bool = False):
+        self.rate = rate if rate is not None else float(os.environ.get("LIF3_SESSION_RATE", DEFAULT_SESSION_RATE))
+        self.burst = burst if burst is not None else float(
+            os.environ.get("LIF3_SESSION_BURST", max(DEFAULT_SESSION_BURST, self.rate))
+        )
+        self.max_inflight = max_inflight if max_inflight is not None else int(
+            os.environ.get("LIF3_SESSION_MAX_INFLIGHT", DEFAULT_SESSION_MAX_INFLIGHT)
+        )
+        self.enabled = enabled
+        # Keyed by the ServerSession, so a session's state goes away with it
+        self.sessions: "weakref.WeakKeyDictionary[Any, SessionState]" = weakref.WeakKeyDictionary()
+        self.rejected = 0
+
+    def _state(self, session) -> SessionState:
+        state = self.sessions.get(session)
+        if state is None:
+            state = self.sessions[session] = SessionState(self.burst, self.max_inflight)
+        return state
+
+    def _take_token(self, state: SessionState):
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        state.tokens = min(self.burst, state.tokens + (now - state.updated) * self.rate)
+        state.updated = now
+        if state.tokens < 1:
+            state.rejected += 1
+            self.rejected += 1
+            REGISTRY.increment("lif3_session_rejections_total", reason="rate")
+            raise SessionLimitExceeded(f"Rate limit exceeded: {self.rate:g} requests/s per session "
+                                       f"(burst {self.burst:g}); retry shortly")
+        state.tokens -= 1
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, session):
+        state = self._state(session)
+        self._take_token(state)
+        state.requests += 1
+        started = time.perf_counter()
+        async with state.inflight:
+            REGISTRY.observe("lif3_session_queue_wait_ms", (time.perf_counter() - started) * 1000)
+            yield
+
+    def guard(self, server):
+        """Decorator for a server's async handlers; looks the session up in the request context"""
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await func(*args, **kwargs)
+                try:
+                    session = server.request_context.session
+                except LookupError:
+                    # Called directly (benchmarks, subscription re-renders), not from a request
+                    return await func(*args, **kwargs)
+                async with self.acquire(session):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "rate": self.rate,
+            "burst": self.burst,
+            "max_inflight": self.max_inflight,
+            "sessions": len(self.sessions),
+            "requests": sum(state.requests for state in self.sessions.values()),
+            "rejected": self.rejected
+        }
+
+def add_transport_arguments(parser: argparse.ArgumentParser, default_port: int, port_env: str):
+    """--transport/--host/--port and session flags; port_env is the server's own port variable, so both servers can run side by side"""
+    parser.add_argument('--transport', choices=TRANSPORTS, default=os.environ.get("LIF3_MCP_TRANSPORT", "stdio"),
+                        help='stdio for one client, http for many concurrent sessions (streamable HTTP at /mcp, SSE at /sse)')
+    parser.add_argument('--host', default=os.environ.get("LIF3_MCP_HOST", DEFAULT_HTTP_HOST), help='HTTP bind address')
+    parser.add_argument('--port', type=int, default=int(os.environ.get(port_env, default_port)),
+                        help=f'HTTP port (env {port_env})')
+    parser.add_argument('--max-sessions', type=int,
+                        default=int(os.environ.get("LIF3_MAX_SESSIONS", DEFAULT_MAX_SESSIONS)),
+                        help='Concurrent HTTP sessions; further sessions get 503')
+    parser.add_argument('--session-idle-seconds', type=float,
+                        default=float(os.environ.get("LIF3_SESSION_IDLE_SECONDS", DEFAULT_SESSION_IDLE_SECONDS)),
+                        help='Close HTTP sessions idle this long')
+
+class StreamableHTTPEndpoint:
+    """Raw ASGI endpoint, so Starlette hands the session manager the request untouched"""
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    async def __call__(self, scope, receive, send):
+        await self.manager.handle_request(scope, receive, send)
+
+class SSEEndpoint:
+    """GET /sse: one MCP session per open event stream, up to max_sessions"""
+
+    def __init__(self, server, transport, max_sessions: int):
+        self.server = server
+        self.transport = transport
+        self.max_sessions = max_sessions
+        self.active = 0
+
+    async def __call__(self, scope, receive, send):
+        from starlette.responses import PlainTextResponse
+
+        if self.active >= self.max_sessions:
+            REGISTRY.increment("lif3_session_rejections_total", reason="sessions")
+            await PlainTextResponse("Too many sessions", status_code=503)(scope, receive, send)
+            return
+        self.active += 1
+        try:
+            async with self.transport.connect_sse(scope, receive, send) as (read_stream, write_stream):
+                await self.server.run(read_stream, write_stream, self.server.create_initialization_options())
+        finally:
+            self.active -= 1
+
+def http_app(server, max_sessions: int = DEFAULT_MAX_SESSIONS,
+             session_idle_seconds: float = DEFAULT_SESSION_IDLE_SECONDS):
+    """Starlette app serving `server` over streamable HTTP (/mcp) and SSE (/sse, /messages/)"""
+    from mcp.server.sse import SseServerTransport
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    from starlette.applications import Starlette
+    from starlette.routing import Mount, Route
+
+    # Plain JSON replies to POSTs instead of a one-event SSE stream each (about twice the requests/s);
+    # resources/updated notifications still reach the client over its GET /mcp stream
+    manager = StreamableHTTPSessionManager(app=server, json_response=True, max_sessions=max_sessions,
+                                           session_idle_timeout=session_idle_seconds)
+    sse = SseServerTransport("/messages/")
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_):
+        async with manager.run():
+            yield
+
+    return Starlette(routes=[
+        Route("/mcp", endpoint=StreamableHTTPEndpoint(manager)),
+        Route("/sse", endpoint=SSEEndpoint(server, sse, max_sessions), methods=["GET"]),
+        Mount("/messages/", app=sse.handle_post_message),
+    ], lifespan=lifespan)
+
+async def serve(server, args: argparse.Namespace, limits: Optional[LIF3SessionLimits] = None):
+    """Run `server` on the transport chosen by add_transport_arguments' flags"""
+    if args.transport == "stdio":
+        from mcp.server.stdio import stdio_server
+
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+        return
+
+    import uvicorn
+
+    if limits is not None:
+        limits.enabled = True
+    config = uvicorn.Config(http_app(server, args.max_sessions, args.session_idle_seconds),
+                            host=args.host, port=args.port, log_level="warning")
+    await uvicorn.Server(config).serve()
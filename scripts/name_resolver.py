@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+LIF3 Name Resolver - Fuzzy lookup of accounts, goals and habits by name
+Tools name the row they write to ("Emergency Fund", "Quit Smoking"). Names are
+normalized (case, accents, punctuation) and indexed by trigram in memory per
+database, so a near miss resolves in microseconds or fails with ranked
+suggestions instead of silently updating nothing. The index rebuilds when
+the connection has written anything or another connection has committed.
+"""
+
+import re
+import sqlite3
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+# kind -> (table, name column, filter)
+SOURCES = {
+    "account": ("accounts", "name", "is_active = 1"),
+    "goal": ("goals", "title", "1"),
+    "habit": ("habits", "habit_name", "is_active = 1"),
+}
+
+# A fuzzy match is taken only when it is this similar and this far ahead of the runner-up
+RESOLVE_THRESHOLD = 0.6
+RESOLVE_MARGIN = 0.15
+
+MAX_SUGGESTIONS = 5
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+class NameResolutionError(LookupError):
+    """No single row matches a name; carries the ranked suggestions"""
+
+    def __init__(self, kind: str, name: str, suggestions: List[Tuple[str, float]]):
+        self.kind = kind
+        self.name = name
+        self.suggestions = suggestions
+        if suggestions:
+            options = ", ".join(f"'{candidate}' ({score:.0%})" for candidate, score in suggestions)
+            message = f"No {kind} named '{name}'. Did you mean: {options}?"
+        else:
+            message = f"No {kind} named '{name}' and nothing similar exists"
+        super().__init__(message)
+
+class Resolution(NamedTuple):
+    id: int
+    name: str
+    score: float  # 1.0 for an exact (normalized) match
+
+def normalize_name(text: str) -> str:
+    """Lowercase, accents stripped, punctuation collapsed to single spaces"""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode().lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class NameIndex:
+    """Normalized-name and trigram index over one table's names"""
+
+    def __init__(self, rows):
+        self.names: Dict[int, str] = {}
+        self.exact: Dict[str, List[int]] = {}
+        self.grams: Dict[int, Set[str]] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        for row_id, name in rows:
+            normalized = normalize_name(name)
+            self.names[row_id] = name
+            self.exact.setdefault(normalized, []).append(row_id)
+            grams = self.grams[row_id] = trigrams(normalized)
+            for gram in grams:
+                self.postings.setdefault(gram, set()).add(row_id)
+
+    def rank(self, name: str) -> List[Tuple[int, float]]:
+        """Candidates sharing a trigram, by Dice similarity"""
+        query = trigrams(normalize_name(name))
+        shared: Dict[int, int] = {}
+        for gram in query:
+            for row_id in self.postings.get(gram, ()):
+                shared[row_id] = shared.get(row_id, 0) + 1
+        scored = [(row_id, 2 * count / (len(query) + len(self.grams[row_id]))) for row_id, count in shared.items()]
+        return sorted(scored, key=lambda item: item[1], reverse=True)
+
+    def resolve(self, kind: str, name: str) -> Resolution:
+        exact = self.exact.get(normalize_name(name), [])
+        if len(exact) == 1:
+            return Resolution(exact[0], self.names[exact[0]], 1.0)
+        ranked = self.rank(name)
+        if not exact and ranked:
+            best_score = ranked[0][1]
+            runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+            if best_score >= RESOLVE_THRESHOLD and best_score - runner_up >= RESOLVE_MARGIN:
+                return Resolution(ranked[0][0], self.names[ranked[0][0]], round(best_score, 3))
+        suggestions = [(self.names[row_id], round(score, 3)) for row_id, score in ranked[:MAX_SUGGESTIONS]]
+        raise NameResolutionError(kind, name, suggestions)
+
+class LIF3NameResolver:
+    """One NameIndex per database and kind, rebuilt when the database may have changed"""
+
+    def __init__(self):
+        self.cache: Dict[Tuple[str, str], Tuple[tuple, list, NameIndex]] = {}
+
+    def index(self, conn: sqlite3.Connection, kind: str) -> NameIndex:
+        table, column, condition = SOURCES[kind]
+        key = (conn.execute("PRAGMA database_list").fetchone()[2], kind)
+        # data_version moves on other connections' commits; total_changes on this connection's writes
+        version = (conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+        cached = self.cache.get(key)
+        if cached is None or cached[0] != version:
+            rows = [tuple(row) for row in conn.execute(f"SELECT id, {column} FROM {table} WHERE {condition}")]
+            # Most writes (a new transaction, a balance move) leave the names alone; keep the index then
+            index = cached[2] if cached is not None and cached[1] == rows else NameIndex(rows)
+            cached = self.cache[key] = (version, rows, index)
+        return cached[2]
+
+    def resolve(self, conn: sqlite3.Connection, kind: str, name: str) -> Resolution:
+        """Row for a name; raises NameResolutionError with suggestions when there is no single match"""
+        return self.index(conn, kind).resolve(kind, name)
+
+    def warm(self, conn: sqlite3.Connection):
+        for kind in SOURCES:
+            self.index(conn, kind)
+
+NAMES = LIF3NameResolver()
+
+def matched_note(resolution: Resolution, requested: str) -> str:
+    """Suffix for tool replies when the name was resolved fuzzily"""
+    return "" if resolution.score == 1.0 else f" (matched '{resolution.name}' for '{requested}', {resolution.score:.0%})"
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+LIF3 Payload Serializer - Compact encoding for MCP and WebSocket payloads
+Compact JSON by default, orjson or msgpack when installed, and row helpers
+that turn sqlite3 rows into dicts without per-row key lookups.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+def _default(obj):
+    """Fallback for types the stdlib encoder cannot handle"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, sqlite3.Row):
+        return dict(zip(obj.keys(), obj))
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+class Serializer:
+    """One payload encoding; binary serializers produce bytes"""
+
+    def __init__(self, name: str, content_type: str, encode: Callable[[Any], Any], binary: bool = False):
+        self.name = name
+        self.content_type = content_type
+        self.binary = binary
+        self._encode = encode
+
+    def dumps(self, obj: Any):
+        return self._encode(obj)
+
+    def __repr__(self):
+        return f"Serializer({self.name})"
+
+_COMPACT_JSON = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_default)
+
+SERIALIZERS: Dict[str, Serializer] = {
+    "json": Serializer("json", "application/json", _COMPACT_JSON.encode),
+    "json-pretty": Serializer(
+        "json-pretty", "application/json",
+        lambda obj: json.dumps(obj, indent=2, default=str)
+    ),
+}
+
+if orjson is not None:
+    SERIALIZERS["orjson"] = Serializer(
+        "orjson", "application/json",
+        lambda obj: orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    )
+
+if msgpack is not None:
+    SERIALIZERS["msgpack"] = Serializer(
+        "msgpack", "application/msgpack",
+        lambda obj: msgpack.packb(obj, default=_default, use_bin_type=True),
+        binary=True
+    )
+
+def get_serializer(name: Optional[str] = None, text_only: bool = False) -> Serializer:
+    """Resolve a serializer by name, LIF3_SERIALIZER, or the fastest text encoder installed"""
+    name = name or os.environ.get("LIF3_SERIALIZER")
+    if name:
+        if name not in SERIALIZERS:
+            raise ValueError(f"Serializer '{name}' unavailable (installed: {', '.join(SERIALIZERS)})")
+        serializer = SERIALIZERS[name]
+        if not (text_only and serializer.binary):
+            return serializer
+    return SERIALIZERS["orjson"] if "orjson" in SERIALIZERS else SERIALIZERS["json"]
+
+def row_keys(description) -> Tuple[str, ...]:
+    """Column names for a cursor description"""
+    return tuple(column[0] for column in description)
+
+def rows_to_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """Materialise a cursor as dicts, reading the column names once per query rather than per row"""
+    keys = row_keys(cursor.description)
+    return [dict(zip(keys, row)) for row in cursor.fetchall()]
+
+def fetch_dicts(conn: sqlite3.Connection, sql: str, params=()) -> List[Dict[str, Any]]:
+    """Run a query and return its rows as plain dicts"""
+    return rows_to_dicts(conn.execute(sql, params))
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+LIF3 Portfolio - Holdings, price history and mark-to-market valuation
+Positions are stored per account and symbol; prices arrive from CSV files or
+a stub feed into price_history, and a trigger keeps latest_prices current so
+valuation never scans the history. One statement multiplies every position
+by its latest price and FX rate; allocation is compared with the targets in
+the "Aggressive Investment Strategy" knowledge document.
+"""
+
+import argparse
+import csv
+import sqlite3
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import fx_rates
+from lif3_config import resolve_db_path
+
+# Target weights (% of portfolio) from the aggressive investment strategy
+ALLOCATION_TARGETS = {
+    "equities": {"jse_top40": 20, "sp500": 20, "emerging_markets": 10, "growth_stocks": 10},
+    "alternatives": {"crypto": 15, "reits": 10},
+    "business": {"business": 15},
+}
+
+ASSET_CLASSES = {asset_class: group for group, classes in ALLOCATION_TARGETS.items() for asset_class in classes}
+
+PORTFOLIO_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS holdings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account_id INTEGER NOT NULL,
+        symbol TEXT NOT NULL,
+        asset_class TEXT NOT NULL, -- key of ALLOCATION_TARGETS' classes
+        quantity REAL NOT NULL DEFAULT 0,
+        cost_basis REAL, -- total cost in ZAR
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (account_id, symbol),
+        FOREIGN KEY (account_id) REFERENCES accounts (id)
+    );
+
+    CREATE TABLE IF NOT EXISTS price_history (
+        symbol TEXT NOT NULL,
+        price_date DATE NOT NULL,
+        price REAL NOT NULL,
+        currency TEXT NOT NULL DEFAULT 'ZAR',
+        source TEXT,
+        PRIMARY KEY (symbol, price_date)
+    ) WITHOUT ROWID;
+
+    -- Newest price per symbol, maintained by the triggers below
+    CREATE TABLE IF NOT EXISTS latest_prices (
+        symbol TEXT PRIMARY KEY,
+        price REAL NOT NULL,
+        currency TEXT NOT NULL,
+        price_date DATE NOT NULL
+    ) WITHOUT ROWID;
+
+    CREATE TRIGGER IF NOT EXISTS trg_price_history_latest_insert
+    AFTER INSERT ON price_history
+    BEGIN
+        INSERT INTO latest_prices (symbol, price, currency, price_date)
+        VALUES (NEW.symbol, NEW.price, NEW.currency, NEW.price_date)
+        ON CONFLICT (symbol) DO UPDATE
+            SET price = excluded.price, currency = excluded.currency, price_date = excluded.price_date
+            WHERE excluded.price_date >= latest_prices.price_date;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS trg_price_history_latest_update
+    AFTER UPDATE ON price_history
+    BEGIN
+        INSERT INTO latest_prices (symbol, price, currency, price_date)
+        VALUES (NEW.symbol, NEW.price, NEW.currency, NEW.price_date)
+        ON CONFLICT (symbol) DO UPDATE
+            SET price = excluded.price, currency = excluded.currency, price_date = excluded.price_date
+            WHERE excluded.price_date >= latest_prices.price_date;
+    END;
+"""
+
+# Offline placeholder quotes (price, currency); load real prices with --csv
+STUB_PRICES = {
+    "STX40": (85.0, "ZAR"),
+    "STX500": (190.0, "ZAR"),
+    "STXEMG": (60.0, "ZAR"),
+    "TSLA": (250.0, "USD"),
+    "AAPL": (220.0, "USD"),
+    "GOOGL": (170.0, "USD"),
+    "BTC": (100000.0, "USD"),
+    "ETH": (3500.0, "USD"),
+    "STXPRO": (30.0, "ZAR"),
+}
+
+# Every position valued in one pass: quantity × latest price × FX rate
+VALUATION_SQL = f"""
+    WITH {fx_rates.RATES_CTE}
+    SELECT h.id, h.account_id, a.name, h.symbol, h.asset_class, h.quantity, h.cost_basis,
+           p.price, p.currency, p.price_date, h.quantity * p.price * r.rate_to_zar AS value_zar
+    FROM holdings h
+    JOIN accounts a ON a.id = h.account_id
+    LEFT JOIN latest_prices p ON p.symbol = h.symbol
+    LEFT JOIN zar_rates r ON r.currency = p.currency
+    WHERE h.quantity != 0
+    ORDER BY value_zar DESC
+"""
+
+# Accounts with holdings take their market value (in the account's currency); partly priced accounts are left alone
+MARK_TO_MARKET_SQL = f"""
+    WITH {fx_rates.RATES_CTE},
+    valued AS (
+        SELECT h.account_id, SUM(h.quantity * p.price * r.rate_to_zar) AS value_zar
+        FROM holdings h
+        LEFT JOIN latest_prices p ON p.symbol = h.symbol
+        LEFT JOIN zar_rates r ON r.currency = p.currency
+        -- Sold-out positions add nothing, so a missing quote for one must not block the account
+        WHERE h.quantity <> 0
+        GROUP BY h.account_id
+        HAVING COUNT(r.rate_to_zar) = COUNT(*)
+    )
+    UPDATE accounts SET balance = ROUND(valued.value_zar / account_rate.rate_to_zar, 2), updated_at = CURRENT_TIMESTAMP
+    FROM valued, zar_rates AS account_rate
+    WHERE accounts.id = valued.account_id
+      AND account_rate.currency = UPPER(COALESCE(accounts.currency, 'ZAR'))
+      AND accounts.balance IS NOT ROUND(valued.value_zar / account_rate.rate_to_zar, 2)
+"""
+
+class StubPriceFeed:
+    """Fixed quotes for offline use (source='stub')"""
+
+    name = "stub"
+
+    def __init__(self, prices: Optional[Dict[str, Tuple[float, str]]] = None):
+        self.quotes = dict(prices or STUB_PRICES)
+
+    def prices(self, day: str) -> Iterable[Tuple[str, str, float, str]]:
+        return [(symbol, day, price, currency) for symbol, (price, currency) in self.quotes.items()]
+
+class CsvPriceFeed:
+    """Rows of date,symbol,price[,currency] (header required; currency defaults to ZAR)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"csv:{path}"
+
+    def prices(self, day: Optional[str] = None) -> Iterable[Tuple[str, str, float, str]]:
+        with open(self.path, newline="") as f:
+            for row in csv.DictReader(f):
+                if day is None or row["date"] == day:
+                    currency = (row.get("currency") or fx_rates.BASE_CURRENCY).strip().upper()
+                    yield row["symbol"].strip().upper(), row["date"].strip(), float(row["price"]), currency
+
+def install(conn: sqlite3.Connection):
+    conn.executescript(PORTFOLIO_SCHEMA)
+
+def load_prices(conn: sqlite3.Connection, feed, day: Optional[str] = None) -> int:
+    """Upsert the feed's quotes into price_history; returns rows written"""
+    rows = [(symbol, price_date, price, currency, feed.name) for symbol, price_date, price, currency in feed.prices(day)]
+    conn.executemany("""
+        INSERT INTO price_history (symbol, price_date, price, currency, source) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (symbol, price_date) DO UPDATE
+            SET price = excluded.price, currency = excluded.currency, source = excluded.source
+    """, rows)
+    conn.commit()
+    return len(rows)
+
+def set_holding(conn: sqlite3.Connection, account_id: int, symbol: str, quantity: float,
+                asset_class: str, cost_basis: Optional[float] = None):
+    """Create or replace a position (quantity 0 keeps the row but drops it from valuation)"""
+    if asset_class not in ASSET_CLASSES:
+        raise ValueError(f"Unknown asset class '{asset_class}' (expected one of: {', '.join(ASSET_CLASSES)})")
+    conn.execute("""
+        INSERT INTO holdings (account_id, symbol, asset_class, quantity, cost_basis) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (account_id, symbol) DO UPDATE
+            SET asset_class = excluded.asset_class, quantity = excluded.quantity,
+                cost_basis = COALESCE(excluded.cost_basis, holdings.cost_basis), updated_at = CURRENT_TIMESTAMP
+    """, (account_id, symbol.upper(), asset_class, quantity, cost_basis))
+
+def mark_to_market(conn: sqlite3.Connection) -> int:
+    """Write market values into the holding accounts' balances; returns accounts changed"""
+    # rowcount is not reported for statements that start with WITH
+    conn.execute(MARK_TO_MARKET_SQL)
+    return conn.execute("SELECT changes()").fetchone()[0]
+
+def allocation(totals: Dict[str, float], total: float) -> List[Dict[str, Any]]:
+    """Actual vs target weight per group and asset class"""
+    rows = []
+    for group, classes in ALLOCATION_TARGETS.items():
+        group_value = sum(totals.get(asset_class, 0.0) for asset_class in classes)
+        group_actual = group_value / total * 100 if total else 0.0
+        group_target = sum(classes.values())
+        rows.append({"group": group, "asset_class": None, "value_zar": round(group_value, 2),
+                     "actual_pct": round(group_actual, 2), "target_pct": group_target,
+                     "drift_pct": round(group_actual - group_target, 2)})
+        for asset_class, target in classes.items():
+            actual = totals.get(asset_class, 0.0) / total * 100 if total else 0.0
+            rows.append({"group": group, "asset_class": asset_class, "value_zar": round(totals.get(asset_class, 0.0), 2),
+                         "actual_pct": round(actual, 2), "target_pct": target,
+                         "drift_pct": round(actual - target, 2)})
+    return rows
+
+def valuation(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Market value of every position, totals per asset class and allocation drift"""
+    positions = []
+    unpriced = []
+    totals: Dict[str, float] = {}
+    for (holding_id, account_id, account, symbol, asset_class, quantity, cost_basis,
+         price, currency, price_date, value_zar) in conn.execute(VALUATION_SQL):
+        if value_zar is None:
+            unpriced.append(symbol)
+        else:
+            totals[asset_class] = totals.get(asset_class, 0.0) + value_zar
+        positions.append({
+            "id": holding_id,
+            "account_id": account_id,
+            "account": account,
+            "symbol": symbol,
+            "asset_class": asset_class,
+            "quantity": quantity,
+            "price": price,
+            "currency": currency,
+            "price_date": price_date,
+            "value_zar": None if value_zar is None else round(value_zar, 2),
+            "cost_basis": cost_basis,
+            "unrealized_gain": None if value_zar is None or cost_basis is None else round(value_zar - cost_basis, 2)
+        })
+    total = sum(totals.values())
+    return {
+        "as_of": date.today().isoformat(),
+        "total_value_zar": round(total, 2),
+        "positions": positions,
+        "unpriced": unpriced,
+        "allocation": allocation(totals, total)
+    }
+
+def render_valuation(result: Dict[str, Any]) -> str:
+    """Markdown block for the get_portfolio tool"""
+    lines = ["📈 **PORTFOLIO VALUATION**", ""]
+    for position in result["positions"]:
+        value = f"R{position['value_zar']:,.2f}" if position["value_zar"] is not None else "no price"
+        lines.append(f"  {position['symbol']} ({position['account']}): {position['quantity']:,.4g} → {value}")
+    if not result["positions"]:
+        lines.append("  No holdings recorded yet — add positions with scripts/portfolio.py holding")
+    lines += ["", f"**Total Market Value:** R{result['total_value_zar']:,.2f}", "", "**Allocation vs Target:**"]
+    for row in result["allocation"]:
+        label = row["asset_class"] or row["group"].upper()
+        indent = "    " if row["asset_class"] else "  "
+        lines.append(f"{indent}{label}: {row['actual_pct']:.1f}% (target {row['target_pct']}%, drift {row['drift_pct']:+.1f}%)")
+    if result["unpriced"]:
+        lines += ["", f"⚠️ No price for: {', '.join(result['unpriced'])}"]
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='LIF3 portfolio holdings and prices')
+    parser.add_argument('--db', default=resolve_db_path(), help='LIF3 SQLite database')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    prices_parser = subparsers.add_parser('prices', help='Load prices from a CSV file or the stub feed')
+    source = prices_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--csv', help='CSV with date,symbol,price[,currency] columns')
+    source.add_argument('--stub', action='store_true', help='Write the offline stub quotes for --date')
+    prices_parser.add_argument('--date', default=date.today().isoformat(), help='Quote date for --stub (YYYY-MM-DD)')
+    holding_parser = subparsers.add_parser('holding', help='Create or replace a position')
+    holding_parser.add_argument('--account', required=True, help='Account name')
+    holding_parser.add_argument('--symbol', required=True)
+    holding_parser.add_argument('--quantity', type=float, required=True)
+    holding_parser.add_argument('--asset-class', required=True, choices=list(ASSET_CLASSES))
+    holding_parser.add_argument('--cost-basis', type=float, help='Total cost in ZAR')
+    value_parser = subparsers.add_parser('value', help='Print the valuation and allocation')
+    value_parser.add_argument('--mark', action='store_true', help='Also write market values into account balances')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    fx_rates.install(conn)
+    install(conn)
+    if args.command == 'prices':
+        feed = CsvPriceFeed(args.csv) if args.csv else StubPriceFeed()
+        written = load_prices(conn, feed, None if args.csv else args.date)
+        print(f"💹 Loaded {written} prices into {args.db}")
+    elif args.command == 'holding':
+        account = conn.execute("SELECT id FROM accounts WHERE name = ?", (args.account,)).fetchone()
+        if account is None:
+            parser.error(f"no account named '{args.account}'")
+        set_holding(conn, account[0], args.symbol, args.quantity, args.asset_class, args.cost_basis)
+        conn.commit()
+        print(f"✅ {args.symbol.upper()}: {args.quantity:,.4g} in {args.account}")
+    else:
+        if args.mark:
+            changed = mark_to_market(conn)
+            conn.commit()
+            print(f"🔄 Marked {changed} account(s) to market")
+        print(render_valuation(valuation(conn)))
+    conn.close()
+
+if __name__ == "__main__":
+    main()
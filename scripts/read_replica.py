@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+LIF3 Read Replica - Backup-API snapshots for long analytical reads
+LIF3ReadReplicas copies a database with the SQLite online backup API into a
+query_only replica, in memory or as a sibling .replica.db file, and hands
+that out to rollup, history and ad-hoc query readers. Writers never wait on
+those reads and never change the data under them. Once the replica is older
+than LIF3_REPLICA_MAX_LAG_SECONDS and the source file has changed, a fresh
+copy is taken off the event loop and swapped in.
+Enabled with LIF3_READ_REPLICA=memory|file (default off).
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import ledger_archive
+import server_metrics
+from server_metrics import REGISTRY
+from lif3_config import resolve_db_path
+
+REPLICA_MODES = ("off", "memory", "file")
+DEFAULT_REPLICA_MAX_LAG_SECONDS = 30.0
+
+def replica_path(source_path: str) -> str:
+    """Sibling file used by file mode: data/lif3_financial.db -> data/lif3_financial.replica.db"""
+    return str(Path(source_path).with_suffix(".replica.db"))
+
+def source_stamp(source_path: str) -> tuple:
+    """Modification time and size of the database and its WAL; changes whenever a commit lands"""
+    stamp = []
+    for path in (source_path, f"{source_path}-wal"):
+        try:
+            stat = os.stat(path)
+            stamp += [stat.st_mtime_ns, stat.st_size]
+        except FileNotFoundError:
+            stamp += [None, None]
+    return tuple(stamp)
+
+def take_snapshot(source_path: str, mode: str, row_factory=None) -> sqlite3.Connection:
+    """Copy source_path into a new query_only connection (safe to call from a worker thread)"""
+    # A separate read-only source connection reads one consistent WAL snapshot without blocking writers
+    source = sqlite3.connect(f"{Path(source_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        if mode == "memory":
+            replica = server_metrics.connect(":memory:", check_same_thread=False)
+            source.backup(replica)
+        else:
+            target_path = replica_path(source_path)
+            tmp_path = f"{target_path}.tmp"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            target = sqlite3.connect(tmp_path)
+            source.backup(target)
+            # A read-only WAL file would need its -shm; a rollback-journal copy opens anywhere
+            target.execute("PRAGMA journal_mode = DELETE")
+            target.close()
+            os.replace(tmp_path, target_path)
+            replica = server_metrics.connect(f"{Path(target_path).resolve().as_uri()}?mode=ro", uri=True,
+                                             check_same_thread=False)
+    finally:
+        source.close()
+    # The archive year files are attached live, not copied: they only change when archive_ledger runs.
+    # Must precede query_only, which also blocks the TEMP *_all views
+    ledger_archive.attach_archive(replica, source_path)
+    replica.execute("PRAGMA query_only = 1")
+    if row_factory is not None:
+        replica.row_factory = row_factory
+    return replica
+
+class Replica:
+    __slots__ = ("conn", "stamp", "refreshed_at", "refreshes", "last_refresh_ms", "pending")
+
+    def __init__(self, conn: sqlite3.Connection, stamp: tuple, elapsed_ms: float):
+        self.conn = conn
+        self.stamp = stamp
+        self.refreshed_at = time.time()
+        self.refreshes = 1
+        self.last_refresh_ms = elapsed_ms
+        self.pending: Optional[asyncio.Future] = None
+
+class LIF3ReadReplicas:
+    """One snapshot replica per source database, refreshed in the background once stale"""
+
+    def __init__(self, mode: Optional[str] = None, max_lag_seconds: Optional[float] = None, row_factory=None):
+        self.mode = mode or os.environ.get("LIF3_READ_REPLICA", "off")
+        if self.mode not in REPLICA_MODES:
+            raise ValueError(f"LIF3_READ_REPLICA must be one of {', '.join(REPLICA_MODES)} (got {self.mode!r})")
+        self.max_lag_seconds = max_lag_seconds if max_lag_seconds is not None else float(
+            os.environ.get("LIF3_REPLICA_MAX_LAG_SECONDS", DEFAULT_REPLICA_MAX_LAG_SECONDS)
+        )
+        self.row_factory = row_factory
+        self.replicas: Dict[str, Replica] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def _snapshot(self, source_path: str) -> tuple:
+        stamp = source_stamp(source_path)
+        started = time.perf_counter()
+        conn = take_snapshot(source_path, self.mode, self.row_factory)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        REGISTRY.observe("lif3_replica_refresh_ms", elapsed_ms, mode=self.mode)
+        return conn, stamp, elapsed_ms
+
+    def get(self, source_path: str) -> sqlite3.Connection:
+        """Replica connection for a database, taking the first snapshot inline and later ones in the background"""
+        replica = self.replicas.get(source_path)
+        if replica is None:
+            replica = self.replicas[source_path] = Replica(*self._snapshot(source_path))
+        elif (replica.pending is None and time.time() - replica.refreshed_at > self.max_lag_seconds
+              and source_stamp(source_path) != replica.stamp):
+            self._refresh_in_background(source_path, replica)
+        return replica.conn
+
+    def _refresh_in_background(self, source_path: str, replica: Replica):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (CLI use): refresh inline
+            self._swap(replica, *self._snapshot(source_path))
+            return
+        replica.pending = loop.run_in_executor(None, self._snapshot, source_path)
+
+        def done(future: asyncio.Future):
+            replica.pending = None
+            if future.cancelled() or future.exception() is not None:
+                REGISTRY.increment("lif3_replica_refresh_failures_total")
+                return
+            self._swap(replica, *future.result())
+
+        replica.pending.add_done_callback(done)
+
+    async def catch_up(self, source_path: str):
+        """Wait until the replica holds everything committed so far, refreshing now regardless of the lag allowance"""
+        replica = self.replicas.get(source_path)
+        if replica is None:
+            # The first get() snapshots inline
+            return
+        if replica.pending is None and source_stamp(source_path) != replica.stamp:
+            self._refresh_in_background(source_path, replica)
+        if replica.pending is not None:
+            try:
+                # The swap callback was registered first, so it has run by the time this resumes
+                await replica.pending
+            except Exception:
+                pass  # Counted by the refresh callback; readers keep the previous snapshot
+
+    def _swap(self, replica: Replica, conn: sqlite3.Connection, stamp: tuple, elapsed_ms: float):
+        # Runs on the event loop between handlers, so no read is using the old connection
+        old = replica.conn
+        replica.conn = conn
+        replica.stamp = stamp
+        replica.refreshed_at = time.time()
+        replica.refreshes += 1
+        replica.last_refresh_ms = elapsed_ms
+        old.close()
+
+    def refresh(self, source_path: str) -> sqlite3.Connection:
+        """Take a new snapshot now"""
+        replica = self.replicas.get(source_path)
+        if replica is None:
+            return self.get(source_path)
+        self._swap(replica, *self._snapshot(source_path))
+        return replica.conn
+
+    def close_all(self):
+        while self.replicas:
+            _, replica = self.replicas.popitem()
+            replica.conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "mode": self.mode,
+            "max_lag_seconds": self.max_lag_seconds,
+            "replicas": [
+                {
+                    "source": source_path,
+                    "age_seconds": round(now - replica.refreshed_at, 1),
+                    "refreshes": replica.refreshes,
+                    "last_refresh_ms": round(replica.last_refresh_ms, 2),
+                    "refreshing": replica.pending is not None
+                }
+                for source_path, replica in self.replicas.items()
+            ]
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description='Take a read-only snapshot of a LIF3 database with the backup API')
+    parser.add_argument('--db', default=resolve_db_path(), help='LIF3 SQLite database')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    conn = take_snapshot(args.db, "file")
+    tables = conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+    conn.close()
+    size = os.path.getsize(replica_path(args.db))
+    print(f"✅ Snapshot {replica_path(args.db)}: {tables} tables, {size / 1024:,.0f} KiB "
+          f"in {(time.perf_counter() - started) * 1000:,.0f} ms")
+
+if __name__ == "__main__":
+    main()
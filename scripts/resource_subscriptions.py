@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+LIF3 Resource Subscriptions - resources/updated push for subscribed lif3:// URIs
+Sessions subscribe to resource URIs (tenant query parameter included). After
+a tool call, touch(tenant) schedules one check per debounce window
+(LIF3_NOTIFY_DEBOUNCE_MS): if the tenant's database has committed anything
+since the last check, each URI subscribed for that tenant is re-rendered and
+its digest compared with the last one, and only URIs whose content changed
+are pushed to their subscribers. An optional prepare(tenant) hook runs
+before those renders (the server uses it to bring read replicas up to date).
+"""
+
+import asyncio
+import hashlib
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from urllib.parse import parse_qsl, urlsplit
+
+from server_metrics import REGISTRY
+
+DEFAULT_NOTIFY_DEBOUNCE_MS = 200.0
+
+def uri_tenant(uri: str) -> Optional[str]:
+    """Tenant named in a resource URI's query string (None for the primary database)"""
+    tenant = dict(parse_qsl(urlsplit(uri).query)).get("tenant")
+    return None if tenant in (None, "", "default") else tenant
+
+def digest(content) -> bytes:
+    data = content if isinstance(content, (bytes, bytearray)) else str(content).encode()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+class LIF3ResourceSubscriptions:
+    """Subscribed URIs per session, with debounced, change-only resources/updated notifications"""
+
+    def __init__(self, render: Callable[[str], Awaitable[Any]], version: Callable[[Optional[str]], tuple],
+                 debounce_ms: Optional[float] = None,
+                 prepare: Optional[Callable[[Optional[str]], Awaitable[None]]] = None):
+        self.render = render
+        self.version = version
+        self.prepare = prepare
+        self.debounce_ms = debounce_ms if debounce_ms is not None else float(
+            os.environ.get("LIF3_NOTIFY_DEBOUNCE_MS", DEFAULT_NOTIFY_DEBOUNCE_MS)
+        )
+        self.subscribers: Dict[str, Set[Any]] = {}  # uri -> sessions
+        self.digests: Dict[str, bytes] = {}
+        self.versions: Dict[Optional[str], tuple] = {}
+        self.dirty: Set[Optional[str]] = set()
+        self.pending: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.suppressed = 0
+
+    async def subscribe(self, session, uri: str):
+        uri = str(uri)
+        if uri not in self.subscribers:
+            # Baseline, so the first notification means a real change
+            self.digests[uri] = digest(await self.render(uri))
+            tenant = uri_tenant(uri)
+            self.versions.setdefault(tenant, self.version(tenant))
+        self.subscribers.setdefault(uri, set()).add(session)
+
+    def unsubscribe(self, session, uri: str):
+        uri = str(uri)
+        sessions = self.subscribers.get(uri)
+        if sessions is None:
+            return
+        sessions.discard(session)
+        if not sessions:
+            del self.subscribers[uri]
+            self.digests.pop(uri, None)
+
+    def drop(self, session):
+        """Forget a session everywhere (it disconnected or a send to it failed)"""
+        for uri in [uri for uri, sessions in self.subscribers.items() if session in sessions]:
+            self.unsubscribe(session, uri)
+
+    def touch(self, tenant: Optional[str] = None):
+        """Note that a tenant's data may have changed; checks run once per debounce window"""
+        if not self.subscribers:
+            return
+        self.dirty.add(None if tenant in ("", "default") else tenant)
+        if self.pending is None or self.pending.done():
+            self.pending = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.debounce_ms / 1000)
+        await self.flush()
+
+    async def flush(self):
+        """Push resources/updated for every subscribed URI whose content changed in a dirty tenant"""
+        dirty, self.dirty = self.dirty, set()
+        for tenant in dirty:
+            uris = [uri for uri in self.subscribers if uri_tenant(uri) == tenant]
+            if not uris:
+                continue
+            version = self.version(tenant)
+            if self.versions.get(tenant) == version:
+                continue
+            self.versions[tenant] = version
+            if self.prepare is not None:
+                await self.prepare(tenant)
+            for uri in uris:
+                try:
+                    content_digest = digest(await self.render(uri))
+                except Exception:
+                    REGISTRY.increment("lif3_resource_updates_total", status="error")
+                    continue
+                if self.digests.get(uri) == content_digest:
+                    self.suppressed += 1
+                    REGISTRY.increment("lif3_resource_updates_total", status="unchanged")
+                    continue
+                self.digests[uri] = content_digest
+                await self._notify(uri)
+
+    async def _notify(self, uri: str):
+        for session in list(self.subscribers.get(uri, ())):
+            try:
+                await session.send_resource_updated(uri)
+            except Exception:
+                self.drop(session)
+                REGISTRY.increment("lif3_resource_updates_total", status="failed")
+                continue
+            self.sent += 1
+            REGISTRY.increment("lif3_resource_updates_total", status="sent")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "debounce_ms": self.debounce_ms,
+            "uris": len(self.subscribers),
+            "subscriptions": sum(len(sessions) for sessions in self.subscribers.values()),
+            "sent": self.sent,
+            "suppressed": self.suppressed
+        }
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+LIF3 Server Metrics - Latency and throughput instrumentation for the MCP servers
+@instrument wraps read_resource/call_tool to record latency, response bytes and
+SQL statement counts per tool or resource; a sqlite3 trace callback counts every
+statement (trigger bodies included) and InstrumentedConnection times each one.
+Snapshots are served as JSON (lif3://metrics) or Prometheus text.
+"""
+
+import contextvars
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from lif3_config import busy_timeout_ms
+
+# Histogram bucket upper bounds: milliseconds, response bytes and SQL statements per call
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+PROMETHEUS_DUMP_INTERVAL = 10.0  # seconds between LIF3_METRICS_PROM_FILE rewrites
+
+class Histogram:
+    """Fixed-bucket histogram with running count/sum/min/max"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Bucket upper bound containing the q-th observation (max for the +Inf bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+class MetricsRegistry:
+    """Histograms and counters keyed by metric name and label values
+
+    Thread-safe: the write queue's writer thread records alongside the event loop.
+    """
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self.counters: Dict[Tuple[str, Tuple], float] = {}
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+
+    def observe(self, metric: str, value: float, buckets=LATENCY_BUCKETS_MS, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, metric: str, amount: float = 1, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view grouped by metric name"""
+        histograms: Dict[str, list] = {}
+        counters: Dict[str, list] = {}
+        with self.lock:
+            for (metric, labels), histogram in sorted(self.histograms.items()):
+                histograms.setdefault(metric, []).append({**dict(labels), **histogram.snapshot()})
+            for (metric, labels), value in sorted(self.counters.items()):
+                counters.setdefault(metric, []).append({**dict(labels), "value": value})
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "histograms": histograms,
+            "counters": counters
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        declared = set()
+        with self.lock:
+            for (metric, labels), histogram in sorted(self.histograms.items()):
+                if metric not in declared:
+                    lines.append(f"# TYPE {metric} histogram")
+                    declared.add(metric)
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f"{metric}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{metric}_sum{_labels(labels)} {histogram.total}")
+                lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+            for (metric, labels), value in sorted(self.counters.items()):
+                if metric not in declared:
+                    lines.append(f"# TYPE {metric} counter")
+                    declared.add(metric)
+                lines.append(f"{metric}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+def _labels(labels: Tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+REGISTRY = MetricsRegistry()
+
+# SQL statements issued while the current handler runs
+_handler_sql_count: contextvars.ContextVar = contextvars.ContextVar("lif3_handler_sql_count", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+# The trace callback sees SQL with bound values expanded; fold literals back to '?'
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_STATEMENT_LABELS: Dict[str, str] = {}
+
+def statement_label(sql: str) -> str:
+    """Collapse whitespace and literals and truncate so each statement shape gets one label"""
+    label = _STATEMENT_LABELS.get(sql)
+    if label is None:
+        label = _LITERALS.sub("?", _WHITESPACE.sub(" ", sql).strip())[:160]
+        if len(_STATEMENT_LABELS) < 2048:
+            _STATEMENT_LABELS[sql] = label
+    return label
+
+def _trace_statement(sql: str):
+    """sqlite3 trace callback: one call per executed statement and per trigger program it fires"""
+    if sql.startswith("-- ") and not sql.startswith("-- TRIGGER"):
+        # Statements run inside a virtual table (FTS5 reads its shadow tables once per matched row)
+        return
+    counter = _handler_sql_count.get()
+    if counter is not None:
+        counter[0] += 1
+    if sql.startswith("-- TRIGGER"):
+        REGISTRY.increment("lif3_sql_trigger_statements_total", trigger=sql[len("-- TRIGGER"):].strip())
+    else:
+        REGISTRY.increment("lif3_sql_statements_total", statement=statement_label(sql))
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection that times execute/executemany (time to first row) per statement"""
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            REGISTRY.observe("lif3_sql_duration_ms", (time.perf_counter() - started) * 1000,
+                             statement=statement_label(sql))
+
+    def executemany(self, sql, parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, parameters)
+        finally:
+            REGISTRY.observe("lif3_sql_duration_ms", (time.perf_counter() - started) * 1000,
+                             statement=statement_label(sql))
+
+def connect(path: str, **kwargs) -> sqlite3.Connection:
+    """sqlite3.connect with statement timing and tracing enabled (and the configured busy timeout)"""
+    kwargs.setdefault("timeout", busy_timeout_ms() / 1000)
+    conn = sqlite3.connect(path, factory=InstrumentedConnection, **kwargs)
+    conn.set_trace_callback(_trace_statement)
+    return conn
+
+def _response_bytes(result) -> int:
+    """Size of a handler result: resource strings/bytes or a list of MCP content items"""
+    if isinstance(result, str):
+        return len(result.encode())
+    if isinstance(result, (bytes, bytearray)):
+        return len(result)
+    total = 0
+    for item in result or ():
+        text = getattr(item, "text", None)
+        if text is None:
+            resource = getattr(item, "resource", None)
+            text = getattr(resource, "text", None) or getattr(resource, "blob", None)
+        if text:
+            total += len(text.encode()) if isinstance(text, str) else len(text)
+    return total
+
+def handler_name(kind: str, target) -> str:
+    """Tool name, or resource URI without its query string"""
+    name = str(target)
+    return name.split("?", 1)[0] if kind == "resource" else name
+
+_last_dump = [0.0]
+
+def maybe_dump_prometheus():
+    """Rewrite LIF3_METRICS_PROM_FILE at most every PROMETHEUS_DUMP_INTERVAL seconds"""
+    path = os.environ.get("LIF3_METRICS_PROM_FILE")
+    if not path:
+        return
+    now = time.monotonic()
+    if now - _last_dump[0] < PROMETHEUS_DUMP_INTERVAL:
+        return
+    _last_dump[0] = now
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(REGISTRY.render_prometheus())
+    os.replace(tmp_path, path)
+
+def instrument(kind: str):
+    """Decorator for async MCP handlers whose first argument is the tool name or URI"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(target, *args, **kwargs):
+            name = handler_name(kind, target)
+            counter = [0]
+            token = _handler_sql_count.set(counter)
+            started = time.perf_counter()
+            status = "ok"
+            result = None
+            try:
+                result = await func(target, *args, **kwargs)
+                return result
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                _handler_sql_count.reset(token)
+                REGISTRY.observe("lif3_handler_duration_ms", elapsed_ms, kind=kind, name=name)
+                REGISTRY.observe("lif3_handler_sql_statements", counter[0], COUNT_BUCKETS, kind=kind, name=name)
+                REGISTRY.increment("lif3_handler_calls_total", kind=kind, name=name, status=status)
+                if status == "ok":
+                    REGISTRY.observe("lif3_handler_response_bytes", _response_bytes(result),
+                                     SIZE_BUCKETS_BYTES, kind=kind, name=name)
+                maybe_dump_prometheus()
+        return wrapper
+    return decorator
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+LIF3 Write Queue - Single-writer group commit for tool writes
+Concurrent requests hand their write to LIF3WriteQueue instead of committing
+on their own. One writer task wakes every few milliseconds, applies every
+pending write per tenant database inside a single BEGIN IMMEDIATE
+transaction (each write in its own savepoint, so one failure does not sink
+its neighbours) and commits once. Groups are applied and committed on a
+dedicated writer thread, on connections of its own (get_connection must not
+hand out the event loop's connections), so an fsync never stalls the other
+sessions. A group whose BEGIN, savepoint or COMMIT fails is failed as a
+whole and the writer carries on. Batch sizes, queue wait and commit
+latency are recorded in server_metrics. Maintenance that manages its own
+transactions (ATTACH/DETACH, multi-file moves) goes through
+submit_exclusive() and runs alone, in queue order. Each write runs in its submitter's
+context, so per-request instrumentation counts the statements it issued.
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from server_metrics import REGISTRY, COUNT_BUCKETS
+
+DEFAULT_GROUP_COMMIT_MS = 2.0
+DEFAULT_MAX_GROUP_SIZE = 256
+
+Outcome = Tuple["PendingWrite", Any, Optional[BaseException]]
+
+class PendingWrite:
+    __slots__ = ("tenant", "apply", "args", "future", "exclusive", "context", "queued_at")
+
+    def __init__(self, tenant, apply, args, future, exclusive: bool = False):
+        self.tenant = tenant
+        self.apply = apply
+        self.args = args
+        self.future = future
+        self.exclusive = exclusive
+        self.context = contextvars.copy_context()
+        self.queued_at = time.perf_counter()
+
+class LIF3WriteQueue:
+    """Coalesces writes from concurrent handlers into one commit per tenant every interval"""
+
+    def __init__(self, get_connection: Callable, interval_ms: Optional[float] = None,
+                 max_group: Optional[int] = None):
+        self.get_connection = get_connection
+        self.interval_ms = interval_ms if interval_ms is not None else float(
+            os.environ.get("LIF3_GROUP_COMMIT_MS", DEFAULT_GROUP_COMMIT_MS)
+        )
+        self.max_group = max_group or int(os.environ.get("LIF3_MAX_GROUP_SIZE", DEFAULT_MAX_GROUP_SIZE))
+        self.pending: List[PendingWrite] = []
+        self.wakeup: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+        # One thread, so groups still apply strictly in queue order
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lif3-writer")
+        self.writes = 0
+        self.failed = 0
+        self.commits = 0
+        self.largest_group = 0
+
+    async def submit(self, tenant: Optional[str], apply: Callable, *args) -> Any:
+        """Queue apply(conn, *args) and wait for its group to commit; returns its result or raises its error"""
+        return await self._enqueue(tenant, apply, args, exclusive=False)
+
+    async def submit_exclusive(self, tenant: Optional[str], apply: Callable, *args) -> Any:
+        """Run apply(conn, *args) on the writer's connection with no group open; apply begins and commits itself"""
+        return await self._enqueue(tenant, apply, args, exclusive=True)
+
+    async def _enqueue(self, tenant, apply: Callable, args: tuple, exclusive: bool) -> Any:
+        loop = asyncio.get_running_loop()
+        write = PendingWrite(tenant, apply, args, loop.create_future(), exclusive)
+        self.pending.append(write)
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            # A fresh context, or the writer would keep the first submitter's request state for its lifetime
+            self.task = contextvars.Context().run(loop.create_task, self._run())
+        self.wakeup.set()
+        return await write.future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.wakeup.wait()
+            # Give concurrent requests the interval to join this group
+            if self.interval_ms > 0:
+                await asyncio.sleep(self.interval_ms / 1000)
+            self.wakeup.clear()
+            group, self.pending = self.pending[:self.max_group], self.pending[self.max_group:]
+            if self.pending:
+                self.wakeup.set()
+            outcomes: List[Outcome] = []
+            try:
+                await loop.run_in_executor(self.executor, self.flush, group, outcomes)
+            except Exception as error:
+                # Even a failed rollback must not strand the group's callers or stop the writer
+                settled = {id(write) for write, _, _ in outcomes}
+                outcomes += [(write, None, error) for write in group if id(write) not in settled]
+            # Futures belong to the event loop, so they are settled here rather than on the writer thread
+            for write, result, error in outcomes:
+                self._settle(write, result, error)
+
+    def flush(self, group: List[PendingWrite], outcomes: List[Outcome]):
+        """Apply and commit a group on the calling (writer) thread, one transaction per tenant
+
+        An exclusive write splits the group: writes queued before it commit first, later ones after it.
+        Each write's (write, result, error) is appended to outcomes as soon as its transaction ends.
+        """
+        by_tenant: Dict[Any, List[PendingWrite]] = {}
+        for write in group:
+            if write.exclusive:
+                for tenant, writes in by_tenant.items():
+                    self._commit_group(tenant, writes, outcomes)
+                by_tenant = {}
+                self._run_exclusive(write, outcomes)
+            else:
+                by_tenant.setdefault(write.tenant, []).append(write)
+        for tenant, writes in by_tenant.items():
+            self._commit_group(tenant, writes, outcomes)
+
+    def _run_exclusive(self, write: PendingWrite, outcomes: List[Outcome]):
+        REGISTRY.observe("lif3_write_queue_wait_ms", (time.perf_counter() - write.queued_at) * 1000)
+        conn = None
+        try:
+            conn = self.get_connection(write.tenant)
+            result = write.context.run(write.apply, conn, *write.args)
+        except Exception as error:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            outcomes.append((write, None, error))
+            return
+        outcomes.append((write, result, None))
+
+    def _commit_group(self, tenant, writes: List[PendingWrite], outcomes: List[Outcome]):
+        applied: List[Outcome] = []
+        started = time.perf_counter()
+        conn = None
+        try:
+            conn = self.get_connection(tenant)
+            conn.execute("BEGIN IMMEDIATE")
+            for write in writes:
+                REGISTRY.observe("lif3_write_queue_wait_ms", (started - write.queued_at) * 1000)
+                conn.execute("SAVEPOINT lif3_write")
+                try:
+                    result = write.context.run(write.apply, conn, *write.args)
+                except Exception as error:
+                    conn.execute("ROLLBACK TO lif3_write")
+                    conn.execute("RELEASE lif3_write")
+                    applied.append((write, None, error))
+                    continue
+                conn.execute("RELEASE lif3_write")
+                applied.append((write, result, None))
+            conn.commit()
+        except Exception as error:
+            # BEGIN, a savepoint statement or COMMIT itself failed (locked, disk full): none of the group committed
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            outcomes.extend((write, None, error) for write in writes)
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.commits += 1
+        self.largest_group = max(self.largest_group, len(writes))
+        REGISTRY.observe("lif3_write_group_size", len(writes), COUNT_BUCKETS)
+        REGISTRY.observe("lif3_write_group_commit_ms", elapsed_ms)
+        outcomes.extend(applied)
+
+    def _settle(self, write: PendingWrite, result, error):
+        self.writes += 1
+        if error is not None:
+            self.failed += 1
+        REGISTRY.increment("lif3_writes_total", status="error" if error is not None else "ok")
+        # The caller may have gone away (cancelled request) while its write was queued
+        if write.future.done():
+            return
+        if error is not None:
+            write.future.set_exception(error)
+        else:
+            write.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_ms": self.interval_ms,
+            "max_group": self.max_group,
+            "writes": self.writes,
+            "failed": self.failed,
+            "commits": self.commits,
+            "mean_group_size": round(self.writes / self.commits, 2) if self.commits else None,
+            "largest_group": self.largest_group,
+            "pending": len(self.pending)
+        }